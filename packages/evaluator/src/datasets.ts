@@ -0,0 +1,90 @@
+/**
+ * Test dataset loading (YAML files under datasets/)
+ *
+ * Per-project datasets live in datasets/<project>/; cross-project
+ * datasets live directly in datasets/.
+ */
+
+import * as fs from 'fs/promises';
+import * as path from 'path';
+import { fileURLToPath } from 'url';
+import { parse as parseYaml } from 'yaml';
+
+import type { TestDataset } from './types.js';
+import { printInfo } from './reporter.js';
+import { listProjects } from '@mina-docs/shared';
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+
+export const DEFAULT_DATASETS_DIR = path.join(__dirname, '..', 'datasets');
+
+/**
+ * Load test datasets, optionally for a single project.
+ * Cross-project datasets are included only when no project filter is given.
+ */
+export async function loadDatasets(
+  projectFilter?: string,
+  datasetsDir: string = DEFAULT_DATASETS_DIR
+): Promise<TestDataset[]> {
+  const datasets: TestDataset[] = [];
+
+  // Get projects dynamically from config, with fallback to known projects
+  const availableProjects = listProjects();
+  const defaultProjects = availableProjects.length > 0
+    ? availableProjects
+    : ['mina', 'solana', 'cosmos'];
+
+  const projects = projectFilter
+    ? [projectFilter]
+    : defaultProjects;
+
+  for (const project of projects) {
+    const projectDir = path.join(datasetsDir, project);
+
+    try {
+      const files = await fs.readdir(projectDir);
+      const yamlFiles = files.filter(f => f.endsWith('.yaml') || f.endsWith('.yml'));
+
+      for (const file of yamlFiles) {
+        const content = await fs.readFile(path.join(projectDir, file), 'utf-8');
+        const dataset = parseYaml(content) as TestDataset;
+
+        // Ensure project is set on all tests
+        dataset.tests = dataset.tests.map(t => ({
+          ...t,
+          project: t.project || dataset.project
+        }));
+
+        datasets.push(dataset);
+      }
+    } catch {
+      // Directory might not exist yet
+      printInfo(`No datasets found for project: ${project}`);
+    }
+  }
+
+  // Load cross-project tests (from root datasets directory)
+  if (!projectFilter) {
+    try {
+      const rootFiles = await fs.readdir(datasetsDir);
+      const rootYamlFiles = rootFiles.filter(f => f.endsWith('.yaml') || f.endsWith('.yml'));
+
+      for (const file of rootYamlFiles) {
+        const content = await fs.readFile(path.join(datasetsDir, file), 'utf-8');
+        const dataset = parseYaml(content) as TestDataset;
+
+        // Cross-project tests may have project specified per-test in input
+        dataset.tests = dataset.tests.map(t => ({
+          ...t,
+          project: t.project || (t.input as Record<string, unknown>)?.project as string || dataset.project
+        }));
+
+        datasets.push(dataset);
+      }
+    } catch {
+      // No root files
+    }
+  }
+
+  return datasets;
+}
@@ -13,17 +13,15 @@
  */
 
 import { Command } from 'commander';
-import * as fs from 'fs/promises';
 import * as path from 'path';
 import { fileURLToPath } from 'url';
-import { parse as parseYaml } from 'yaml';
 import chalk from 'chalk';
 
-import type { TestDataset, TestResult, TestCase } from './types.js';
+import type { TestResult, TestCase } from './types.js';
 import { runTest, initializeMCP, checkServerHealth } from './harness.js';
 import { calculateMetrics } from './metrics.js';
 import { printReport, saveReport, printProgress, printError, printInfo } from './reporter.js';
-import { listProjects } from '@mina-docs/shared';
+import { loadDatasets } from './datasets.js';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 
@@ -50,71 +48,6 @@ program
     }
   });
 
-async function loadDatasets(projectFilter?: string): Promise<TestDataset[]> {
-  const datasetsDir = path.join(__dirname, '..', 'datasets');
-  const datasets: TestDataset[] = [];
-
-  // Get projects dynamically from config, with fallback to known projects
-  const availableProjects = listProjects();
-  const defaultProjects = availableProjects.length > 0
-    ? availableProjects
-    : ['mina', 'solana', 'cosmos'];
-
-  const projects = projectFilter
-    ? [projectFilter]
-    : defaultProjects;
-
-  for (const project of projects) {
-    const projectDir = path.join(datasetsDir, project);
-
-    try {
-      const files = await fs.readdir(projectDir);
-      const yamlFiles = files.filter(f => f.endsWith('.yaml') || f.endsWith('.yml'));
-
-      for (const file of yamlFiles) {
-        const content = await fs.readFile(path.join(projectDir, file), 'utf-8');
-        const dataset = parseYaml(content) as TestDataset;
-
-        // Ensure project is set on all tests
-        dataset.tests = dataset.tests.map(t => ({
-          ...t,
-          project: t.project || dataset.project
-        }));
-
-        datasets.push(dataset);
-      }
-    } catch {
-      // Directory might not exist yet
-      printInfo(`No datasets found for project: ${project}`);
-    }
-  }
-
-  // Load cross-project tests (from root datasets directory)
-  if (!projectFilter) {
-    try {
-      const rootFiles = await fs.readdir(datasetsDir);
-      const rootYamlFiles = rootFiles.filter(f => f.endsWith('.yaml') || f.endsWith('.yml'));
-
-      for (const file of rootYamlFiles) {
-        const content = await fs.readFile(path.join(datasetsDir, file), 'utf-8');
-        const dataset = parseYaml(content) as TestDataset;
-
-        // Cross-project tests may have project specified per-test in input
-        dataset.tests = dataset.tests.map(t => ({
-          ...t,
-          project: t.project || (t.input as Record<string, unknown>)?.project as string || dataset.project
-        }));
-
-        datasets.push(dataset);
-      }
-    } catch {
-      // No root files
-    }
-  }
-
-  return datasets;
-}
-
 interface EvaluationOptions {
   project?: string;
   tag?: string;
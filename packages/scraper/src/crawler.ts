@@ -1,12 +1,17 @@
 import * as cheerio from 'cheerio';
 import pLimit from 'p-limit';
 import puppeteer, { Browser, Page } from 'puppeteer';
+import type { PageValidators } from '@mina-docs/shared';
 
 export interface CrawlResult {
   url: string;
   html: string;
   title: string;
   links: string[];
+  /** True when the server answered 304; html is empty and links come from the cache */
+  notModified?: boolean;
+  etag?: string | null;
+  lastModified?: string | null;
 }
 
 export interface CrawlerOptions {
@@ -17,17 +22,58 @@ export interface CrawlerOptions {
   excludePatterns?: string[];
   userAgent?: string;
   useBrowser?: boolean; // Use Puppeteer for Cloudflare-protected sites
+  /** Lookup of stored validators for conditional requests (fetch mode only) */
+  getValidators?: (url: string) => Promise<PageValidators | null>;
+}
+
+// Upper bound on fetched-but-not-yet-consumed pages held in memory
+const MAX_BUFFERED_RESULTS = 20;
+
+/**
+ * FIFO queue with O(1) push and shift
+ */
+class FifoQueue<T> {
+  private items: T[] = [];
+  private head = 0;
+
+  push(item: T): void {
+    this.items.push(item);
+  }
+
+  shift(): T | undefined {
+    if (this.head >= this.items.length) return undefined;
+    const item = this.items[this.head];
+    this.items[this.head] = undefined as T;
+    this.head++;
+
+    // Compact once the consumed prefix dominates the backing array
+    if (this.head > 1024 && this.head * 2 > this.items.length) {
+      this.items = this.items.slice(this.head);
+      this.head = 0;
+    }
+    return item;
+  }
+
+  get length(): number {
+    return this.items.length - this.head;
+  }
 }
 
 export class Crawler {
   private visited = new Set<string>();
-  private queue: string[] = [];
+  private queued = new Set<string>();
+  private queue = new FifoQueue<string>();
+  private results = new FifoQueue<CrawlResult>();
   private limit: ReturnType<typeof pLimit>;
+  private outstanding = 0;
+  private wake: (() => void) | null = null;
+  private hostNextStart = new Map<string, number>();
   private browser: Browser | null = null;
-  private page: Page | null = null;
+  private idlePages: Page[] = [];
+  private notModifiedCount = 0;
 
   constructor(private options: CrawlerOptions) {
-    this.limit = pLimit(options.concurrency);
+    this.limit = pLimit(Math.max(1, options.concurrency));
   }
 
   async *crawl(): AsyncGenerator<CrawlResult> {
@@ -36,41 +82,103 @@ export class Crawler {
       await this.initBrowser();
     }
 
-    this.queue.push(this.options.baseUrl);
+    this.enqueue(this.options.baseUrl, true);
 
     try {
-      while (this.queue.length > 0) {
-        const url = this.queue.shift()!;
-        const normalizedUrl = this.normalizeUrl(url);
+      while (true) {
+        this.schedule();
 
-        if (this.visited.has(normalizedUrl)) continue;
-        if (this.options.maxPages && this.visited.size >= this.options.maxPages) break;
+        const result = this.results.shift();
+        if (result) {
+          yield result;
+          continue;
+        }
 
-        this.visited.add(normalizedUrl);
+        // Nothing buffered and nothing in flight: the frontier is exhausted
+        if (this.outstanding === 0) break;
 
-        try {
-          const result = this.options.useBrowser
-            ? await this.fetchPageWithBrowser(normalizedUrl)
-            : await this.fetchPage(normalizedUrl);
-
-          // Add new links to queue
-          for (const link of result.links) {
-            const normalizedLink = this.normalizeUrl(link);
-            if (!this.visited.has(normalizedLink) && this.isValidUrl(normalizedLink)) {
-              this.queue.push(normalizedLink);
-            }
-          }
+        await new Promise<void>(resolve => { this.wake = resolve; });
+      }
+    } finally {
+      await this.closeBrowser();
+    }
+  }
 
-          yield result;
+  /**
+   * Start fetches for queued URLs while concurrency and buffer limits allow.
+   * The p-limit queue caps active requests; outstanding also counts tasks
+   * waiting for a slot so the lookahead stays bounded.
+   */
+  private schedule(): void {
+    const maxOutstanding = this.options.concurrency * 2;
+
+    while (
+      this.queue.length > 0 &&
+      this.outstanding < maxOutstanding &&
+      this.results.length + this.outstanding < MAX_BUFFERED_RESULTS
+    ) {
+      if (this.options.maxPages && this.visited.size >= this.options.maxPages) break;
+
+      const url = this.queue.shift()!;
+      if (this.visited.has(url)) continue;
+      this.visited.add(url);
+
+      this.outstanding++;
+      this.limit(() => this.fetchOne(url));
+    }
+  }
 
-          // Rate limiting
-          await this.delay(this.options.delayMs);
-        } catch (error) {
-          console.error(`Failed to crawl ${normalizedUrl}:`, error instanceof Error ? error.message : error);
-        }
+  private async fetchOne(url: string): Promise<void> {
+    try {
+      await this.waitForHost(url);
+
+      const result = this.options.useBrowser
+        ? await this.fetchPageWithBrowser(url)
+        : await this.fetchPage(url);
+
+      // Add new links to queue
+      for (const link of result.links) {
+        this.enqueue(link);
       }
+
+      this.results.push(result);
+    } catch (error) {
+      console.error(`Failed to crawl ${url}:`, error instanceof Error ? error.message : error);
     } finally {
-      await this.closeBrowser();
+      this.outstanding--;
+      this.notify();
+    }
+  }
+
+  private enqueue(url: string, isSeed: boolean = false): void {
+    const normalized = this.normalizeUrl(url);
+    if (this.queued.has(normalized)) return;
+    if (!isSeed && !this.isValidUrl(normalized)) return;
+    this.queued.add(normalized);
+    this.queue.push(normalized);
+  }
+
+  private notify(): void {
+    const wake = this.wake;
+    this.wake = null;
+    wake?.();
+  }
+
+  /**
+   * Per-host politeness: requests to one host start at least delayMs
+   * apart, whatever the concurrency. Concurrency only overlaps a slow
+   * response or its link extraction with the next request.
+   */
+  private async waitForHost(url: string): Promise<void> {
+    if (this.options.delayMs <= 0) return;
+
+    const host = new URL(url).host;
+    const now = Date.now();
+    const start = Math.max(now, this.hostNextStart.get(host) ?? 0);
+    this.hostNextStart.set(host, start + this.options.delayMs);
+
+    if (start > now) {
+      await this.delay(start - now);
     }
   }
 
@@ -86,38 +194,56 @@ export class Crawler {
         '--disable-gpu'
       ]
     });
-    this.page = await this.browser.newPage();
+  }
+
+  private async createPage(): Promise<Page> {
+    if (!this.browser) {
+      throw new Error('Browser not initialized');
+    }
+
+    const page = await this.browser.newPage();
 
     // Set realistic viewport and user agent
-    await this.page.setViewport({ width: 1920, height: 1080 });
-    await this.page.setUserAgent(
+    await page.setViewport({ width: 1920, height: 1080 });
+    await page.setUserAgent(
       this.options.userAgent ||
       'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
     );
 
     // Set extra headers
-    await this.page.setExtraHTTPHeaders({
+    await page.setExtraHTTPHeaders({
       'Accept-Language': 'en-US,en;q=0.9',
     });
+
+    return page;
   }
 
   private async closeBrowser(): Promise<void> {
     if (this.browser) {
       await this.browser.close();
       this.browser = null;
-      this.page = null;
+      this.idlePages = [];
     }
   }
 
   private async fetchPageWithBrowser(url: string): Promise<CrawlResult> {
-    if (!this.page) {
-      throw new Error('Browser not initialized');
+    // Pages are pooled; p-limit guarantees at most `concurrency` are in use
+    const page = this.idlePages.pop() || await this.createPage();
+
+    try {
+      return await this.renderPage(page, url);
+    } finally {
+      if (this.browser) {
+        this.idlePages.push(page);
+      }
     }
+  }
 
+  private async renderPage(page: Page, url: string): Promise<CrawlResult> {
     console.log(`  [Browser] Fetching: ${url}`);
 
     // Navigate and wait for content to load
-    const response = await this.page.goto(url, {
+    const response = await page.goto(url, {
       waitUntil: 'networkidle2',
       timeout: 30000
     });
@@ -132,7 +258,7 @@ export class Crawler {
     if (status === 403 || status === 503) {
       console.log('  [Browser] Cloudflare challenge detected, waiting for resolution...');
       // Wait for challenge to resolve
-      await this.page.waitForFunction(
+      await page.waitForFunction(
         () => !document.body.innerText.includes('Just a moment') &&
               !document.body.innerText.includes('Checking your browser'),
         { timeout: 15000 }
@@ -144,40 +270,54 @@ export class Crawler {
       await this.delay(2000);
     }
 
-    const html = await this.page.content();
-    const $ = cheerio.load(html);
-
-    const title = $('title').text().trim() || $('h1').first().text().trim() || url;
-
-    const links: string[] = [];
-    $('a[href]').each((_, el) => {
-      const href = $(el).attr('href');
-      if (href) {
-        try {
-          const absoluteUrl = new URL(href, url).toString();
-          links.push(absoluteUrl);
-        } catch {
-          // Invalid URL, skip
-        }
-      }
-    });
-
-    return { url, html, title, links };
+    const html = await page.content();
+    return { url, html, ...this.extractTitleAndLinks(html, url) };
   }
 
   private async fetchPage(url: string): Promise<CrawlResult> {
-    const response = await fetch(url, {
-      headers: {
-        'User-Agent': this.options.userAgent || 'CryptoDocsMCP/1.0 (Documentation Indexer)',
-        'Accept': 'text/html,application/xhtml+xml'
-      }
-    });
+    const headers: Record<string, string> = {
+      'User-Agent': this.options.userAgent || 'CryptoDocsMCP/1.0 (Documentation Indexer)',
+      'Accept': 'text/html,application/xhtml+xml'
+    };
+
+    // Conditional request using validators from the previous crawl
+    const validators = this.options.getValidators
+      ? await this.options.getValidators(url)
+      : null;
+    if (validators?.etag) headers['If-None-Match'] = validators.etag;
+    if (validators?.lastModified) headers['If-Modified-Since'] = validators.lastModified;
+
+    const response = await fetch(url, { headers });
+
+    if (response.status === 304 && validators) {
+      this.notModifiedCount++;
+      return {
+        url,
+        html: '',
+        title: url,
+        links: validators.links,
+        notModified: true,
+        etag: response.headers.get('etag') ?? validators.etag,
+        lastModified: response.headers.get('last-modified') ?? validators.lastModified
+      };
+    }
 
     if (!response.ok) {
       throw new Error(`HTTP ${response.status}: ${response.statusText}`);
     }
 
     const html = await response.text();
+
+    return {
+      url,
+      html,
+      ...this.extractTitleAndLinks(html, url),
+      etag: response.headers.get('etag'),
+      lastModified: response.headers.get('last-modified')
+    };
+  }
+
+  private extractTitleAndLinks(html: string, url: string): { title: string; links: string[] } {
     const $ = cheerio.load(html);
 
     const title = $('title').text().trim() || $('h1').first().text().trim() || url;
@@ -195,7 +335,7 @@ export class Crawler {
       }
     });
 
-    return { url, html, title, links };
+    return { title, links };
   }
 
   private normalizeUrl(url: string): string {
@@ -251,7 +391,9 @@ export class Crawler {
   get stats() {
     return {
       visited: this.visited.size,
-      queued: this.queue.length
+      queued: this.queue.length,
+      inFlight: this.outstanding,
+      notModified: this.notModifiedCount
     };
   }
 }
@@ -0,0 +1,307 @@
+/**
+ * GitHub API Client
+ *
+ * One client is shared by every GitHub source in a scrape run so they
+ * draw on a single rate-limit budget:
+ * - At most `concurrency` requests in flight across all sources
+ * - Tracks x-ratelimit-remaining/reset and pauses every caller once the
+ *   remaining quota reaches `minRemaining`, until the window resets
+ * - Retries secondary rate limits (403/429 with retry-after) and 5xx
+ *
+ * The API base URL is configurable (GITHUB_API_URL) so ingestion can run
+ * against GitHub Enterprise or a local fake API.
+ */
+
+import pLimit from 'p-limit';
+import { extractTarGz } from './tarball.js';
+
+export interface GitHubClientOptions {
+  token?: string;
+  /** Default: GITHUB_API_URL or https://api.github.com */
+  apiBaseUrl?: string;
+  /** Maximum requests in flight. Default: 4 */
+  concurrency?: number;
+  /** Pause when the remaining quota drops to this. Default: 10 */
+  minRemaining?: number;
+  /** Retries for rate-limited or failed requests. Default: 3 */
+  maxRetries?: number;
+}
+
+interface GitHubTreeListing {
+  tree: Array<{ path: string; type: string; sha: string; size?: number }>;
+  truncated: boolean;
+}
+
+export interface GitHubTreeEntry {
+  path: string;
+  /** Git blob SHA (changes whenever the file content changes) */
+  sha: string;
+  size: number;
+}
+
+export interface GitHubCommitRef {
+  commitSha: string;
+  treeSha: string;
+}
+
+export interface GitHubRepoInfo {
+  stars: number;
+  forks: number;
+  lastCommit: string;
+  topics: string[];
+  isArchived: boolean;
+}
+
+export interface GitHubClientStats {
+  requests: number;
+  retries: number;
+  archiveDownloads: number;
+  /** Time spent waiting for the rate limit to reset */
+  rateLimitWaitMs: number;
+  /** Last reported quota (null until a response carried the headers) */
+  rateLimitRemaining: number | null;
+}
+
+export class GitHubApiError extends Error {
+  constructor(message: string, readonly status: number) {
+    super(message);
+    this.name = 'GitHubApiError';
+  }
+}
+
+function sleep(ms: number): Promise<void> {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+export class GitHubClient {
+  readonly apiBaseUrl: string;
+  private headers: Record<string, string>;
+  private limit: ReturnType<typeof pLimit>;
+  private minRemaining: number;
+  private maxRetries: number;
+  private remaining: number | null = null;
+  private resetAt = 0;
+  private pause: Promise<void> | null = null;
+  private counters: Omit<GitHubClientStats, 'rateLimitRemaining'> = {
+    requests: 0,
+    retries: 0,
+    archiveDownloads: 0,
+    rateLimitWaitMs: 0
+  };
+
+  constructor(options: GitHubClientOptions = {}) {
+    this.apiBaseUrl = (options.apiBaseUrl || process.env.GITHUB_API_URL || 'https://api.github.com').replace(/\/+$/, '');
+    this.limit = pLimit(options.concurrency ?? 4);
+    this.minRemaining = options.minRemaining ?? 10;
+    this.maxRetries = options.maxRetries ?? 3;
+    this.headers = {
+      'Accept': 'application/vnd.github.v3+json',
+      'User-Agent': 'crypto-docs-scraper'
+    };
+
+    if (options.token) {
+      this.headers['Authorization'] = `token ${options.token}`;
+    }
+  }
+
+  get stats(): GitHubClientStats {
+    return { ...this.counters, rateLimitRemaining: this.remaining };
+  }
+
+  /**
+   * Rate-limited GET; the body is consumed by `read` while the request
+   * still holds its concurrency slot
+   */
+  async request<T>(path: string, read: (response: Response) => Promise<T>): Promise<T> {
+    return this.limit(async () => {
+      for (let attempt = 0; ; attempt++) {
+        await this.waitForBudget();
+
+        this.counters.requests++;
+        let response: Response;
+        try {
+          response = await fetch(`${this.apiBaseUrl}${path}`, { headers: this.headers });
+        } catch (error) {
+          if (attempt >= this.maxRetries) throw error;
+          this.counters.retries++;
+          await sleep(1000 * 2 ** attempt);
+          continue;
+        }
+
+        this.updateBudget(response);
+
+        if (response.ok) {
+          return read(response);
+        }
+
+        const retryDelay = this.retryDelay(response, attempt);
+        if (retryDelay !== null && attempt < this.maxRetries) {
+          await response.body?.cancel();
+          this.counters.retries++;
+          console.warn(`[GitHub] ${response.status} on ${path}, retrying in ${Math.ceil(retryDelay / 1000)}s`);
+          await this.waitFor(retryDelay);
+          continue;
+        }
+
+        const body = await response.text().catch(() => '');
+        throw new GitHubApiError(`GitHub API ${response.status} for ${path}: ${body.slice(0, 200)}`, response.status);
+      }
+    });
+  }
+
+  async getJson<T>(path: string): Promise<T> {
+    return this.request(path, response => response.json() as Promise<T>);
+  }
+
+  async getRepo(repo: string): Promise<GitHubRepoInfo> {
+    const data = await this.getJson<any>(`/repos/${repo}`);
+    return {
+      stars: data.stargazers_count,
+      forks: data.forks_count,
+      lastCommit: data.pushed_at,
+      topics: data.topics || [],
+      isArchived: data.archived
+    };
+  }
+
+  /**
+   * Resolve a branch/tag/SHA to its commit and root tree
+   */
+  async resolveCommit(repo: string, ref: string): Promise<GitHubCommitRef> {
+    const data = await this.getJson<{ sha: string; commit: { tree: { sha: string } } }>(
+      `/repos/${repo}/commits/${encodeURIComponent(ref)}`
+    );
+    return { commitSha: data.sha, treeSha: data.commit.tree.sha };
+  }
+
+  /**
+   * List every file (blob) in a tree, with blob SHAs
+   *
+   * The recursive listing is capped by the API; when it comes back
+   * truncated, list that tree one level deep and walk each subdirectory,
+   * so no file is missing (a missing file would be taken as deleted).
+   */
+  async getTree(repo: string, treeSha: string): Promise<GitHubTreeEntry[]> {
+    return this.listTree(repo, treeSha, '');
+  }
+
+  private async listTree(repo: string, treeSha: string, prefix: string): Promise<GitHubTreeEntry[]> {
+    const data = await this.getJson<GitHubTreeListing>(`/repos/${repo}/git/trees/${treeSha}?recursive=1`);
+    if (!data.truncated) {
+      return data.tree
+        .filter(item => item.type === 'blob')
+        .map(item => ({ path: prefix + item.path, sha: item.sha, size: item.size ?? 0 }));
+    }
+
+    console.warn(`[GitHub] Tree listing for ${repo}${prefix ? ` (${prefix})` : ''} was truncated by the API, walking subdirectories`);
+    const level = await this.getJson<GitHubTreeListing>(`/repos/${repo}/git/trees/${treeSha}`);
+    if (level.truncated) {
+      throw new Error(`Tree listing for ${repo}${prefix ? ` (${prefix})` : ''} is too large to list`);
+    }
+
+    const entries: GitHubTreeEntry[] = [];
+    for (const item of level.tree) {
+      if (item.type === 'blob') {
+        entries.push({ path: prefix + item.path, sha: item.sha, size: item.size ?? 0 });
+      } else if (item.type === 'tree') {
+        entries.push(...await this.listTree(repo, item.sha, `${prefix}${item.path}/`));
+      }
+    }
+    return entries;
+  }
+
+  /**
+   * Download the repository at a commit as one tarball and return the
+   * contents of the wanted files (paths relative to the repo root)
+   */
+  async downloadFiles(
+    repo: string,
+    commitSha: string,
+    wanted: (path: string) => boolean
+  ): Promise<Map<string, string>> {
+    this.counters.archiveDownloads++;
+    return this.request(`/repos/${repo}/tarball/${commitSha}`, async response => {
+      if (!response.body) return new Map<string, string>();
+      return extractTarGz(response.body, { filter: wanted });
+    });
+  }
+
+  /**
+   * Fetch one file through the contents API (fallback for files missing
+   * from an archive)
+   */
+  async getFileContent(repo: string, path: string, ref: string): Promise<string | null> {
+    try {
+      const data = await this.getJson<{ content: string; encoding: string }>(
+        `/repos/${repo}/contents/${path}?ref=${encodeURIComponent(ref)}`
+      );
+      return data.encoding === 'base64'
+        ? Buffer.from(data.content, 'base64').toString('utf-8')
+        : data.content;
+    } catch (error) {
+      if (error instanceof GitHubApiError && error.status === 404) return null;
+      throw error;
+    }
+  }
+
+  /**
+   * Wait while the shared quota is at its floor
+   */
+  private async waitForBudget(): Promise<void> {
+    while (this.pause) {
+      await this.pause;
+    }
+
+    if (this.remaining !== null && this.remaining <= this.minRemaining && this.resetAt > Date.now()) {
+      const waitMs = this.resetAt - Date.now() + 1000;
+      console.warn(`[GitHub] Rate limit budget exhausted (${this.remaining} left), pausing ${Math.ceil(waitMs / 1000)}s`);
+      await this.waitFor(waitMs);
+    }
+  }
+
+  /**
+   * Pause every caller (one shared timer however many requests wait)
+   */
+  private waitFor(ms: number): Promise<void> {
+    if (!this.pause) {
+      const start = Date.now();
+      this.pause = sleep(ms).then(() => {
+        this.counters.rateLimitWaitMs += Date.now() - start;
+        this.pause = null;
+        // Assume the window reset; the next response reports the real quota
+        if (this.resetAt <= Date.now()) this.remaining = null;
+      });
+    }
+    return this.pause;
+  }
+
+  private updateBudget(response: Response): void {
+    const remaining = response.headers.get('x-ratelimit-remaining');
+    const reset = response.headers.get('x-ratelimit-reset');
+    if (remaining !== null) this.remaining = parseInt(remaining, 10);
+    if (reset !== null) this.resetAt = parseInt(reset, 10) * 1000;
+  }
+
+  /**
+   * Delay before retrying a failed response, or null if it should not be
+   * retried
+   */
+  private retryDelay(response: Response, attempt: number): number | null {
+    const retryAfter = response.headers.get('retry-after');
+    if (retryAfter !== null) {
+      return Math.max(1, parseInt(retryAfter, 10) || 1) * 1000;
+    }
+
+    const rateLimited = response.status === 429 ||
+      (response.status === 403 && response.headers.get('x-ratelimit-remaining') === '0');
+    if (rateLimited) {
+      return Math.max(1000, this.resetAt - Date.now() + 1000);
+    }
+
+    if (response.status >= 500) {
+      return 1000 * 2 ** attempt;
+    }
+
+    return null;
+  }
+}
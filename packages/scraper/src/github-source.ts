@@ -6,93 +6,69 @@
  * - Type signatures
  * - JSDoc comments
  * - Function definitions
+ *
+ * Files whose blob SHA matches the previous run are skipped; changed
+ * files are read from one tarball of the branch's current commit.
  */
 
 import { randomUUID } from 'crypto';
-import type { DocumentChunk, GitHubSourceConfig } from '@mina-docs/shared';
+import type {
+  DocumentChunk,
+  GitHubFileState,
+  GitHubSourceConfig,
+  GitHubSourceState
+} from '@mina-docs/shared';
 import { minimatch } from 'minimatch';
+import { GitHubClient, type GitHubTreeEntry } from './github-client.js';
+import { diffTree, sourceConfigHash, type ChangedFile } from './github-state.js';
 
-interface GitHubFile {
-  name: string;
-  path: string;
-  sha: string;
-  size: number;
-  url: string;
-  html_url: string;
-  download_url: string;
-  type: 'file' | 'dir';
-}
-
-interface GitHubContent {
-  content: string;
-  encoding: string;
-}
-
-interface GitHubTreeItem {
-  path: string;
-  mode: string;
-  type: 'blob' | 'tree';
-  sha: string;
-  size?: number;
-  url: string;
-}
-
-interface GitHubTreeResponse {
-  sha: string;
-  url: string;
-  tree: GitHubTreeItem[];
-  truncated: boolean;
-}
+// Bump when parsing changes so stored state is discarded
+const STATE_VERSION = 'legacy-v1';
 
 export interface GitHubScraperOptions {
   config: GitHubSourceConfig;
   token?: string;
   project: string;
+  /** Shared client (and rate-limit budget); created from token if omitted */
+  client?: GitHubClient;
+  /** State stored by the last run, for incremental scraping */
+  previousState?: GitHubSourceState | null;
+}
+
+export interface GitHubSourceScrapeResult {
+  chunks: DocumentChunk[];
+  /** Indexed files whose chunks are still current */
+  unchangedUrls: string[];
+  /** URLs whose chunks must be deleted */
+  removedUrls: string[];
+  /** Store once the chunks are indexed (null: store nothing) */
+  state: GitHubSourceState | null;
+}
+
+/**
+ * State key for the legacy per-project GitHub source
+ */
+export function legacyGitHubSourceId(project: string): string {
+  return `legacy:${project}`;
 }
 
 export class GitHubSourceScraper {
-  private baseApiUrl: string;
-  private headers: Record<string, string>;
+  private client: GitHubClient;
   private config: GitHubSourceConfig;
   private project: string;
+  private configHash: string;
+  private commitSha: string | null = null;
+  private nextFiles: GitHubFileState[] | null = null;
+  private incomplete = false;
+
+  readonly unchangedUrls: string[] = [];
+  readonly removedUrls: string[] = [];
 
   constructor(private options: GitHubScraperOptions) {
     this.config = options.config;
     this.project = options.project;
-    this.baseApiUrl = `https://api.github.com/repos/${this.config.repo}`;
-    this.headers = {
-      'Accept': 'application/vnd.github.v3+json',
-      'User-Agent': 'crypto-docs-scraper'
-    };
-
-    if (options.token) {
-      this.headers['Authorization'] = `token ${options.token}`;
-    }
-  }
-
-  /**
-   * List all files in the repository using the Git Tree API
-   */
-  async listAllFiles(): Promise<string[]> {
-    try {
-      const url = `${this.baseApiUrl}/git/trees/${this.config.branch}?recursive=1`;
-      const response = await fetch(url, { headers: this.headers });
-
-      if (!response.ok) {
-        console.error(`  Failed to list files: ${response.status}`);
-        return [];
-      }
-
-      const data = await response.json() as GitHubTreeResponse;
-
-      // Filter to only files (not directories)
-      return data.tree
-        .filter(item => item.type === 'blob')
-        .map(item => item.path);
-    } catch (error) {
-      console.error('  Error listing files:', error);
-      return [];
-    }
+    this.client = options.client ?? new GitHubClient({ token: options.token });
+    this.configHash = sourceConfigHash(STATE_VERSION, { project: this.project, ...this.config });
   }
 
   /**
@@ -115,29 +91,30 @@ export class GitHubSourceScraper {
   }
 
   /**
-   * Fetch file content from GitHub
+   * Read changed files from one tarball of the commit, falling back to
+   * the contents API for any the archive did not contain
    */
-  async fetchFile(path: string): Promise<string | null> {
-    try {
-      const url = `${this.baseApiUrl}/contents/${path}?ref=${this.config.branch}`;
-      const response = await fetch(url, { headers: this.headers });
-
-      if (!response.ok) {
-        console.error(`  Failed to fetch ${path}: ${response.status}`);
-        return null;
-      }
+  async fetchFiles(paths: string[]): Promise<Map<string, string>> {
+    const wanted = new Set(paths);
+    let files = new Map<string, string>();
 
-      const data = await response.json() as GitHubContent;
+    try {
+      files = await this.client.downloadFiles(this.config.repo, this.commitSha!, path => wanted.has(path));
+    } catch (error) {
+      console.error('  Archive download failed, falling back to per-file fetches:', error instanceof Error ? error.message : error);
+    }
 
-      if (data.encoding === 'base64') {
-        return Buffer.from(data.content, 'base64').toString('utf-8');
+    for (const path of paths) {
+      if (files.has(path)) continue;
+      try {
+        const content = await this.client.getFileContent(this.config.repo, path, this.commitSha!);
+        if (content !== null) files.set(path, content);
+      } catch (error) {
+        console.error(`  Error fetching ${path}:`, error instanceof Error ? error.message : error);
       }
-
-      return data.content;
-    } catch (error) {
-      console.error(`  Error fetching ${path}:`, error);
-      return null;
     }
+
+    return files;
   }
 
   /**
@@ -586,32 +563,83 @@ export class GitHubSourceScraper {
   }
 
   /**
-   * Scrape source files matching the patterns
+   * State to store once this run's chunks are indexed (null if the tree
+   * could not be read)
+   */
+  getState(): GitHubSourceState | null {
+    if (!this.commitSha || !this.nextFiles) return null;
+
+    return {
+      sourceId: legacyGitHubSourceId(this.project),
+      repo: this.config.repo,
+      // Without a commit, the next run re-diffs the tree and retries failed files
+      commitSha: this.incomplete ? '' : this.commitSha,
+      configHash: this.configHash,
+      files: this.nextFiles
+    };
+  }
+
+  private fileState(file: ChangedFile, chunkCount: number): GitHubFileState {
+    return {
+      path: file.path,
+      blobSha: file.blobSha,
+      readmeSha: null,
+      verdict: chunkCount > 0 ? 'indexed' : 'rejected',
+      reason: chunkCount > 0 ? null : 'No chunks extracted',
+      url: `https://github.com/${this.config.repo}/blob/${this.config.branch}/${file.path}`,
+      chunkCount
+    };
+  }
+
+  /**
+   * Scrape new or changed source files matching the patterns
    */
   async *scrape(): AsyncGenerator<{ path: string; chunks: DocumentChunk[] }> {
     console.log(`\nFetching file list from ${this.config.repo}...`);
 
-    const allFiles = await this.listAllFiles();
-    const matchingFiles = allFiles.filter(f => this.matchesPatterns(f));
+    let entries: GitHubTreeEntry[];
+    try {
+      const ref = await this.client.resolveCommit(this.config.repo, this.config.branch);
+      this.commitSha = ref.commitSha;
+      entries = await this.client.getTree(this.config.repo, ref.treeSha);
+    } catch (error) {
+      console.error('  Error listing files:', error instanceof Error ? error.message : error);
+      return;
+    }
+
+    const matchingFiles = entries.filter(entry => this.matchesPatterns(entry.path));
+    const diff = diffTree(matchingFiles, this.options.previousState ?? null, this.configHash);
+
+    console.log(`  Found ${matchingFiles.length} files matching patterns (${diff.changed.length} new or changed, ${diff.unchanged.length} unchanged, ${diff.removed.length} removed)`);
 
-    console.log(`  Found ${matchingFiles.length} files matching patterns`);
+    this.nextFiles = [...diff.unchanged];
+    this.unchangedUrls.push(...diff.unchanged.filter(f => f.verdict === 'indexed').map(f => f.url));
+    this.removedUrls.push(...diff.removed.map(f => f.url));
 
-    for (const filePath of matchingFiles) {
-      console.log(`  Fetching: ${filePath}`);
+    if (diff.changed.length === 0) return;
 
-      const content = await this.fetchFile(filePath);
-      if (!content) {
+    const contents = await this.fetchFiles(diff.changed.map(f => f.path));
+
+    for (const file of diff.changed) {
+      const content = contents.get(file.path);
+      if (content === undefined) {
+        // Keep the old state (and chunks); the file is retried next run
+        this.incomplete = true;
+        if (file.previous) this.nextFiles.push(file.previous);
         continue;
       }
 
-      const chunks = this.parseSourceFile(filePath, content);
-      if (chunks.length > 0) {
-        console.log(`    → Extracted ${chunks.length} chunks`);
-        yield { path: filePath, chunks };
+      const chunks = this.parseSourceFile(file.path, content);
+      this.nextFiles.push(this.fileState(file, chunks.length));
+
+      if (file.previous?.verdict === 'indexed' && chunks.length === 0) {
+        this.removedUrls.push(file.previous.url);
       }
 
-      // Rate limiting
-      await new Promise(resolve => setTimeout(resolve, 500));
+      if (chunks.length > 0) {
+        console.log(`  ${file.path} → Extracted ${chunks.length} chunks`);
+        yield { path: file.path, chunks };
+      }
     }
   }
 }
@@ -619,13 +647,18 @@ export class GitHubSourceScraper {
 // Export for use in main scraper
 export async function scrapeGitHubSource(
   options: GitHubScraperOptions
-): Promise<DocumentChunk[]> {
+): Promise<GitHubSourceScrapeResult> {
   const scraper = new GitHubSourceScraper(options);
-  const allChunks: DocumentChunk[] = [];
+  const chunks: DocumentChunk[] = [];
 
-  for await (const { chunks } of scraper.scrape()) {
-    allChunks.push(...chunks);
+  for await (const result of scraper.scrape()) {
+    chunks.push(...result.chunks);
   }
 
-  return allChunks;
+  return {
+    chunks,
+    unchangedUrls: scraper.unchangedUrls,
+    removedUrls: scraper.removedUrls,
+    state: scraper.getState()
+  };
 }
@@ -0,0 +1,98 @@
+/**
+ * Incremental GitHub Ingestion State
+ *
+ * Compares a repository tree (path → blob SHA) with what the previous
+ * run stored for the source, so only new or modified files are
+ * downloaded, assessed, chunked and embedded. A file is unchanged when
+ * its blob SHA and the SHA of the README used as its context both match.
+ * When the scrape settings (config hash) change, no stored verdict is
+ * reused, but the stored file list still drives chunk removal.
+ */
+
+import type { GitHubFileState, GitHubSourceState } from '@mina-docs/shared';
+import { computeContentHash } from './hash-utils.js';
+import type { GitHubTreeEntry } from './github-client.js';
+
+/**
+ * Where previous source state is loaded from (FullTextDB implements this)
+ */
+export interface GitHubStateStore {
+  getGitHubSourceState(sourceId: string): Promise<GitHubSourceState | null>;
+}
+
+export interface ChangedFile {
+  path: string;
+  blobSha: string;
+  readmeSha: string | null;
+  /** State from the previous run, if the file was seen before */
+  previous: GitHubFileState | null;
+}
+
+export interface TreeDiff {
+  changed: ChangedFile[];
+  /** Files whose stored verdict still applies */
+  unchanged: GitHubFileState[];
+  /** Previously indexed files that are gone or no longer selected */
+  removed: GitHubFileState[];
+}
+
+/**
+ * Fingerprint of the settings that affect what gets indexed; bump the
+ * version prefix when chunking or assessment logic changes
+ */
+export function sourceConfigHash(version: string, settings: unknown): string {
+  return computeContentHash(`${version}:${JSON.stringify(settings)}`);
+}
+
+/**
+ * State to store when some files' chunks failed to embed or write. Their
+ * entries keep the verdict (so any chunks that did land are still removed
+ * with the file) but get a blob SHA that never matches, and the commit is
+ * cleared so the next run diffs the tree instead of reusing every verdict.
+ * Same approach as files that fail to fetch.
+ */
+export function retryFailedFiles(state: GitHubSourceState, failedUrls: ReadonlySet<string>): GitHubSourceState {
+  if (!state.files.some(f => failedUrls.has(f.url))) return state;
+
+  return {
+    ...state,
+    commitSha: '',
+    files: state.files.map(f => (failedUrls.has(f.url) ? { ...f, blobSha: '' } : f))
+  };
+}
+
+/**
+ * Split candidate files into changed / unchanged against the stored
+ * state. `readmeShaFor` returns the SHA of the README a file would be
+ * assessed with (omit when no README context is used).
+ */
+export function diffTree(
+  candidates: GitHubTreeEntry[],
+  previous: GitHubSourceState | null,
+  configHash: string,
+  readmeShaFor: (path: string) => string | null = () => null
+): TreeDiff {
+  const reuseVerdicts = previous?.configHash === configHash;
+  const previousFiles = new Map((previous?.files ?? []).map(f => [f.path, f]));
+  const diff: TreeDiff = { changed: [], unchanged: [], removed: [] };
+
+  for (const entry of candidates) {
+    const readmeSha = readmeShaFor(entry.path);
+    const prev = previousFiles.get(entry.path) ?? null;
+    previousFiles.delete(entry.path);
+
+    if (reuseVerdicts && prev && prev.blobSha === entry.sha && prev.readmeSha === readmeSha) {
+      diff.unchanged.push(prev);
+    } else {
+      diff.changed.push({ path: entry.path, blobSha: entry.sha, readmeSha, previous: prev });
+    }
+  }
+
+  for (const prev of previousFiles.values()) {
+    if (prev.verdict === 'indexed') {
+      diff.removed.push(prev);
+    }
+  }
+
+  return diff;
+}
@@ -5,17 +5,24 @@ import { parseArgs } from 'util';
 import { Crawler } from './crawler.js';
 import { parseDocumentation } from './parser.js';
 import { chunkContent } from './chunker.js';
-import { scrapeGitHubSource } from './github-source.js';
+import { legacyGitHubSourceId, scrapeGitHubSource } from './github-source.js';
 import { scrapeProjectGitHubSources } from './intelligent-github-scraper.js';
+import { GitHubClient } from './github-client.js';
+import { retryFailedFiles } from './github-state.js';
 import { computeContentHash } from './hash-utils.js';
+import { IngestPipeline } from './ingest-pipeline.js';
 import {
-  VectorDB,
+  createVectorStore,
+  defaultLocalVectorPath,
   FullTextDB,
-  generateEmbeddings,
+  createEmbedFunction,
   loadProjectConfig,
   listProjects,
   loadProjectGitHubSources,
   sourceRegistryExists,
+  type DocumentChunk,
+  type GitHubSourceState,
+  type PageValidators,
   type ProjectConfig
 } from '@mina-docs/shared';
 
@@ -94,6 +101,10 @@ const config = {
   qdrantUrl: process.env.QDRANT_URL || 'http://localhost:6333',
   qdrantCollection: process.env.QDRANT_COLLECTION || 'crypto_docs',
   sqlitePath: process.env.SQLITE_PATH || './data/crypto_docs.db',
+  vectorBackend: process.env.VECTOR_BACKEND === 'local' ? 'local' as const : 'qdrant' as const,
+  localVectorPath: process.env.LOCAL_VECTOR_PATH
+    || defaultLocalVectorPath(process.env.SQLITE_PATH || './data/crypto_docs.db'),
+  localVectorQuantize: process.env.LOCAL_VECTOR_QUANTIZE === 'true',
   openaiApiKey: process.env.OPENAI_API_KEY,
   // From project config
   baseUrl: projectConfig.docs.baseUrl,
@@ -106,12 +117,37 @@ const config = {
   // GitHub config
   github: projectConfig.github,
   githubToken: process.env.GITHUB_TOKEN,
+  githubConcurrency: parseInt(process.env.GITHUB_CONCURRENCY || '4'),
+  githubSourceConcurrency: parseInt(process.env.GITHUB_SOURCE_CONCURRENCY || '2'),
   // New options
   useRegistry: args['use-registry'] || false,
   dryRun: args['dry-run'] || false,
   githubOnly: args['github-only'] || false
 };
 
+// Batch settings for embedding generation
+const EMBEDDING_BATCH_SIZE = 100;
+const EMBEDDING_CONCURRENCY = parseInt(process.env.EMBEDDING_CONCURRENCY || '4');
+
+// Pages queued between drains; hashes are recorded per drain, which bounds re-work after an interrupt
+const PAGE_RECORD_INTERVAL = 100;
+
+// Set once the stores are open; closes them on interrupt or fatal error
+let closeStores: (() => Promise<void>) | null = null;
+
+function groupChunksByUrl(chunks: DocumentChunk[]): Map<string, DocumentChunk[]> {
+  const byUrl = new Map<string, DocumentChunk[]>();
+  for (const chunk of chunks) {
+    const list = byUrl.get(chunk.url);
+    if (list) {
+      list.push(chunk);
+    } else {
+      byUrl.set(chunk.url, [chunk]);
+    }
+  }
+  return byUrl;
+}
+
 async function main() {
   console.log('='.repeat(60));
   console.log(`Documentation Scraper - ${config.projectName}`);
@@ -130,7 +166,7 @@ async function main() {
   console.log(`  Max Pages: ${config.maxPages}`);
   console.log(`  Concurrency: ${config.concurrency}`);
   console.log(`  Delay: ${config.delayMs}ms`);
-  console.log(`  Qdrant: ${config.qdrantUrl}`);
+  console.log(`  Vector Backend: ${config.vectorBackend === 'local' ? `local (${config.localVectorPath})` : `qdrant (${config.qdrantUrl})`}`);
   console.log(`  SQLite: ${config.sqlitePath}`);
   console.log(`  Use Registry: ${config.useRegistry}`);
   console.log(`  Dry Run: ${config.dryRun}`);
@@ -147,21 +183,33 @@ async function main() {
   // Initialize databases
   console.log('\nInitializing databases...');
 
-  const vectorDb = new VectorDB({
-    url: config.qdrantUrl,
-    collection: config.qdrantCollection
-  });
-
   const ftsDb = new FullTextDB({
     path: config.sqlitePath
   });
 
+  const vectorDb = createVectorStore({
+    backend: config.vectorBackend,
+    qdrant: {
+      url: config.qdrantUrl,
+      collection: config.qdrantCollection
+    },
+    local: {
+      path: config.localVectorPath,
+      quantize: config.localVectorQuantize
+    },
+    ftsDb
+  });
+
   try {
     await vectorDb.initialize();
-    console.log('  ✓ Vector database (Qdrant) initialized');
+    console.log(`  ✓ Vector database (${config.vectorBackend === 'local' ? 'local' : 'Qdrant'}) initialized`);
   } catch (error) {
-    console.error('  ✗ Failed to connect to Qdrant:', error instanceof Error ? error.message : error);
-    console.error('\n  Make sure Qdrant is running: docker-compose up -d');
+    if (config.vectorBackend === 'local') {
+      console.error('  ✗ Failed to load local vector store:', error instanceof Error ? error.message : error);
+    } else {
+      console.error('  ✗ Failed to connect to Qdrant:', error instanceof Error ? error.message : error);
+      console.error('\n  Make sure Qdrant is running: docker-compose up -d');
+    }
     process.exit(1);
   }
 
@@ -173,7 +221,14 @@ async function main() {
     process.exit(1);
   }
 
-  let totalChunks = 0;
+  // Save the vector store if the run is interrupted or fails: SQLite
+  // commits as it goes, the local vector file only on flush/close
+  closeStores = async () => {
+    closeStores = null;
+    await vectorDb.close();
+    await ftsDb.close();
+  };
+
   let processedPages = 0;
   let failedPages = 0;
   let skippedPages = 0;
@@ -182,36 +237,100 @@ async function main() {
   // Track visited URLs for orphan detection
   const visitedUrls = new Set<string>();
 
-  // Batch settings for embedding generation
-  const EMBEDDING_BATCH_SIZE = 20;
-  let pendingChunks: Awaited<ReturnType<typeof chunkContent>> = [];
+  // Staged ingestion: crawl → parse/chunk → embed → write, with backpressure
+  const pipeline = new IngestPipeline({
+    vectorDb,
+    ftsDb,
+    embed: createEmbedFunction(config.openaiApiKey!),
+    batchSize: EMBEDDING_BATCH_SIZE,
+    embedConcurrency: EMBEDDING_CONCURRENCY
+  });
+
+  // Page hashes and validators for queued pages, recorded by drainPipeline
+  const pendingPages: Array<{ url: string; contentHash: string; chunkCount: number; validators?: PageValidators }> = [];
+
+  /**
+   * Apply one GitHub source's changes: new chunks replace old ones,
+   * removed files lose their chunks, and unchanged files keep theirs
+   * (restored if the docs crawl just marked them orphaned)
+   */
+  async function indexGitHubSource(
+    label: string,
+    result: { chunks: DocumentChunk[]; unchangedUrls: string[]; removedUrls: string[] }
+  ): Promise<void> {
+    if (result.chunks.length > 0) {
+      console.log(`\nIndexing ${result.chunks.length} chunks from ${label}...`);
+
+      const chunksByUrl = groupChunksByUrl(result.chunks);
+      for (const [url, urlChunks] of chunksByUrl) {
+        visitedUrls.add(url);
+        await pipeline.addPage(url, urlChunks, true);
+      }
 
-  async function processBatch() {
-    if (pendingChunks.length === 0) return;
+      // Page hashes for GitHub files are recorded once the chunks are written
+      for (const [url, urlChunks] of chunksByUrl) {
+        pendingPages.push({ url, contentHash: `github:${label}:${url}`, chunkCount: urlChunks.length });
+      }
+    }
 
-    const batch = pendingChunks;
-    pendingChunks = [];
+    const removedUrls = result.removedUrls.filter(url => !visitedUrls.has(url));
+    if (removedUrls.length > 0) {
+      console.log(`  Removing chunks for ${removedUrls.length} files no longer indexed from ${label}`);
+      for (const url of removedUrls) {
+        await pipeline.addPage(url, [], true);
+        await ftsDb.deletePageHash(url);
+      }
+    }
 
-    try {
-      // Generate embeddings for batch
-      const embeddings = await generateEmbeddings(
-        batch.map(c => c.content),
-        config.openaiApiKey!
-      );
+    if (result.unchangedUrls.length > 0) {
+      result.unchangedUrls.forEach(url => visitedUrls.add(url));
 
-      // Store in vector database
-      await vectorDb.upsert(batch, embeddings);
+      const orphaned = new Set(await ftsDb.getOrphanedUrlsForProject(config.project));
+      const restored = result.unchangedUrls.filter(url => orphaned.has(url));
+      if (restored.length > 0) {
+        await vectorDb.markOrphaned(restored, false);
+        await ftsDb.markOrphaned(restored, false);
+      }
+    }
+  }
 
-      // Store in full-text search
-      await ftsDb.upsert(batch);
+  /**
+   * Wait for everything queued to be written, then record the hashes and
+   * HTTP validators of the pages it covered. Pages whose chunks failed to
+   * embed or write keep their previous hash, so the next run re-indexes
+   * them; so do pages still pending when a run is interrupted.
+   */
+  async function drainPipeline(): Promise<void> {
+    await pipeline.flush();
+    for (const page of pendingPages.splice(0)) {
+      if (pipeline.failedUrls.has(page.url)) continue;
+      await ftsDb.setPageHash(page.url, config.project, page.contentHash, page.chunkCount);
+      if (page.validators) await ftsDb.setPageValidators(page.url, page.validators);
+    }
+  }
 
-      totalChunks += batch.length;
-      console.log(`    Indexed batch of ${batch.length} chunks (total: ${totalChunks})`);
-    } catch (error) {
-      console.error(`    Failed to index batch:`, error instanceof Error ? error.message : error);
+  /**
+   * Record GitHub source state only after its chunks are written, so an
+   * interrupted run re-processes the files next time. Files whose chunks
+   * failed to write are stored as needing a retry.
+   */
+  async function saveGitHubStates(states: Array<GitHubSourceState | null>): Promise<void> {
+    await drainPipeline();
+    for (const state of states) {
+      if (state) await ftsDb.saveGitHubSourceState(retryFailedFiles(state, pipeline.failedUrls));
     }
   }
 
+  // One client for all GitHub sources, so they share the rate-limit budget
+  const githubClient = new GitHubClient({
+    token: config.githubToken,
+    concurrency: config.githubConcurrency
+  });
+
+  // Time spent outside the pipeline stages
+  let crawlMs = 0;
+  let parseMs = 0;
+
   // Crawl documentation (skip if --github-only)
   if (!config.githubOnly) {
     // Initialize crawler
@@ -222,13 +341,17 @@ async function main() {
       maxPages: config.maxPages,
       excludePatterns: config.excludePatterns,
       userAgent: config.userAgent,
-      useBrowser: config.useBrowser
+      useBrowser: config.useBrowser,
+      getValidators: url => ftsDb.getPageValidators(url)
     });
 
     console.log('\nStarting documentation crawl...\n');
 
     // Crawl and process pages with atomic re-indexing
+    let crawlWaitStart = Date.now();
     for await (const page of crawler.crawl()) {
+      crawlMs += Date.now() - crawlWaitStart;
+      const parseStart = Date.now();
       processedPages++;
       const elapsed = ((Date.now() - startTime) / 1000).toFixed(1);
       console.log(`[${elapsed}s] Processing (${processedPages}/${config.maxPages}): ${page.url}`);
@@ -236,6 +359,20 @@ async function main() {
       // Track this URL as visited
       visitedUrls.add(page.url);
 
+      // Server confirmed the page is unchanged (HTTP 304)
+      if (page.notModified) {
+        console.log(`  ⊘ Not modified (304), skipping`);
+        skippedPages++;
+        crawlWaitStart = Date.now();
+        continue;
+      }
+
+      const validators = {
+        etag: page.etag ?? null,
+        lastModified: page.lastModified ?? null,
+        links: page.links
+      };
+
       try {
         // Check content hash - skip if unchanged
         const contentHash = computeContentHash(page.html);
@@ -243,50 +380,51 @@ async function main() {
 
         if (existingHash === contentHash) {
           console.log(`  ⊘ Content unchanged, skipping`);
+          await ftsDb.setPageValidators(page.url, validators);
           skippedPages++;
           continue;
         }
 
-        // Content changed or new - delete old chunks first
-        if (existingHash) {
-          await vectorDb.deleteByUrl(page.url);
-          await ftsDb.deleteByUrl(page.url);
-          console.log(`  ↻ Content changed, deleted old chunks`);
-        }
-
         // Parse HTML into chunks with project identifier
         const rawChunks = parseDocumentation(page.url, page.html, config.project);
 
-        if (rawChunks.length === 0) {
-          console.log(`  ⚠ No content extracted, skipping`);
-          // Update hash even for empty pages to avoid re-processing
-          await ftsDb.setPageHash(page.url, config.project, contentHash, 0);
-          continue;
-        }
-
         // Apply semantic chunking
-        const chunks = chunkContent(rawChunks);
-        console.log(`  ✓ Extracted ${chunks.length} chunks`);
+        const chunks = rawChunks.length > 0 ? chunkContent(rawChunks) : [];
+        parseMs += Date.now() - parseStart;
 
-        // Add to pending batch
-        pendingChunks.push(...chunks);
+        // Content changed or new - old chunks are deleted before new ones are written
+        if (existingHash) {
+          console.log(`  ↻ Content changed, replacing old chunks`);
+        }
 
-        // Process batch if large enough
-        if (pendingChunks.length >= EMBEDDING_BATCH_SIZE) {
-          await processBatch();
+        if (chunks.length === 0) {
+          console.log(`  ⚠ No content extracted, skipping`);
+        } else {
+          console.log(`  ✓ Extracted ${chunks.length} chunks`);
         }
 
-        // Update page hash after successful processing
-        await ftsDb.setPageHash(page.url, config.project, contentHash, chunks.length);
+        // Hand off to the pipeline (waits here if downstream stages are saturated).
+        // Always replace: a page can have chunks but no hash if an earlier
+        // run stopped before recording it.
+        await pipeline.addPage(page.url, chunks, true);
+
+        // Record the hash once the chunks are written (also for empty pages
+        // to avoid re-processing)
+        pendingPages.push({ url: page.url, contentHash, chunkCount: chunks.length, validators });
+        if (pendingPages.length >= PAGE_RECORD_INTERVAL) {
+          await drainPipeline();
+        }
 
       } catch (error) {
         failedPages++;
         console.error(`  ✗ Error:`, error instanceof Error ? error.message : error);
+      } finally {
+        crawlWaitStart = Date.now();
       }
     }
 
-    // Process remaining chunks
-    await processBatch();
+    // Drain the pipeline before orphan detection reads the stores
+    await drainPipeline();
 
     // Mark orphaned chunks (pages not visited in this crawl)
     console.log('\nDetecting orphaned pages...');
@@ -303,9 +441,13 @@ async function main() {
     }
 
     // Un-orphan visited URLs that were previously orphaned
-    const revisitedUrls = Array.from(visitedUrls);
-    await vectorDb.markOrphaned(revisitedUrls, false);
-    await ftsDb.markOrphaned(revisitedUrls, false);
+    const previouslyOrphaned = await ftsDb.getOrphanedUrlsForProject(config.project);
+    const revisitedUrls = previouslyOrphaned.filter(url => visitedUrls.has(url));
+    if (revisitedUrls.length > 0) {
+      await vectorDb.markOrphaned(revisitedUrls, false);
+      await ftsDb.markOrphaned(revisitedUrls, false);
+      console.log(`  ✓ Restored ${revisitedUrls.length} previously orphaned URLs`);
+    }
 
   } else {
     console.log('\nSkipping documentation crawl (--github-only mode)');
@@ -332,53 +474,27 @@ async function main() {
           {
             openaiApiKey: config.openaiApiKey!,
             githubToken: config.githubToken,
-            dryRun: config.dryRun
+            dryRun: config.dryRun,
+            concurrency: config.githubSourceConcurrency,
+            client: githubClient,
+            stateStore: ftsDb
           }
         );
 
         // Index all chunks from all sources with atomic re-indexing
         for (const result of results) {
-          if (result.chunks.length > 0) {
-            console.log(`\nIndexing ${result.chunks.length} chunks from ${result.sourceId}...`);
-
-            // Get unique URLs from new chunks and delete old chunks for those URLs
-            const newUrls = [...new Set(result.chunks.map(c => c.url))];
-            console.log(`  Deleting old chunks for ${newUrls.length} URLs...`);
-            for (const url of newUrls) {
-              await vectorDb.deleteByUrl(url);
-              await ftsDb.deleteByUrl(url);
-              visitedUrls.add(url);
-            }
-
-            // Process in batches
-            for (let i = 0; i < result.chunks.length; i += EMBEDDING_BATCH_SIZE) {
-              const batch = result.chunks.slice(i, i + EMBEDDING_BATCH_SIZE);
-
-              const embeddings = await generateEmbeddings(
-                batch.map(c => c.content),
-                config.openaiApiKey!
-              );
-
-              await vectorDb.upsert(batch, embeddings);
-              await ftsDb.upsert(batch);
-
-              totalChunks += batch.length;
-              console.log(`  Indexed batch ${Math.floor(i / EMBEDDING_BATCH_SIZE) + 1}/${Math.ceil(result.chunks.length / EMBEDDING_BATCH_SIZE)}`);
-            }
-
-            // Update page hashes for GitHub files
-            for (const url of newUrls) {
-              const chunkCount = result.chunks.filter(c => c.url === url).length;
-              await ftsDb.setPageHash(url, config.project, `github:${result.sourceId}:${url}`, chunkCount);
-            }
-          }
+          await indexGitHubSource(result.sourceId, result);
 
           console.log(`\nSource ${result.sourceId} stats:`);
           console.log(`  Files: ${result.stats.totalFiles}`);
           console.log(`  Indexed: ${result.stats.indexed}`);
           console.log(`  Skipped: ${result.stats.skipped}`);
+          console.log(`  Unchanged: ${result.stats.unchanged}`);
+          console.log(`  Removed: ${result.stats.removed}`);
         }
 
+        await saveGitHubStates(results.map(r => r.state));
+
         console.log(`\n✓ Intelligent GitHub scraping complete`);
       } catch (error) {
         console.error('⚠ Intelligent GitHub scraping failed:', error instanceof Error ? error.message : error);
@@ -391,48 +507,17 @@ async function main() {
     console.log('='.repeat(60));
 
     try {
-      const sourceChunks = await scrapeGitHubSource({
+      const result = await scrapeGitHubSource({
         config: config.github,
         token: config.githubToken,
-        project: config.project
+        project: config.project,
+        client: githubClient,
+        previousState: await ftsDb.getGitHubSourceState(legacyGitHubSourceId(config.project))
       });
 
-      if (sourceChunks.length > 0) {
-        console.log(`\nIndexing ${sourceChunks.length} source code chunks...`);
-
-        // Get unique URLs from new chunks and delete old chunks for those URLs
-        const newUrls = [...new Set(sourceChunks.map(c => c.url))];
-        console.log(`  Deleting old chunks for ${newUrls.length} URLs...`);
-        for (const url of newUrls) {
-          await vectorDb.deleteByUrl(url);
-          await ftsDb.deleteByUrl(url);
-          visitedUrls.add(url);
-        }
-
-        // Process in batches
-        for (let i = 0; i < sourceChunks.length; i += EMBEDDING_BATCH_SIZE) {
-          const batch = sourceChunks.slice(i, i + EMBEDDING_BATCH_SIZE);
-
-          const embeddings = await generateEmbeddings(
-            batch.map(c => c.content),
-            config.openaiApiKey!
-          );
-
-          await vectorDb.upsert(batch, embeddings);
-          await ftsDb.upsert(batch);
-
-          totalChunks += batch.length;
-          console.log(`  Indexed source batch ${Math.floor(i / EMBEDDING_BATCH_SIZE) + 1}/${Math.ceil(sourceChunks.length / EMBEDDING_BATCH_SIZE)}`);
-        }
-
-        // Update page hashes for GitHub files
-        for (const url of newUrls) {
-          const chunkCount = sourceChunks.filter(c => c.url === url).length;
-          await ftsDb.setPageHash(url, config.project, `github:legacy:${url}`, chunkCount);
-        }
-
-        console.log(`  ✓ Source code indexing complete`);
-      }
+      await indexGitHubSource('legacy', result);
+      await saveGitHubStates([result.state]);
+      console.log(`  ✓ Source code indexing complete (${result.unchangedUrls.length} files unchanged)`);
     } catch (error) {
       console.error('  ⚠ GitHub source scraping failed:', error instanceof Error ? error.message : error);
       console.error('  Continuing without source code...');
@@ -440,7 +525,9 @@ async function main() {
   }
 
   // Summary
+  const ingestStats = await pipeline.finish();
   const totalTime = ((Date.now() - startTime) / 1000).toFixed(1);
+  pipeline.printStats('Ingestion', { crawl: crawlMs, 'parse/chunk': parseMs });
 
   console.log('\n' + '='.repeat(60));
   console.log('Scraping Complete!');
@@ -449,21 +536,35 @@ async function main() {
   console.log(`  Docs crawled: ${config.githubOnly ? 'skipped' : `${processedPages} pages (${skippedPages} unchanged, ${failedPages} failed)`}`);
   console.log(`  GitHub mode: ${useIntelligentScraper ? 'intelligent (registry)' : config.github ? 'legacy' : 'disabled'}`);
   console.log(`  Dry run: ${config.dryRun ? 'yes' : 'no'}`);
-  console.log(`  Total chunks indexed: ${totalChunks}`);
+  console.log(`  Total chunks indexed: ${ingestStats.chunksIndexed}`);
   console.log(`  Total time: ${totalTime}s`);
   console.log('='.repeat(60));
 
-  await ftsDb.close();
-  await vectorDb.close();
+  await closeStores?.();
+}
+
+/**
+ * Close the stores (writing the local vector file) and exit
+ */
+async function exitAfterClosingStores(code: number): Promise<never> {
+  try {
+    await closeStores?.();
+  } catch (error) {
+    console.error('Failed to close stores:', error instanceof Error ? error.message : error);
+  }
+  process.exit(code);
 }
 
-// Handle graceful shutdown
+// Handle graceful shutdown (a second Ctrl+C exits immediately)
+let interrupted = false;
 process.on('SIGINT', () => {
-  console.log('\n\nInterrupted. Exiting...');
-  process.exit(0);
+  if (interrupted) process.exit(130);
+  interrupted = true;
+  console.log('\n\nInterrupted. Saving stores and exiting...');
+  void exitAfterClosingStores(0);
 });
 
 main().catch(error => {
   console.error('Fatal error:', error);
-  process.exit(1);
+  void exitAfterClosingStores(1);
 });
@@ -0,0 +1,362 @@
+/**
+ * Ingestion Pipeline
+ *
+ * Staged, pipelined indexing: pages are parsed/chunked by the caller and
+ * handed to the pipeline, which batches chunks, generates embeddings with
+ * several batches in flight, and writes to the vector store + SQLite.
+ *
+ *   addPage() → [chunk queue] → embed workers → [write queue] → writer
+ *
+ * Stages are connected by bounded queues, so a slow stage applies
+ * backpressure all the way back to the crawl loop. Old chunks for
+ * re-indexed URLs are removed with set-based deletes issued by the
+ * writer right before it writes, so they never race the new chunks.
+ */
+
+import type { DocumentChunk, VectorStore, FullTextDB, EmbedFunction } from '@mina-docs/shared';
+
+export interface IngestPipelineOptions {
+  vectorDb: VectorStore;
+  ftsDb: FullTextDB;
+  embed: EmbedFunction;
+  /** Chunks per embeddings call. Default: 100 */
+  batchSize?: number;
+  /** Embedding batches in flight at once. Default: 4 */
+  embedConcurrency?: number;
+  /** Capacity of each inter-stage queue, in batches. Default: 8 */
+  queueCapacity?: number;
+  /** Retries for rate-limited or failed embedding calls. Default: 5 */
+  maxRetries?: number;
+}
+
+export interface IngestStats {
+  pages: number;
+  chunksQueued: number;
+  chunksIndexed: number;
+  chunksFailed: number;
+  embedBatches: number;
+  embedRetries: number;
+  deleteCalls: number;
+  writeCalls: number;
+  /** Busy time per stage in milliseconds */
+  embedMs: number;
+  writeMs: number;
+}
+
+interface EmbeddedBatch {
+  chunks: DocumentChunk[];
+  embeddings: number[][];
+}
+
+/**
+ * Async FIFO with a fixed capacity: push waits when full, shift waits when empty
+ */
+class BoundedQueue<T> {
+  private items: T[] = [];
+  private closed = false;
+  private pushWaiters: Array<() => void> = [];
+  private shiftWaiters: Array<() => void> = [];
+
+  constructor(private capacity: number) {}
+
+  async push(item: T): Promise<void> {
+    while (this.items.length >= this.capacity) {
+      await new Promise<void>(resolve => this.pushWaiters.push(resolve));
+    }
+    this.items.push(item);
+    this.shiftWaiters.shift()?.();
+  }
+
+  /**
+   * Returns undefined once the queue is closed and drained
+   */
+  async shift(): Promise<T | undefined> {
+    while (this.items.length === 0) {
+      if (this.closed) return undefined;
+      await new Promise<void>(resolve => this.shiftWaiters.push(resolve));
+    }
+    const item = this.items.shift();
+    this.pushWaiters.shift()?.();
+    return item;
+  }
+
+  close(): void {
+    this.closed = true;
+    for (const wake of this.shiftWaiters.splice(0)) wake();
+  }
+}
+
+const DEFAULT_BATCH_SIZE = 100;
+const DEFAULT_EMBED_CONCURRENCY = 4;
+const DEFAULT_QUEUE_CAPACITY = 8;
+const DEFAULT_MAX_RETRIES = 5;
+
+export class IngestPipeline {
+  private batchSize: number;
+  private maxRetries: number;
+  private embedQueue: BoundedQueue<DocumentChunk[]>;
+  private writeQueue: BoundedQueue<EmbeddedBatch>;
+  private pendingChunks: DocumentChunk[] = [];
+  private pendingDeletes = new Set<string>();
+  private failed = new Set<string>();
+  private inFlightBatches = 0;
+  private idleWaiters: Array<() => void> = [];
+  private embedWorkers: Promise<void>[];
+  private writer: Promise<void>;
+  private startTime = Date.now();
+
+  private counters: IngestStats = {
+    pages: 0,
+    chunksQueued: 0,
+    chunksIndexed: 0,
+    chunksFailed: 0,
+    embedBatches: 0,
+    embedRetries: 0,
+    deleteCalls: 0,
+    writeCalls: 0,
+    embedMs: 0,
+    writeMs: 0
+  };
+
+  constructor(private options: IngestPipelineOptions) {
+    this.batchSize = options.batchSize ?? DEFAULT_BATCH_SIZE;
+    this.maxRetries = options.maxRetries ?? DEFAULT_MAX_RETRIES;
+
+    const capacity = options.queueCapacity ?? DEFAULT_QUEUE_CAPACITY;
+    this.embedQueue = new BoundedQueue(capacity);
+    this.writeQueue = new BoundedQueue(capacity);
+
+    const workers = options.embedConcurrency ?? DEFAULT_EMBED_CONCURRENCY;
+    this.embedWorkers = Array.from({ length: workers }, () => this.runEmbedWorker());
+    this.writer = this.runWriter();
+  }
+
+  /**
+   * Queue one page's chunks for indexing.
+   * When replace is set, existing chunks for the URL are deleted before
+   * any of the new chunks are written. Resolves once the chunks are
+   * accepted (this is where backpressure is applied).
+   */
+  async addPage(url: string, chunks: DocumentChunk[], replace: boolean): Promise<void> {
+    this.counters.pages++;
+    if (replace) {
+      this.pendingDeletes.add(url);
+    }
+    await this.addChunks(chunks);
+  }
+
+  /**
+   * Queue chunks for indexing without deleting anything first
+   */
+  async addChunks(chunks: DocumentChunk[]): Promise<void> {
+    this.counters.chunksQueued += chunks.length;
+    this.pendingChunks.push(...chunks);
+
+    while (this.pendingChunks.length >= this.batchSize) {
+      await this.submit(this.pendingChunks.splice(0, this.batchSize));
+    }
+  }
+
+  /**
+   * Send any partial batch and wait until everything queued so far is
+   * written and durable, so callers can record page hashes or source
+   * state afterwards. The pipeline stays open for more pages.
+   */
+  async flush(): Promise<void> {
+    if (this.pendingChunks.length > 0) {
+      await this.submit(this.pendingChunks.splice(0));
+    }
+
+    while (this.inFlightBatches > 0) {
+      await new Promise<void>(resolve => this.idleWaiters.push(resolve));
+    }
+
+    // Deletes registered for pages that produced no chunks
+    await this.flushDeletes();
+
+    // The local vector store only writes its file on flush
+    await this.options.vectorDb.flush();
+  }
+
+  /**
+   * Flush everything, stop the stage workers, and return stats
+   */
+  async finish(): Promise<IngestStats> {
+    await this.flush();
+
+    this.embedQueue.close();
+    await Promise.all(this.embedWorkers);
+    this.writeQueue.close();
+    await this.writer;
+
+    return this.stats;
+  }
+
+  get stats(): IngestStats {
+    return { ...this.counters };
+  }
+
+  /**
+   * URLs with chunks that failed to embed or write (or whose old chunks
+   * failed to delete) so far. Their page hashes and source state must not
+   * be recorded as indexed.
+   */
+  get failedUrls(): ReadonlySet<string> {
+    return this.failed;
+  }
+
+  /**
+   * Print end-of-run throughput
+   */
+  printStats(label: string, extraStages: Record<string, number> = {}): void {
+    const elapsedSec = Math.max((Date.now() - this.startTime) / 1000, 0.001);
+    const s = this.counters;
+
+    console.log(`\n${label} throughput:`);
+    console.log(`  Pages: ${s.pages} (${(s.pages / elapsedSec).toFixed(2)} pages/s)`);
+    console.log(`  Chunks: ${s.chunksIndexed} indexed, ${s.chunksFailed} failed (${(s.chunksIndexed / elapsedSec).toFixed(1)} chunks/s)`);
+    console.log(`  Store calls: ${s.embedBatches} embed, ${s.writeCalls} write, ${s.deleteCalls} delete (${s.embedRetries} embed retries)`);
+    console.log(`  Stage time:`);
+    for (const [stage, ms] of Object.entries(extraStages)) {
+      console.log(`    ${stage.padEnd(12)} ${(ms / 1000).toFixed(1)}s`);
+    }
+    console.log(`    ${'embed'.padEnd(12)} ${(s.embedMs / 1000).toFixed(1)}s (summed across ${this.embedWorkers.length} workers)`);
+    console.log(`    ${'write'.padEnd(12)} ${(s.writeMs / 1000).toFixed(1)}s`);
+  }
+
+  private async submit(chunks: DocumentChunk[]): Promise<void> {
+    this.inFlightBatches++;
+    await this.embedQueue.push(chunks);
+  }
+
+  private batchDone(): void {
+    this.inFlightBatches--;
+    if (this.inFlightBatches === 0) {
+      for (const wake of this.idleWaiters.splice(0)) wake();
+    }
+  }
+
+  private async runEmbedWorker(): Promise<void> {
+    while (true) {
+      const chunks = await this.embedQueue.shift();
+      if (!chunks) return;
+
+      const start = Date.now();
+      try {
+        const embeddings = await this.embedWithRetry(chunks.map(c => c.content));
+        this.counters.embedBatches++;
+        this.counters.embedMs += Date.now() - start;
+        await this.writeQueue.push({ chunks, embeddings });
+      } catch (error) {
+        this.counters.embedMs += Date.now() - start;
+        this.counters.chunksFailed += chunks.length;
+        this.markFailed(chunks);
+        console.error(`    Failed to embed batch of ${chunks.length} chunks:`, error instanceof Error ? error.message : error);
+        this.batchDone();
+      }
+    }
+  }
+
+  private async runWriter(): Promise<void> {
+    while (true) {
+      const batch = await this.writeQueue.shift();
+      if (!batch) return;
+
+      const start = Date.now();
+      try {
+        await this.flushDeletes();
+        await this.options.vectorDb.upsert(batch.chunks, batch.embeddings, { wait: false });
+        await this.options.ftsDb.upsert(batch.chunks);
+        this.counters.writeCalls++;
+        this.counters.chunksIndexed += batch.chunks.length;
+        console.log(`    Indexed batch of ${batch.chunks.length} chunks (total: ${this.counters.chunksIndexed})`);
+      } catch (error) {
+        this.counters.chunksFailed += batch.chunks.length;
+        this.markFailed(batch.chunks);
+        console.error(`    Failed to index batch:`, error instanceof Error ? error.message : error);
+      }
+      this.counters.writeMs += Date.now() - start;
+      this.batchDone();
+    }
+  }
+
+  /**
+   * Delete old chunks for every URL registered so far, in one call per store
+   */
+  private async flushDeletes(): Promise<void> {
+    if (this.pendingDeletes.size === 0) return;
+
+    const urls = Array.from(this.pendingDeletes);
+    this.pendingDeletes.clear();
+
+    try {
+      await this.options.vectorDb.deleteByUrls(urls);
+      await this.options.ftsDb.deleteByUrls(urls);
+    } catch (error) {
+      urls.forEach(url => this.failed.add(url));
+      throw error;
+    }
+    this.counters.deleteCalls++;
+  }
+
+  private markFailed(chunks: DocumentChunk[]): void {
+    for (const chunk of chunks) {
+      this.failed.add(chunk.url);
+    }
+  }
+
+  private async embedWithRetry(texts: string[]): Promise<number[][]> {
+    let attempt = 0;
+
+    while (true) {
+      try {
+        return await this.options.embed(texts);
+      } catch (error) {
+        if (attempt >= this.maxRetries || !isRetryable(error)) {
+          throw error;
+        }
+
+        const waitMs = retryDelayMs(error, attempt);
+        attempt++;
+        this.counters.embedRetries++;
+        console.warn(`    Embedding request failed (${describeError(error)}), retrying in ${waitMs}ms (attempt ${attempt}/${this.maxRetries})`);
+        await new Promise(resolve => setTimeout(resolve, waitMs));
+      }
+    }
+  }
+}
+
+function errorStatus(error: unknown): number | undefined {
+  const status = (error as { status?: unknown })?.status;
+  return typeof status === 'number' ? status : undefined;
+}
+
+function describeError(error: unknown): string {
+  const status = errorStatus(error);
+  if (status) return `HTTP ${status}`;
+  return error instanceof Error ? error.message : String(error);
+}
+
+/**
+ * Rate limits, server errors and network failures are worth retrying
+ */
+function isRetryable(error: unknown): boolean {
+  const status = errorStatus(error);
+  if (status === undefined) return true;
+  return status === 408 || status === 409 || status === 429 || status >= 500;
+}
+
+/**
+ * Honor Retry-After when the API sends it, otherwise back off exponentially
+ */
+function retryDelayMs(error: unknown, attempt: number): number {
+  const headers = (error as { headers?: Record<string, string | undefined> })?.headers;
+  const retryAfter = headers?.['retry-after'];
+  if (retryAfter) {
+    const seconds = parseFloat(retryAfter);
+    if (!isNaN(seconds)) return Math.ceil(seconds * 1000);
+  }
+
+  const base = 1000 * Math.pow(2, attempt);
+  return base + Math.floor(Math.random() * 250);
+}
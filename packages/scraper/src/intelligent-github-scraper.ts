@@ -9,11 +9,30 @@
  * 4. LLM relevance validation
  *
  * Only indexes code that passes all quality gates.
+ *
+ * Scraping is incremental: blob SHAs and verdicts from the previous run
+ * are compared with the current tree, only new or modified files are
+ * downloaded (one tarball per commit) and assessed, and sources run
+ * concurrently on a shared GitHub rate-limit budget.
  */
 
 import { randomUUID } from 'crypto';
-import type { DocumentChunk, GitHubSourceEntry, TrustLevel } from '@mina-docs/shared';
+import type {
+  DocumentChunk,
+  GitHubFileState,
+  GitHubSourceEntry,
+  GitHubSourceState,
+  TrustLevel
+} from '@mina-docs/shared';
 import { minimatch } from 'minimatch';
+import pLimit from 'p-limit';
+import { GitHubClient, type GitHubTreeEntry } from './github-client.js';
+import {
+  diffTree,
+  sourceConfigHash,
+  type ChangedFile,
+  type GitHubStateStore,
+} from './github-state.js';
 import {
   assessDocumentation,
   assessLLMRelevance,
@@ -24,29 +43,12 @@ import {
 import {
   fetchReadmeContext,
   isExampleProject,
+  readmeCandidates,
   type ReadmeContext,
 } from './readme-extractor.js';
 
-interface GitHubTreeItem {
-  path: string;
-  mode: string;
-  type: 'blob' | 'tree';
-  sha: string;
-  size?: number;
-  url: string;
-}
-
-interface GitHubTreeResponse {
-  sha: string;
-  url: string;
-  tree: GitHubTreeItem[];
-  truncated: boolean;
-}
-
-interface GitHubContent {
-  content: string;
-  encoding: string;
-}
+// Bump when parsing/assessment changes so stored verdicts are discarded
+const STATE_VERSION = 'intelligent-v1';
 
 interface RepoMetadata {
   stars: number;
@@ -62,6 +64,8 @@ export interface IntelligentScraperOptions {
   openaiApiKey: string;
   githubToken?: string;
   dryRun?: boolean; // If true, don't call LLM, just log what would be indexed
+  client?: GitHubClient; // Shared client (and rate-limit budget); created from githubToken if omitted
+  previousState?: GitHubSourceState | null; // State stored by the last run, for incremental scraping
 }
 
 export interface ScrapeResult {
@@ -74,39 +78,63 @@ export interface ScrapeResult {
     llmScore: number;
     exampleDescription: string;
   };
+  url?: string;
+  unchanged?: boolean; // Same blob and README as last run; nothing was fetched or assessed
+  removed?: boolean; // Previously indexed; existing chunks for url must be deleted
 }
 
 export interface ScrapeStats {
   totalFiles: number;
   indexed: number;
   skipped: number;
+  unchanged: number;
+  removed: number;
   skipReasons: Record<string, number>;
 }
 
+export interface SourceScrapeResult {
+  sourceId: string;
+  chunks: DocumentChunk[];
+  stats: ScrapeStats;
+  unchangedUrls: string[]; // Indexed files whose chunks are still current
+  removedUrls: string[]; // URLs whose chunks must be deleted
+  state: GitHubSourceState | null; // Store once the chunks are indexed (null: store nothing)
+}
+
 export class IntelligentGitHubScraper {
   private source: GitHubSourceEntry;
   private project: string;
   private openaiApiKey: string;
   private dryRun: boolean;
-  private baseApiUrl: string;
-  private headers: Record<string, string>;
+  private client: GitHubClient;
+  private previousState: GitHubSourceState | null;
+  private configHash: string;
   private readmeCache: Map<string, ReadmeContext | null> = new Map();
   private repoMetadata: RepoMetadata | null = null;
 
+  // Per-run state
+  private commitSha: string | null = null;
+  private treeShas: Map<string, string> = new Map();
+  private archive: Map<string, string> = new Map();
+  private nextFiles: GitHubFileState[] = [];
+  private treeRead = false;
+  private incomplete = false;
+
   constructor(options: IntelligentScraperOptions) {
     this.source = options.source;
     this.project = options.project;
     this.openaiApiKey = options.openaiApiKey;
     this.dryRun = options.dryRun || false;
-    this.baseApiUrl = `https://api.github.com/repos/${this.source.repo}`;
-    this.headers = {
-      'Accept': 'application/vnd.github.v3+json',
-      'User-Agent': 'crypto-docs-scraper',
-    };
-
-    if (options.githubToken) {
-      this.headers['Authorization'] = `token ${options.githubToken}`;
-    }
+    this.client = options.client ?? new GitHubClient({ token: options.githubToken });
+    this.previousState = options.previousState ?? null;
+    this.configHash = sourceConfigHash(STATE_VERSION, {
+      project: this.project,
+      branch: this.source.branch,
+      repoType: this.source.repoType,
+      trustLevel: this.source.trustLevel,
+      scrapeStrategy: this.source.scrapeStrategy,
+      qualityThresholds: this.source.qualityThresholds,
+    });
   }
 
   /**
@@ -116,17 +144,7 @@ export class IntelligentGitHubScraper {
     if (this.repoMetadata) return this.repoMetadata;
 
     try {
-      const response = await fetch(this.baseApiUrl, { headers: this.headers });
-      if (!response.ok) return null;
-
-      const data = await response.json();
-      this.repoMetadata = {
-        stars: data.stargazers_count,
-        forks: data.forks_count,
-        lastCommit: data.pushed_at,
-        topics: data.topics || [],
-        isArchived: data.archived,
-      };
+      this.repoMetadata = await this.client.getRepo(this.source.repo);
       return this.repoMetadata;
     } catch {
       return null;
@@ -134,48 +152,32 @@ export class IntelligentGitHubScraper {
   }
 
   /**
-   * List all files in the repository
+   * File content from the downloaded archive, falling back to the
+   * contents API for files the tree lists but the archive lacked
    */
-  async listAllFiles(): Promise<string[]> {
-    try {
-      const url = `${this.baseApiUrl}/git/trees/${this.source.branch}?recursive=1`;
-      const response = await fetch(url, { headers: this.headers });
-
-      if (!response.ok) {
-        console.error(`  Failed to list files: ${response.status}`);
-        return [];
-      }
+  async fetchFile(path: string): Promise<string | null> {
+    const archived = this.archive.get(path);
+    if (archived !== undefined) return archived;
+    if (!this.commitSha || !this.treeShas.has(path)) return null;
 
-      const data = await response.json() as GitHubTreeResponse;
-      return data.tree
-        .filter(item => item.type === 'blob')
-        .map(item => item.path);
-    } catch (error) {
-      console.error('  Error listing files:', error);
-      return [];
+    try {
+      return await this.client.getFileContent(this.source.repo, path, this.commitSha);
+    } catch {
+      return null;
     }
   }
 
   /**
-   * Fetch file content from GitHub
+   * Blob SHA of the README a file is assessed with (the first README
+   * candidate present in the tree), part of the file's fingerprint
    */
-  async fetchFile(path: string): Promise<string | null> {
-    try {
-      const url = `${this.baseApiUrl}/contents/${path}?ref=${this.source.branch}`;
-      const response = await fetch(url, { headers: this.headers });
-
-      if (!response.ok) {
-        return null;
-      }
+  private readmeShaFor(filePath: string): string | null {
+    const readme = readmeCandidates(filePath).find(p => this.treeShas.has(p));
+    return readme ? this.treeShas.get(readme)! : null;
+  }
 
-      const data = await response.json() as GitHubContent;
-      if (data.encoding === 'base64') {
-        return Buffer.from(data.content, 'base64').toString('utf-8');
-      }
-      return data.content;
-    } catch {
-      return null;
-    }
+  private fileUrl(path: string): string {
+    return `https://github.com/${this.source.repo}/blob/${this.source.branch}/${path}`;
   }
 
   /**
@@ -374,7 +376,7 @@ export class IntelligentGitHubScraper {
     if (content.length > 100) {
       chunks.push({
         id: randomUUID(),
-        url: `https://github.com/${this.source.repo}/blob/${this.source.branch}/${path}`,
+        url: this.fileUrl(path),
         title: `${repoName}: ${fileName}`,
         section: fileName,
         content: content.slice(0, 8000), // Larger limit for complete examples
@@ -437,6 +439,56 @@ export class IntelligentGitHubScraper {
     }
   }
 
+  /**
+   * Download the changed files, plus the READMEs they are assessed with,
+   * in one archive request
+   */
+  private async downloadChanged(changed: ChangedFile[]): Promise<void> {
+    const wanted = new Set<string>();
+    for (const file of changed) {
+      wanted.add(file.path);
+      for (const readme of readmeCandidates(file.path)) {
+        if (this.treeShas.has(readme)) wanted.add(readme);
+      }
+    }
+
+    try {
+      const start = Date.now();
+      this.archive = await this.client.downloadFiles(this.source.repo, this.commitSha!, path => wanted.has(path));
+      console.log(`Downloaded ${this.archive.size} files from ${this.commitSha!.slice(0, 7)} in one archive (${((Date.now() - start) / 1000).toFixed(1)}s)`);
+    } catch (error) {
+      console.error('  Archive download failed, falling back to per-file fetches:', error instanceof Error ? error.message : error);
+    }
+  }
+
+  private fileState(
+    file: ChangedFile,
+    verdict: GitHubFileState['verdict'],
+    reason: string | null,
+    chunkCount: number
+  ): GitHubFileState {
+    return {
+      path: file.path,
+      blobSha: file.blobSha,
+      readmeSha: file.readmeSha,
+      verdict,
+      reason,
+      url: this.fileUrl(file.path),
+      chunkCount,
+    };
+  }
+
+  private unchangedResult(file: GitHubFileState): ScrapeResult {
+    return {
+      path: file.path,
+      chunks: [],
+      skipped: file.verdict !== 'indexed',
+      skipReason: file.reason ?? undefined,
+      url: file.url,
+      unchanged: true,
+    };
+  }
+
   /**
    * Main scrape method with quality pipeline
    */
@@ -455,30 +507,88 @@ export class IntelligentGitHubScraper {
       }
     }
 
-    // List all files
-    const allFiles = await this.listAllFiles();
-    console.log(`\nFound ${allFiles.length} total files`);
+    let treeSha: string;
+    try {
+      const ref = await this.client.resolveCommit(this.source.repo, this.source.branch);
+      this.commitSha = ref.commitSha;
+      treeSha = ref.treeSha;
+    } catch (error) {
+      console.error(`  Failed to resolve ${this.source.branch}:`, error instanceof Error ? error.message : error);
+      return;
+    }
 
-    let processed = 0;
-    let indexed = 0;
-    let skipped = 0;
+    const previous = this.previousState;
+    const settingsChanged = previous !== null && previous.configHash !== this.configHash;
+    if (settingsChanged) {
+      console.log('Scrape settings changed since last run, re-assessing all files');
+    }
 
-    for (const filePath of allFiles) {
-      processed++;
+    // Same commit and settings: every stored verdict still applies
+    if (previous && !settingsChanged && previous.commitSha === this.commitSha) {
+      console.log(`\n[${this.source.id}] Unchanged since last run (${this.commitSha.slice(0, 7)}), nothing to fetch`);
+      this.treeRead = true;
+      this.nextFiles = [...previous.files];
+      for (const file of previous.files) {
+        yield this.unchangedResult(file);
+      }
+      return;
+    }
 
-      // Stage 1: Directory filtering
-      const dirFilter = this.shouldScrapeFile(filePath);
+    let entries: GitHubTreeEntry[];
+    try {
+      entries = await this.client.getTree(this.source.repo, treeSha);
+    } catch (error) {
+      console.error('  Error listing files:', error instanceof Error ? error.message : error);
+      return;
+    }
+    this.treeRead = true;
+    this.treeShas = new Map(entries.map(e => [e.path, e.sha]));
+    console.log(`\nFound ${entries.length} total files at ${this.commitSha.slice(0, 7)}`);
+
+    // Stage 1: Directory filtering (needs no content)
+    const candidates: GitHubTreeEntry[] = [];
+    for (const entry of entries) {
+      const dirFilter = this.shouldScrapeFile(entry.path);
       if (!dirFilter.pass) {
-        skipped++;
-        yield { path: filePath, chunks: [], skipped: true, skipReason: dirFilter.reason };
+        yield { path: entry.path, chunks: [], skipped: true, skipReason: dirFilter.reason };
         continue;
       }
+      candidates.push(entry);
+    }
+
+    const diff = diffTree(candidates, previous, this.configHash, path => this.readmeShaFor(path));
+    console.log(`[${this.source.id}] ${candidates.length} candidates: ${diff.changed.length} new or changed, ${diff.unchanged.length} unchanged, ${diff.removed.length} removed`);
 
-      console.log(`\n[${processed}/${allFiles.length}] Evaluating: ${filePath}`);
+    for (const file of diff.unchanged) {
+      this.nextFiles.push(file);
+      yield this.unchangedResult(file);
+    }
+
+    for (const file of diff.removed) {
+      yield { path: file.path, chunks: [], skipped: true, skipReason: 'No longer in repository or filtered out', url: file.url, removed: true };
+    }
+
+    if (diff.changed.length > 0) {
+      await this.downloadChanged(diff.changed);
+    }
+
+    let processed = 0;
+    let indexed = 0;
+    let skipped = 0;
+
+    for (const file of diff.changed) {
+      processed++;
+      const filePath = file.path;
+      const url = this.fileUrl(filePath);
+      const wasIndexed = file.previous?.verdict === 'indexed';
+
+      console.log(`\n[${this.source.id}] [${processed}/${diff.changed.length}] Evaluating: ${filePath}`);
 
-      // Fetch file content
       const content = await this.fetchFile(filePath);
-      if (!content) {
+      if (content === null) {
+        // Keep the old verdict (and chunks); the file is retried next run
+        this.incomplete = true;
+        if (file.previous) this.nextFiles.push(file.previous);
         skipped++;
         yield { path: filePath, chunks: [], skipped: true, skipReason: 'Failed to fetch' };
         continue;
@@ -492,7 +602,16 @@ export class IntelligentGitHubScraper {
       if (!quality.shouldIndex) {
         console.log(`  ✗ Skipped: ${quality.rejectionReason}`);
         skipped++;
-        yield { path: filePath, chunks: [], skipped: true, skipReason: quality.rejectionReason };
+
+        if (quality.llmResult?.failed) {
+          // Not a verdict: keep the old state and retry next run
+          this.incomplete = true;
+          if (file.previous) this.nextFiles.push(file.previous);
+          yield { path: filePath, chunks: [], skipped: true, skipReason: quality.rejectionReason };
+        } else {
+          this.nextFiles.push(this.fileState(file, 'rejected', quality.rejectionReason ?? null, 0));
+          yield { path: filePath, chunks: [], skipped: true, skipReason: quality.rejectionReason, url, removed: wasIndexed };
+        }
         continue;
       }
 
@@ -503,43 +622,75 @@ export class IntelligentGitHubScraper {
       // Parse and enrich chunks
       const chunks = this.parseSourceFile(filePath, content);
       this.enrichChunks(chunks, quality);
+      this.nextFiles.push(this.fileState(file, 'indexed', null, chunks.length));
 
       indexed++;
       yield {
         path: filePath,
         chunks,
         skipped: false,
+        url,
+        removed: wasIndexed && chunks.length === 0,
         qualityMetrics: {
           documentationScore: docScore,
           llmScore,
           exampleDescription: quality.llmResult?.exampleDescription || 'N/A',
         },
       };
-
-      // Rate limiting
-      await new Promise(resolve => setTimeout(resolve, 500));
     }
 
     console.log(`\n${'='.repeat(60)}`);
-    console.log(`Completed: ${indexed} indexed, ${skipped} skipped`);
+    console.log(`Completed ${this.source.id}: ${indexed} indexed, ${skipped} skipped, ${diff.unchanged.length} unchanged, ${diff.removed.length} removed`);
     console.log(`${'='.repeat(60)}\n`);
   }
 
+  /**
+   * State to store once this run's chunks are indexed. Null when the tree
+   * could not be read or in dry runs (no LLM verdicts to keep).
+   */
+  getState(): GitHubSourceState | null {
+    if (!this.commitSha || !this.treeRead || this.dryRun) return null;
+
+    return {
+      sourceId: this.source.id,
+      repo: this.source.repo,
+      // Without a commit, the next run re-diffs the tree and retries failed files
+      commitSha: this.incomplete ? '' : this.commitSha,
+      configHash: this.configHash,
+      files: this.nextFiles,
+    };
+  }
+
   /**
    * Convenience method to scrape and collect all chunks
    */
-  async scrapeAll(): Promise<{ chunks: DocumentChunk[]; stats: ScrapeStats }> {
+  async scrapeAll(): Promise<Omit<SourceScrapeResult, 'sourceId'>> {
     const chunks: DocumentChunk[] = [];
+    const unchangedUrls: string[] = [];
+    const removedUrls: string[] = [];
     const stats: ScrapeStats = {
       totalFiles: 0,
       indexed: 0,
       skipped: 0,
+      unchanged: 0,
+      removed: 0,
       skipReasons: {},
     };
 
     for await (const result of this.scrape()) {
       stats.totalFiles++;
 
+      if (result.unchanged) {
+        stats.unchanged++;
+        if (!result.skipped && result.url) unchangedUrls.push(result.url);
+        continue;
+      }
+
+      if (result.removed && result.url) {
+        stats.removed++;
+        removedUrls.push(result.url);
+      }
+
       if (result.skipped) {
         stats.skipped++;
         const reason = result.skipReason || 'Unknown';
@@ -550,50 +701,63 @@ export class IntelligentGitHubScraper {
       }
     }
 
-    return { chunks, stats };
+    return { chunks, stats, unchangedUrls, removedUrls, state: this.getState() };
   }
 }
 
 /**
- * Scrape all GitHub sources for a project
+ * Scrape all GitHub sources for a project. Sources run concurrently and
+ * share one GitHub client, so they draw on a single rate-limit budget.
  */
 export async function scrapeProjectGitHubSources(
   projectId: string,
   sources: GitHubSourceEntry[],
-  options: { openaiApiKey: string; githubToken?: string; dryRun?: boolean }
-): Promise<{ sourceId: string; chunks: DocumentChunk[]; stats: ScrapeStats }[]> {
-  const results = [];
+  options: {
+    openaiApiKey: string;
+    githubToken?: string;
+    dryRun?: boolean;
+    concurrency?: number; // Sources scraped at once. Default: 2
+    client?: GitHubClient;
+    stateStore?: GitHubStateStore; // Previous per-source state, for incremental scraping
+  }
+): Promise<SourceScrapeResult[]> {
+  const client = options.client ?? new GitHubClient({ token: options.githubToken });
+  const limit = pLimit(options.concurrency ?? 2);
 
-  for (const source of sources) {
+  const results = await Promise.all(sources.map(source => limit(async () => {
     console.log(`\n${'#'.repeat(70)}`);
     console.log(`# Source: ${source.id}`);
     console.log(`# ${source.description || 'No description'}`);
     console.log(`${'#'.repeat(70)}`);
 
+    const previousState = options.stateStore
+      ? await options.stateStore.getGitHubSourceState(source.id)
+      : null;
+
     const scraper = new IntelligentGitHubScraper({
       source,
       project: projectId,
       openaiApiKey: options.openaiApiKey,
-      githubToken: options.githubToken,
       dryRun: options.dryRun,
+      client,
+      previousState,
     });
 
-    const { chunks, stats } = await scraper.scrapeAll();
-
-    results.push({
-      sourceId: source.id,
-      chunks,
-      stats,
-    });
+    const result = await scraper.scrapeAll();
 
     // Log skip reason summary
-    if (Object.keys(stats.skipReasons).length > 0) {
-      console.log('\nSkip reasons summary:');
-      for (const [reason, count] of Object.entries(stats.skipReasons)) {
+    if (Object.keys(result.stats.skipReasons).length > 0) {
+      console.log(`\nSkip reasons summary (${source.id}):`);
+      for (const [reason, count] of Object.entries(result.stats.skipReasons)) {
         console.log(`  ${reason}: ${count}`);
       }
     }
-  }
+
+    return { sourceId: source.id, ...result };
+  })));
+
+  const api = client.stats;
+  console.log(`\nGitHub API: ${api.requests} requests (${api.archiveDownloads} archive downloads, ${api.retries} retries, ${(api.rateLimitWaitMs / 1000).toFixed(1)}s rate-limit wait)`);
 
   return results;
 }
@@ -7,7 +7,9 @@ import { randomUUID } from 'crypto';
 import { parseArgs } from 'util';
 import {
   FullTextDB,
-  VectorDB,
+  createVectorStore,
+  defaultLocalVectorPath,
+  type VectorBackend,
   generateEmbeddings,
   loadProjectConfig,
   type DocumentChunk
@@ -22,6 +24,8 @@ interface CliConfig {
   qdrantUrl: string;
   qdrantCollection: string;
   sqlitePath: string;
+  vectorBackend: VectorBackend;
+  localVectorPath: string;
   openaiApiKey: string;
 }
 
@@ -66,6 +70,9 @@ async function main() {
     qdrantUrl: process.env.QDRANT_URL || 'http://localhost:6333',
     qdrantCollection: process.env.QDRANT_COLLECTION || 'crypto_docs',
     sqlitePath: process.env.SQLITE_PATH || './data/crypto_docs.db',
+    vectorBackend: process.env.VECTOR_BACKEND === 'local' ? 'local' : 'qdrant',
+    localVectorPath: process.env.LOCAL_VECTOR_PATH
+      || defaultLocalVectorPath(process.env.SQLITE_PATH || './data/crypto_docs.db'),
     openaiApiKey: process.env.OPENAI_API_KEY
   };
 
@@ -76,13 +83,18 @@ async function main() {
   console.log(`Docs dir: ${config.docsDir}`);
   console.log(`Custom id: ${config.customId}`);
   console.log(`SQLite: ${config.sqlitePath}`);
-  console.log(`Qdrant: ${config.qdrantUrl}`);
+  console.log(`Vector backend: ${config.vectorBackend === 'local' ? config.localVectorPath : config.qdrantUrl}`);
 
-  const vectorDb = new VectorDB({
-    url: config.qdrantUrl,
-    collection: config.qdrantCollection
-  });
   const ftsDb = new FullTextDB({ path: config.sqlitePath });
+  const vectorDb = createVectorStore({
+    backend: config.vectorBackend,
+    qdrant: { url: config.qdrantUrl, collection: config.qdrantCollection },
+    local: {
+      path: config.localVectorPath,
+      quantize: process.env.LOCAL_VECTOR_QUANTIZE === 'true'
+    },
+    ftsDb
+  });
 
   try {
     await vectorDb.initialize();
@@ -23,6 +23,7 @@ export interface LLMRelevanceResult {
   prerequisites: string[]; // Inferred prerequisites
   versionHint: string | null; // Inferred version compatibility
   reasoning: string; // Why this score
+  failed?: boolean; // The LLM call failed; the score is not a verdict
 }
 
 /**
@@ -181,6 +182,7 @@ Be strict. Most internal SDK code should score below 40. Only give high scores t
       prerequisites: [],
       versionHint: null,
       reasoning: `LLM call failed: ${error instanceof Error ? error.message : 'Unknown error'}`,
+      failed: true,
     };
   }
 }
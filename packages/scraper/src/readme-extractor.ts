@@ -14,29 +14,38 @@ export interface ReadmeContext {
 }
 
 /**
- * Fetch README from same directory or parent directories
+ * README paths that may describe a file, in lookup order: same
+ * directory first, then parent directories (up to 3 levels)
  */
-export async function fetchReadmeContext(
-  filePath: string,
-  fetchFile: (path: string) => Promise<string | null>
-): Promise<ReadmeContext | null> {
+export function readmeCandidates(filePath: string): string[] {
   const pathParts = filePath.split('/');
+  const candidates: string[] = [];
 
-  // Try README in same directory, then parent directories (up to 3 levels)
   for (let i = pathParts.length - 1; i >= Math.max(0, pathParts.length - 4); i--) {
     const dirPath = pathParts.slice(0, i).join('/');
-    const readmePaths = [
+    candidates.push(
       dirPath ? `${dirPath}/README.md` : 'README.md',
       dirPath ? `${dirPath}/readme.md` : 'readme.md',
       dirPath ? `${dirPath}/README` : 'README',
       dirPath ? `${dirPath}/Readme.md` : 'Readme.md',
-    ];
+    );
+  }
 
-    for (const readmePath of readmePaths) {
-      const content = await fetchFile(readmePath);
-      if (content) {
-        return parseReadme(content, filePath, dirPath);
-      }
+  return candidates;
+}
+
+/**
+ * Fetch README from same directory or parent directories
+ */
+export async function fetchReadmeContext(
+  filePath: string,
+  fetchFile: (path: string) => Promise<string | null>
+): Promise<ReadmeContext | null> {
+  for (const readmePath of readmeCandidates(filePath)) {
+    const content = await fetchFile(readmePath);
+    if (content) {
+      const dirPath = readmePath.split('/').slice(0, -1).join('/');
+      return parseReadme(content, filePath, dirPath);
     }
   }
 
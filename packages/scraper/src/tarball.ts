@@ -0,0 +1,174 @@
+/**
+ * Tarball Reader
+ *
+ * Minimal streaming reader for the gzipped tar archives GitHub serves
+ * from /repos/{owner}/{repo}/tarball/{ref}. Handles the ustar, pax and
+ * GNU long-name variants git-archive produces, strips the leading
+ * "{owner}-{repo}-{sha}/" directory and keeps only the wanted files,
+ * so a whole repository can be read in one download without holding
+ * the archive in memory.
+ */
+
+import { createGunzip } from 'zlib';
+import { Readable } from 'stream';
+
+const BLOCK_SIZE = 512;
+
+export interface TarExtractOptions {
+  /** Leading path components to drop. Default: 1 (GitHub's top-level directory) */
+  stripComponents?: number;
+  /** Return true for (stripped) file paths to keep */
+  filter: (path: string) => boolean;
+}
+
+/**
+ * Buffered reader over an async byte stream
+ */
+class ByteReader {
+  private chunks: Buffer[] = [];
+  private buffered = 0;
+  private iterator: AsyncIterator<Buffer>;
+  private done = false;
+
+  constructor(source: AsyncIterable<Buffer>) {
+    this.iterator = source[Symbol.asyncIterator]();
+  }
+
+  /**
+   * Read exactly n bytes; null if the stream ends first
+   */
+  async read(n: number): Promise<Buffer | null> {
+    while (this.buffered < n && !this.done) {
+      const { value, done } = await this.iterator.next();
+      if (done) {
+        this.done = true;
+      } else if (value.length > 0) {
+        this.chunks.push(value);
+        this.buffered += value.length;
+      }
+    }
+
+    if (this.buffered < n) return null;
+
+    const all = this.chunks.length === 1 ? this.chunks[0] : Buffer.concat(this.chunks);
+    const out = all.subarray(0, n);
+    const rest = all.subarray(n);
+    this.chunks = rest.length > 0 ? [rest] : [];
+    this.buffered = rest.length;
+    return out;
+  }
+
+  /**
+   * Discard n bytes without keeping them
+   */
+  async skip(n: number): Promise<boolean> {
+    while (n > 0) {
+      const step = Math.min(n, 1 << 20);
+      if (!(await this.read(step))) return false;
+      n -= step;
+    }
+    return true;
+  }
+}
+
+function readString(block: Buffer, offset: number, length: number): string {
+  const field = block.subarray(offset, offset + length);
+  const end = field.indexOf(0);
+  return field.subarray(0, end === -1 ? field.length : end).toString('utf-8');
+}
+
+function readSize(block: Buffer): number {
+  // GNU base-256 encoding for sizes that do not fit in 11 octal digits
+  if (block[124] & 0x80) {
+    let size = 0;
+    for (let i = 125; i < 136; i++) size = size * 256 + block[i];
+    return size;
+  }
+  return parseInt(readString(block, 124, 12).trim() || '0', 8);
+}
+
+/**
+ * Parse pax extended header records ("<len> <key>=<value>\n")
+ */
+function parsePax(data: Buffer): Record<string, string> {
+  const records: Record<string, string> = {};
+  let offset = 0;
+
+  while (offset < data.length) {
+    const space = data.indexOf(0x20, offset);
+    if (space === -1) break;
+    const length = parseInt(data.subarray(offset, space).toString('utf-8'), 10);
+    if (!length) break;
+
+    const record = data.subarray(space + 1, offset + length - 1).toString('utf-8');
+    const eq = record.indexOf('=');
+    if (eq !== -1) records[record.slice(0, eq)] = record.slice(eq + 1);
+    offset += length;
+  }
+
+  return records;
+}
+
+function padding(size: number): number {
+  return (BLOCK_SIZE - (size % BLOCK_SIZE)) % BLOCK_SIZE;
+}
+
+/**
+ * Read the wanted files from a gzipped tar stream.
+ * Returns file contents (UTF-8) keyed by stripped path.
+ */
+export async function extractTarGz(
+  body: AsyncIterable<Uint8Array> | ReadableStream<Uint8Array>,
+  options: TarExtractOptions
+): Promise<Map<string, string>> {
+  const stripComponents = options.stripComponents ?? 1;
+  const source = 'getReader' in body
+    ? Readable.fromWeb(body as import('stream/web').ReadableStream<Uint8Array>)
+    : Readable.from(body);
+  const reader = new ByteReader(source.pipe(createGunzip()));
+  const files = new Map<string, string>();
+
+  let longName: string | null = null;
+  let paxPath: string | null = null;
+
+  while (true) {
+    const header = await reader.read(BLOCK_SIZE);
+    // An all-zero block marks the end of the archive
+    if (!header || header.every(byte => byte === 0)) break;
+
+    const size = readSize(header);
+    const type = String.fromCharCode(header[156] || 0x30);
+
+    if (type === 'x' || type === 'L') {
+      const data = await reader.read(size);
+      if (!data || !(await reader.skip(padding(size)))) break;
+      if (type === 'x') paxPath = parsePax(data).path ?? null;
+      else longName = readString(data, 0, data.length);
+      continue;
+    }
+
+    let name = readString(header, 0, 100);
+    if (header.subarray(257, 262).toString('ascii') === 'ustar') {
+      const prefix = readString(header, 345, 155);
+      if (prefix) name = `${prefix}/${name}`;
+    }
+    name = paxPath ?? longName ?? name;
+    paxPath = null;
+    longName = null;
+
+    const path = name.split('/').slice(stripComponents).join('/');
+    const isFile = type === '0' || type === '7';
+
+    if (isFile && path && options.filter(path)) {
+      const data = await reader.read(size);
+      if (!data) break;
+      files.set(path, data.toString('utf-8'));
+      if (!(await reader.skip(padding(size)))) break;
+    } else if (!(await reader.skip(size + padding(size)))) {
+      break;
+    }
+  }
+
+  source.destroy();
+  return files;
+}
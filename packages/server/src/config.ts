@@ -1,4 +1,5 @@
 import 'dotenv/config';
+import { defaultLocalVectorPath, type VectorBackend, type RerankMode } from '@mina-docs/shared';
 
 export const config = {
   port: parseInt(process.env.MCP_PORT || '3000'),
@@ -13,10 +14,45 @@ export const config = {
     path: process.env.SQLITE_PATH || './data/crypto_docs.db'
   },
 
+  // Vector backend: 'qdrant' (default) or 'local' (embedded, no service needed)
+  vectorStore: {
+    backend: (process.env.VECTOR_BACKEND || 'qdrant') as VectorBackend,
+    localPath: process.env.LOCAL_VECTOR_PATH
+      || defaultLocalVectorPath(process.env.SQLITE_PATH || './data/crypto_docs.db'),
+    quantize: process.env.LOCAL_VECTOR_QUANTIZE === 'true'
+  },
+
   openai: {
     apiKey: process.env.OPENAI_API_KEY || ''
   },
 
+  // Query embedding cache
+  embeddingCache: {
+    maxEntries: parseInt(process.env.EMBEDDING_CACHE_SIZE || '1000'),
+    persistent: process.env.EMBEDDING_CACHE_PERSIST !== 'false',
+    persistentMaxEntries: parseInt(process.env.EMBEDDING_CACHE_PERSIST_SIZE || '10000'),
+    persistentMaxAgeMs: parseInt(process.env.EMBEDDING_CACHE_PERSIST_TTL_MS || String(30 * 24 * 60 * 60 * 1000))
+  },
+
+  // Answer cache for crypto_ask_docs / crypto_get_working_example
+  answerCache: {
+    ttlMs: parseInt(process.env.ANSWER_CACHE_TTL_MS || String(60 * 60 * 1000)),
+    maxEntries: parseInt(process.env.ANSWER_CACHE_SIZE || '200')
+  },
+
+  // Tiered reranker: local scoring, LLM pass only for ambiguous rankings
+  reranker: {
+    mode: (process.env.RERANK_MODE || 'tiered') as RerankMode,
+    escalationMargin: parseFloat(process.env.RERANK_ESCALATION_MARGIN || '0.03'),
+    cacheSize: parseInt(process.env.RERANK_CACHE_SIZE || '500')
+  },
+
+  // Per-request retrieval planner (concurrent corrective retries, one rerank)
+  retrieval: {
+    // Stop waiting for corrective retries after this long; 0 disables the budget
+    budgetMs: parseInt(process.env.RETRIEVAL_BUDGET_MS || '0')
+  },
+
   // LLM synthesis configuration
   llm: {
     model: process.env.LLM_MODEL || 'gpt-4o',
@@ -29,4 +65,10 @@ export function validateConfig(): void {
   if (!config.openai.apiKey) {
     throw new Error('OPENAI_API_KEY environment variable is required');
   }
+  if (config.vectorStore.backend !== 'qdrant' && config.vectorStore.backend !== 'local') {
+    throw new Error(`VECTOR_BACKEND must be 'qdrant' or 'local' (got '${config.vectorStore.backend}')`);
+  }
+  if (!['tiered', 'local', 'llm'].includes(config.reranker.mode)) {
+    throw new Error(`RERANK_MODE must be 'tiered', 'local' or 'llm' (got '${config.reranker.mode}')`);
+  }
 }
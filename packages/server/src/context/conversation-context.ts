@@ -12,6 +12,8 @@
  * - TTL-based cleanup
  */
 
+import { normalizeQuestion } from '../utils/answer-cache.js';
+
 interface ConversationTurn {
   query: string;
   queryType: string;
@@ -158,9 +160,10 @@ class ConversationContextManager {
       'same', 'similar', 'like', 'as well'
     ];
 
+    // Whole words only, so "and" does not match "handle"
     const queryLower = query.toLowerCase();
     const hasFollowUpIndicator = followUpIndicators.some(ind =>
-      queryLower.includes(ind)
+      new RegExp(`\\b${ind}\\b`).test(queryLower)
     );
 
     // Check for pronoun references
@@ -169,6 +172,12 @@ class ConversationContextManager {
       queryLower.startsWith(p + ' ') || queryLower.includes(' ' + p + ' ')
     );
 
+    if (hasFollowUpIndicator || hasPronounReference) return true;
+
+    // Asking the previous question again is a repeat, not a follow-up,
+    // even though every keyword overlaps
+    if (normalizeQuestion(query) === normalizeQuestion(lastTurn.query)) return false;
+
     // Check for keyword overlap with recent queries
     const lastKeywords = lastTurn.keywords.map(k => k.toLowerCase());
     const queryWords = query.toLowerCase().split(/\s+/);
@@ -176,7 +185,7 @@ class ConversationContextManager {
       lastKeywords.includes(w) && w.length > 3
     );
 
-    return hasFollowUpIndicator || hasPronounReference || hasKeywordOverlap;
+    return hasKeywordOverlap;
   }
 
   /**
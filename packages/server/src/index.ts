@@ -1,9 +1,10 @@
 #!/usr/bin/env node
 
 import 'dotenv/config';
-import { VectorDB, FullTextDB, HybridSearch, Reranker, LLMClient, listProjects } from '@mina-docs/shared';
+import { listProjects } from '@mina-docs/shared';
 import { config, validateConfig } from './config.js';
 import { createHttpTransport } from './transport.js';
+import { initializeServices, type ServerServices } from './services.js';
 
 async function main() {
   console.error('='.repeat(60));
@@ -23,7 +24,7 @@ async function main() {
   console.error(`\nConfiguration:`);
   console.error(`  Port: ${config.port}`);
   console.error(`  Host: ${config.host}`);
-  console.error(`  Qdrant: ${config.qdrant.url}`);
+  console.error(`  Vector Backend: ${config.vectorStore.backend === 'local' ? `local (${config.vectorStore.localPath})` : `qdrant (${config.qdrant.url})`}`);
   console.error(`  SQLite: ${config.sqlite.path}`);
   console.error(`  LLM Model: ${config.llm.model}`);
   console.error(`  LLM Max Tokens: ${config.llm.maxTokens}`);
@@ -36,63 +37,20 @@ async function main() {
     console.error('\nWarning: No projects configured in config/projects/');
   }
 
-  // Initialize databases
+  // Initialize databases and services
   console.error('\nInitializing databases...');
 
-  const vectorDb = new VectorDB({
-    url: config.qdrant.url,
-    collection: config.qdrant.collection
-  });
-
-  const ftsDb = new FullTextDB({
-    path: config.sqlite.path
-  });
-
+  let services: ServerServices;
   try {
-    await vectorDb.initialize();
-    console.error('  ✓ Vector database (Qdrant) connected');
-  } catch (error) {
-    console.error('  ✗ Failed to connect to Qdrant:', error instanceof Error ? error.message : error);
-    console.error('\n  Make sure Qdrant is running: docker-compose up -d');
+    services = await initializeServices();
+  } catch {
     process.exit(1);
   }
 
-  try {
-    await ftsDb.initialize();
-    console.error('  ✓ Full-text search database (SQLite) connected');
-  } catch (error) {
-    console.error('  ✗ Failed to initialize SQLite:', error);
-    process.exit(1);
-  }
-
-  // Initialize reranker
-  const reranker = new Reranker({
-    apiKey: config.openai.apiKey
-  });
-  console.error('  ✓ Reranker initialized');
-
-  // Initialize LLM client for synthesis
-  const llmClient = new LLMClient({
-    apiKey: config.openai.apiKey,
-    model: config.llm.model,
-    maxTokens: config.llm.maxTokens,
-    temperature: config.llm.temperature
-  });
-  console.error('  ✓ LLM client initialized');
-
-  // Initialize hybrid search with reranker
-  const search = new HybridSearch({
-    vectorDb,
-    ftsDb,
-    openaiApiKey: config.openai.apiKey,
-    reranker
-  });
-  console.error('  ✓ Hybrid search initialized (with reranking)');
-
   // Start HTTP server
   try {
     await createHttpTransport(
-      { search, ftsDb, llmClient },
+      services,
       config.port,
       config.host
     );
@@ -113,8 +71,7 @@ async function main() {
   // Graceful shutdown
   const shutdown = async () => {
     console.error('\n\nShutting down...');
-    await ftsDb.close();
-    await vectorDb.close();
+    await services.close();
     console.error('Goodbye!');
     process.exit(0);
   };
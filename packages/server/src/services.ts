@@ -0,0 +1,106 @@
+import {
+  createVectorStore,
+  FullTextDB,
+  HybridSearch,
+  Reranker,
+  LLMClient,
+  QueryEmbeddingCache,
+  type VectorStore
+} from '@mina-docs/shared';
+import { config } from './config.js';
+import type { TransportContext } from './transport.js';
+
+export interface ServerServices extends TransportContext {
+  vectorDb: VectorStore;
+  close(): Promise<void>;
+}
+
+/**
+ * Connect the databases and build the search/LLM services from config.
+ * Shared by the server entry point and the in-process load test.
+ */
+export async function initializeServices(): Promise<ServerServices> {
+  const ftsDb = new FullTextDB({
+    path: config.sqlite.path
+  });
+
+  const vectorDb = createVectorStore({
+    backend: config.vectorStore.backend,
+    qdrant: config.qdrant,
+    local: {
+      path: config.vectorStore.localPath,
+      quantize: config.vectorStore.quantize
+    },
+    ftsDb
+  });
+
+  try {
+    await vectorDb.initialize();
+    console.error(`  ✓ Vector database (${config.vectorStore.backend === 'local' ? 'local' : 'Qdrant'}) connected`);
+  } catch (error) {
+    if (config.vectorStore.backend === 'local') {
+      console.error('  ✗ Failed to load local vector store:', error instanceof Error ? error.message : error);
+    } else {
+      console.error('  ✗ Failed to connect to Qdrant:', error instanceof Error ? error.message : error);
+      console.error('\n  Make sure Qdrant is running: docker-compose up -d');
+    }
+    throw error;
+  }
+
+  try {
+    await ftsDb.initialize();
+    console.error('  ✓ Full-text search database (SQLite) connected');
+  } catch (error) {
+    console.error('  ✗ Failed to initialize SQLite:', error);
+    throw error;
+  }
+
+  // Initialize reranker
+  const reranker = new Reranker({
+    apiKey: config.openai.apiKey,
+    mode: config.reranker.mode,
+    escalationMargin: config.reranker.escalationMargin,
+    cacheSize: config.reranker.cacheSize
+  });
+  console.error(`  ✓ Reranker initialized (${config.reranker.mode})`);
+
+  // Initialize LLM client for synthesis
+  const llmClient = new LLMClient({
+    apiKey: config.openai.apiKey,
+    model: config.llm.model,
+    maxTokens: config.llm.maxTokens,
+    temperature: config.llm.temperature
+  });
+  console.error('  ✓ LLM client initialized');
+
+  // Initialize query embedding cache (persisted in the SQLite file)
+  const embeddingCache = new QueryEmbeddingCache({
+    apiKey: config.openai.apiKey,
+    maxEntries: config.embeddingCache.maxEntries,
+    store: config.embeddingCache.persistent ? ftsDb : undefined,
+    persistentMaxEntries: config.embeddingCache.persistentMaxEntries,
+    persistentMaxAgeMs: config.embeddingCache.persistentMaxAgeMs
+  });
+  console.error(`  ✓ Query embedding cache initialized (${config.embeddingCache.persistent ? 'persistent' : 'memory only'})`);
+
+  // Initialize hybrid search with reranker
+  const search = new HybridSearch({
+    vectorDb,
+    ftsDb,
+    openaiApiKey: config.openai.apiKey,
+    reranker,
+    embeddingCache
+  });
+  console.error('  ✓ Hybrid search initialized (with reranking)');
+
+  return {
+    search,
+    ftsDb,
+    llmClient,
+    vectorDb,
+    async close() {
+      await ftsDb.close();
+      await vectorDb.close();
+    }
+  };
+}
@@ -9,13 +9,16 @@ import {
   shouldIncludeSearchGuidance,
   generateSearchGuidance,
   formatSearchGuidanceAsMarkdown,
-  calculateConfidenceScore
+  calculateConfidenceScore,
+  RetrievalPlanner
 } from '@mina-docs/shared';
 import { formatSearchResultsAsContext, getProjectContext } from './context-formatter.js';
 import { ResponseBuilder, calculateConfidence } from '../utils/response-builder.js';
 import { generateSuggestions, generateRelatedQueries } from '../utils/suggestion-generator.js';
 import { conversationContext } from '../context/conversation-context.js';
 import { logger } from '../utils/logger.js';
+import { answerCache } from '../utils/answer-cache.js';
+import { config } from '../config.js';
 
 export const AskDocsSchema = z.object({
   question: z.string().describe('Your question about the documentation'),
@@ -25,10 +28,45 @@ export const AskDocsSchema = z.object({
 
 type AskDocsArgs = z.infer<typeof AskDocsSchema>;
 
+interface AskDocsOutcome {
+  response: { content: Array<{ type: string; text: string }> };
+  /** False when nothing was found or the LLM returned no answer */
+  answered: boolean;
+}
+
 export async function askDocs(
   args: AskDocsArgs,
   context: ToolContext
 ): Promise<{ content: Array<{ type: string; text: string }> }> {
+  // Follow-ups depend on conversation context, so never serve them from cache
+  if (conversationContext.isLikelyFollowUp(args.project, args.question)) {
+    answerCache.recordBypass();
+    return (await runAskDocs(args, context, true)).response;
+  }
+
+  // Cached answers are shared across sessions, so they are computed from
+  // the question alone, without keywords from earlier turns
+  const { value, cached } = await answerCache.getOrCompute(
+    { tool: 'crypto_ask_docs', project: args.project, question: args.question, maxTokens: args.maxTokens },
+    context.ftsDb,
+    () => runAskDocs(args, context, false),
+    outcome => outcome.answered
+  );
+
+  if (cached) {
+    // Keep follow-up detection working for the next query
+    const analysis = analyzeQuery(args.question);
+    conversationContext.addTurn(args.project, args.question, analysis.type, analysis.keywords);
+  }
+
+  return value.response;
+}
+
+async function runAskDocs(
+  args: AskDocsArgs,
+  context: ToolContext,
+  isFollowUp: boolean
+): Promise<AskDocsOutcome> {
   const builder = new ResponseBuilder();
 
   // 1. Analyze query to optimize search
@@ -37,9 +75,10 @@ export async function askDocs(
   builder.setQueryType(analysis.type);
   logger.queryAnalysis(analysis);
 
-  // 2. Enhance query with conversation context (for follow-ups)
-  const enhancedQuery = conversationContext.enhanceQuery(args.project, analysis.expandedQuery);
-  const isFollowUp = conversationContext.isLikelyFollowUp(args.project, args.question);
+  // 2. Enhance query with conversation context (follow-ups only)
+  const enhancedQuery = isFollowUp
+    ? conversationContext.enhanceQuery(args.project, analysis.expandedQuery)
+    : analysis.expandedQuery;
   if (isFollowUp) {
     logger.info('Detected follow-up query, using conversation context');
   }
@@ -47,16 +86,20 @@ export async function askDocs(
     logger.debug(`Enhanced query: "${enhancedQuery}"`);
   }
 
-  // 3. Initial retrieval
+  // 3. Initial retrieval (the planner shares fetches and the latency budget across steps 3-4)
   logger.info('Performing initial search...');
+  const planner = new RetrievalPlanner(context.search, {
+    project: args.project,
+    analysis,
+    budgetMs: config.retrieval.budgetMs
+  });
   const searchStart = Date.now();
-  const initialResults = await context.search.search(enhancedQuery, {
+  const initialAttempt = await planner.attempt(enhancedQuery, {
     limit: analysis.suggestedLimit,
-    project: args.project,
     contentType: analysis.suggestedContentType,
-    rerank: true,
     rerankTopK: Math.min(analysis.suggestedLimit, 10)
   });
+  const initialResults = initialAttempt.results;
   logger.search(enhancedQuery, initialResults.length, Date.now() - searchStart);
 
   // 4. Apply corrective RAG if initial results are poor
@@ -72,7 +115,7 @@ export async function askDocs(
       args.question,
       analysis,
       args.project,
-      { maxRetries: 2, mergeResults: true }
+      { maxRetries: 2, mergeResults: true, planner, initialAttempt }
     );
     results = corrective.results;
     wasRetried = corrective.wasRetried;
@@ -80,6 +123,7 @@ export async function askDocs(
 
     logger.correctiveRAG(wasRetried, corrective.retriesUsed, alternativeQueries);
     logger.info(`Corrective RAG completed in ${Date.now() - correctiveStart}ms, now have ${results.length} results`);
+    logger.debug('Retrieval planner stats', planner.stats);
 
     if (wasRetried) {
       const quotedQueries = alternativeQueries.map(q => `"${q}"`).join(', ');
@@ -123,9 +167,12 @@ export async function askDocs(
     }
 
     const guidanceText = formatSearchGuidanceAsMarkdown(searchGuidance);
-    return builder.buildMCPResponse(
-      `I couldn't find documentation for your question in ${args.project}.\n${guidanceText}`
-    );
+    return {
+      response: builder.buildMCPResponse(
+        `I couldn't find documentation for your question in ${args.project}.\n${guidanceText}`
+      ),
+      answered: false
+    };
   }
 
   // 8. Format chunks with rich metadata for better code generation
@@ -206,5 +253,5 @@ export async function askDocs(
   const relatedQueries = generateRelatedQueries(args.question, analysis, results, args.project);
   relatedQueries.forEach(q => builder.addRelatedQuery(q));
 
-  return builder.buildMCPResponse(finalAnswer);
+  return { response: builder.buildMCPResponse(finalAnswer), answered: answer.trim().length > 0 };
 }
@@ -53,7 +53,8 @@ export async function explainError(
     limit: 15,
     project: args.project,
     rerank: true,
-    rerankTopK: 10
+    rerankTopK: 10,
+    analysis
   });
   logger.search(searchQuery, results.length, Date.now() - searchStart);
 
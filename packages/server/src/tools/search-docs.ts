@@ -33,7 +33,8 @@ export async function searchDocs(
     project: args.project,
     contentType: args.contentType,
     rerank: true,
-    rerankTopK: args.limit
+    rerankTopK: args.limit,
+    analysis
   });
   logger.search(args.query, results.length, Date.now() - searchStart);
 
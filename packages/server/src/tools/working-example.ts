@@ -1,13 +1,15 @@
 import { z } from 'zod';
 import type { ToolContext } from './index.js';
 import { PROMPTS } from '../prompts/index.js';
-import { analyzeQuery, shouldApplyCorrectiveRAG, correctiveSearch } from '@mina-docs/shared';
+import { analyzeQuery, shouldApplyCorrectiveRAG, correctiveSearch, RetrievalPlanner } from '@mina-docs/shared';
 import { formatSearchResultsAsContext, getProjectContext } from './context-formatter.js';
 import { ResponseBuilder, calculateConfidence } from '../utils/response-builder.js';
 import { generateRelatedQueries } from '../utils/suggestion-generator.js';
 import { conversationContext } from '../context/conversation-context.js';
 import { getVerificationSummary } from '../utils/code-verifier.js';
 import { logger } from '../utils/logger.js';
+import { answerCache } from '../utils/answer-cache.js';
+import { config } from '../config.js';
 
 export const GetWorkingExampleSchema = z.object({
   task: z.string().describe('What you want to accomplish (e.g., "transfer tokens", "deploy smart contract")'),
@@ -17,10 +19,42 @@ export const GetWorkingExampleSchema = z.object({
 
 type GetWorkingExampleArgs = z.infer<typeof GetWorkingExampleSchema>;
 
+interface WorkingExampleOutcome {
+  response: { content: Array<{ type: string; text: string }> };
+  /** False when no examples were found or the LLM returned no answer */
+  answered: boolean;
+}
+
 export async function getWorkingExample(
   args: GetWorkingExampleArgs,
   context: ToolContext
 ): Promise<{ content: Array<{ type: string; text: string }> }> {
+  // Follow-ups depend on conversation context, so never serve them from cache
+  if (conversationContext.isLikelyFollowUp(args.project, args.task)) {
+    answerCache.recordBypass();
+    return (await runGetWorkingExample(args, context)).response;
+  }
+
+  const { value, cached } = await answerCache.getOrCompute(
+    { tool: 'crypto_get_working_example', project: args.project, question: args.task, maxTokens: args.maxTokens },
+    context.ftsDb,
+    () => runGetWorkingExample(args, context),
+    outcome => outcome.answered
+  );
+
+  if (cached) {
+    // Keep follow-up detection working for the next query
+    const analysis = analyzeQuery(`how to ${args.task}`);
+    conversationContext.addTurn(args.project, args.task, 'howto', analysis.keywords);
+  }
+
+  return value.response;
+}
+
+async function runGetWorkingExample(
+  args: GetWorkingExampleArgs,
+  context: ToolContext
+): Promise<WorkingExampleOutcome> {
   const builder = new ResponseBuilder();
 
   // Analyze the task as a howto query
@@ -29,34 +63,21 @@ export async function getWorkingExample(
   builder.setQueryType('howto');
   logger.queryAnalysis(analysis);
 
-  // 1. Search for code examples and related prose in parallel
-  logger.info('Searching for code, prose, and API reference in parallel...');
+  // 1. Search for code examples, related prose and API reference (for complete
+  //    type info). One embedding and one candidate fetch are shared by all three.
+  logger.info('Searching for code, prose, and API reference...');
+  const planner = new RetrievalPlanner(context.search, {
+    project: args.project,
+    analysis,
+    budgetMs: config.retrieval.budgetMs
+  });
   const searchStart = Date.now();
-  const [codeResults, proseResults, apiResults] = await Promise.all([
-    context.search.search(args.task, {
-      limit: 15,
-      project: args.project,
-      contentType: 'code',
-      rerank: true,
-      rerankTopK: 8
-    }),
-    context.search.search(`${args.task} tutorial guide how to`, {
-      limit: 10,
-      project: args.project,
-      contentType: 'prose',
-      rerank: true,
-      rerankTopK: 5
-    }),
-    // Also search API reference for complete type info
-    context.search.search(`${args.task} interface type`, {
-      limit: 5,
-      project: args.project,
-      contentType: 'api-reference',
-      rerank: true,
-      rerankTopK: 3
-    })
+  const [codeResults, proseResults, apiResults] = await planner.searchByContentType(args.task, [
+    { contentType: 'code', limit: 15, rerankTopK: 8 },
+    { contentType: 'prose', limit: 10, rerankTopK: 5 },
+    { contentType: 'api-reference', limit: 5, rerankTopK: 3 }
   ]);
-  logger.info(`Parallel search completed in ${Date.now() - searchStart}ms`);
+  logger.info(`Content-type search completed in ${Date.now() - searchStart}ms`);
   logger.debug(`Results: ${codeResults.length} code, ${proseResults.length} prose, ${apiResults.length} API`);
 
   let allResults = [...codeResults, ...proseResults, ...apiResults];
@@ -70,7 +91,7 @@ export async function getWorkingExample(
       `${args.task} code example implementation`,
       analysis,
       args.project,
-      { maxRetries: 1, mergeResults: true }
+      { maxRetries: 1, mergeResults: true, planner }
     );
 
     if (corrective.wasRetried && corrective.results.length > codeResults.length) {
@@ -107,9 +128,12 @@ export async function getWorkingExample(
       { question: `How do I ${args.task}?`, project: args.project }
     );
 
-    return builder.buildMCPResponse(
-      `No code examples found for "${args.task}" in ${args.project}. Try different keywords or check the project name.`
-    );
+    return {
+      response: builder.buildMCPResponse(
+        `No code examples found for "${args.task}" in ${args.project}. Try different keywords or check the project name.`
+      ),
+      answered: false
+    };
   }
 
   // 2. Format context with rich metadata for better code generation
@@ -175,5 +199,5 @@ export async function getWorkingExample(
   const relatedQueries = generateRelatedQueries(args.task, analysis, allResults, args.project);
   relatedQueries.forEach(q => builder.addRelatedQuery(q));
 
-  return builder.buildMCPResponse(example);
+  return { response: builder.buildMCPResponse(example), answered: example.trim().length > 0 };
 }
@@ -1,7 +1,8 @@
 import express, { Request, Response } from 'express';
 import { getToolDefinitions, handleToolCall, type ToolContext } from './tools/index.js';
 import { getResourceDefinitions, handleResourceRead } from './resources/index.js';
-import type { HybridSearch, FullTextDB, LLMClient } from '@mina-docs/shared';
+import { tracer, type HybridSearch, type FullTextDB, type LLMClient } from '@mina-docs/shared';
+import { answerCache } from './utils/answer-cache.js';
 
 interface JSONRPCRequest {
   jsonrpc: '2.0';
@@ -27,11 +28,10 @@ export interface TransportContext {
   llmClient: LLMClient;
 }
 
-export async function createHttpTransport(
-  context: TransportContext,
-  port: number,
-  host: string
-): Promise<void> {
+/**
+ * Build the Express app (routes only, not listening)
+ */
+export function createHttpApp(context: TransportContext): express.Express {
   const app = express();
 
   app.use(express.json({ limit: '10mb' }));
@@ -53,11 +53,33 @@ export async function createHttpTransport(
       status: 'ok',
       server: 'crypto-docs-mcp',
       version: '2.0.0',
-      features: ['llm-synthesis', 'reranking'],
+      features: ['llm-synthesis', 'reranking', 'embedding-cache', 'answer-cache'],
       endpoints: {
         mcp: '/mcp',
-        health: '/health'
-      }
+        health: '/health',
+        metrics: '/metrics'
+      },
+      embeddingCache: {
+        ...context.search.embeddingCache.stats,
+        hitRate: Number(context.search.embeddingCache.hitRate.toFixed(3))
+      },
+      answerCache: answerCache.stats,
+      reranker: context.search.reranker
+        ? {
+            ...context.search.reranker.stats,
+            escalationRate: Number(context.search.reranker.stats.escalationRate.toFixed(3))
+          }
+        : null
+    });
+  });
+
+  // Per-stage latency (query analysis, embedding, search, rerank, synthesis, ...)
+  // ?traces=N includes the N most recent request traces
+  app.get('/metrics', (req, res) => {
+    const traces = parseInt(String(req.query.traces ?? '0'));
+    res.json({
+      ...tracer.snapshot(),
+      ...(traces > 0 ? { traces: tracer.recentTraces(traces) } : {})
     });
   });
 
@@ -108,10 +130,21 @@ export async function createHttpTransport(
     });
   });
 
+  return app;
+}
+
+export async function createHttpTransport(
+  context: TransportContext,
+  port: number,
+  host: string
+): Promise<void> {
+  const app = createHttpApp(context);
+
   return new Promise<void>((resolve) => {
     app.listen(port, host, () => {
       console.error(`\nMCP server running at http://${host}:${port}`);
       console.error(`  Health check: http://${host}:${port}/health`);
+      console.error(`  Metrics: http://${host}:${port}/metrics`);
       console.error(`  MCP endpoint: http://${host}:${port}/mcp`);
       resolve();
     });
@@ -155,11 +188,11 @@ async function handleMCPRequest(
       };
 
     case 'tools/call':
-      const toolResult = await handleToolCall(
+      const toolResult = await tracer.trace(String(params?.name), () => handleToolCall(
         params?.name,
         params?.arguments,
         toolContext
-      );
+      ));
       return {
         jsonrpc: '2.0',
         result: toolResult,
@@ -0,0 +1,203 @@
+/**
+ * Answer Cache
+ *
+ * Caches fully synthesized tool responses so repeated questions skip
+ * analysis, search, reranking, corrective RAG and LLM synthesis.
+ *
+ * Features:
+ * - Keyed by tool, project, normalized question and maxTokens
+ * - Tied to the project's index version (from page_hashes), so a scraper
+ *   run that changes any page invalidates that project's answers
+ * - Only answers the caller accepts are stored (no "nothing found" or
+ *   empty answers), so a later index update or retry can answer them
+ * - TTL and size-based (LRU) eviction
+ * - Hit rate and latency saved reported through the logger
+ */
+
+import type { FullTextDB } from '@mina-docs/shared';
+import { config } from '../config.js';
+import { logger } from './logger.js';
+
+export interface AnswerCacheKey {
+  tool: string;
+  project: string;
+  question: string;
+  maxTokens?: number;
+}
+
+export interface AnswerCacheOptions {
+  /** Time-to-live for cached answers in milliseconds */
+  ttlMs: number;
+  /** Maximum number of cached answers */
+  maxEntries: number;
+}
+
+interface CacheEntry<T> {
+  value: T;
+  project: string;
+  indexVersion: string;
+  createdAt: number;
+  /** How long the original computation took */
+  computeMs: number;
+}
+
+export interface AnswerCacheStats {
+  hits: number;
+  misses: number;
+  bypassed: number;
+  invalidated: number;
+  evicted: number;
+  size: number;
+  hitRate: number;
+  totalSavedMs: number;
+}
+
+/**
+ * Normalize a question so trivially different phrasings share an entry
+ */
+export function normalizeQuestion(question: string): string {
+  return question
+    .toLowerCase()
+    .trim()
+    .replace(/\s+/g, ' ')
+    .replace(/[?.!]+$/, '');
+}
+
+export class AnswerCache {
+  private entries = new Map<string, CacheEntry<unknown>>();
+  private hits = 0;
+  private misses = 0;
+  private bypassed = 0;
+  private invalidated = 0;
+  private evicted = 0;
+  private totalSavedMs = 0;
+
+  constructor(private options: AnswerCacheOptions) {}
+
+  /**
+   * Return a cached answer if one exists for the current index version,
+   * otherwise compute it and store the result if shouldCache accepts it.
+   */
+  async getOrCompute<T>(
+    key: AnswerCacheKey,
+    ftsDb: FullTextDB,
+    compute: () => Promise<T>,
+    shouldCache: (value: T) => boolean = () => true
+  ): Promise<{ value: T; cached: boolean }> {
+    if (this.options.maxEntries <= 0) {
+      return { value: await compute(), cached: false };
+    }
+
+    const cacheKey = this.buildKey(key);
+    const indexVersion = await ftsDb.getIndexVersion(key.project);
+    const entry = this.entries.get(cacheKey);
+
+    if (entry) {
+      const expired = Date.now() - entry.createdAt > this.options.ttlMs;
+      const stale = entry.indexVersion !== indexVersion;
+
+      if (!expired && !stale) {
+        this.hits++;
+        this.totalSavedMs += entry.computeMs;
+        // Refresh LRU position
+        this.entries.delete(cacheKey);
+        this.entries.set(cacheKey, entry);
+        logger.answerCache(true, key.tool, entry.computeMs, this.stats);
+        return { value: entry.value as T, cached: true };
+      }
+
+      this.entries.delete(cacheKey);
+      if (stale) this.invalidated++;
+    }
+
+    this.misses++;
+    const start = Date.now();
+    const value = await compute();
+    const computeMs = Date.now() - start;
+
+    if (shouldCache(value)) {
+      this.entries.set(cacheKey, {
+        value,
+        project: key.project,
+        indexVersion,
+        createdAt: Date.now(),
+        computeMs
+      });
+      this.evict();
+    }
+    logger.answerCache(false, key.tool, computeMs, this.stats);
+
+    return { value, cached: false };
+  }
+
+  /**
+   * Record a request that deliberately skipped the cache (e.g. follow-ups)
+   */
+  recordBypass(): void {
+    this.bypassed++;
+  }
+
+  /**
+   * Drop all cached answers for a project
+   */
+  invalidateProject(project: string): void {
+    for (const [key, entry] of this.entries) {
+      if (entry.project === project) {
+        this.entries.delete(key);
+        this.invalidated++;
+      }
+    }
+  }
+
+  clear(): void {
+    this.entries.clear();
+  }
+
+  get stats(): AnswerCacheStats {
+    const lookups = this.hits + this.misses;
+    return {
+      hits: this.hits,
+      misses: this.misses,
+      bypassed: this.bypassed,
+      invalidated: this.invalidated,
+      evicted: this.evicted,
+      size: this.entries.size,
+      hitRate: lookups === 0 ? 0 : this.hits / lookups,
+      totalSavedMs: this.totalSavedMs
+    };
+  }
+
+  private buildKey(key: AnswerCacheKey): string {
+    return [
+      key.tool,
+      key.project,
+      normalizeQuestion(key.question),
+      key.maxTokens ?? ''
+    ].join('\u0000');
+  }
+
+  private evict(): void {
+    const now = Date.now();
+
+    // Drop expired entries first
+    for (const [key, entry] of this.entries) {
+      if (now - entry.createdAt > this.options.ttlMs) {
+        this.entries.delete(key);
+        this.evicted++;
+      }
+    }
+
+    // Then least recently used until within size limit
+    while (this.entries.size > this.options.maxEntries) {
+      const oldest = this.entries.keys().next().value as string;
+      this.entries.delete(oldest);
+      this.evicted++;
+    }
+  }
+}
+
+// Export singleton instance
+export const answerCache = new AnswerCache({
+  ttlMs: config.answerCache.ttlMs,
+  maxEntries: config.answerCache.maxEntries
+});
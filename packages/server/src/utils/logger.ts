@@ -236,6 +236,23 @@ class Logger {
     console.log(`${prefix('debug', 'LLM')} Response: ${responseLength} chars in ${durationMs}ms`);
   }
 
+  /**
+   * Log answer cache activity
+   */
+  answerCache(
+    hit: boolean,
+    toolName: string,
+    durationMs: number,
+    stats: { hits: number; misses: number; hitRate: number; totalSavedMs: number }
+  ): void {
+    const rate = `${(stats.hitRate * 100).toFixed(0)}%`;
+    if (hit) {
+      console.log(`${prefix('info', 'AnswerCache')} ${colors.green}HIT${colors.reset} ${toolName} - saved ~${durationMs}ms (hit rate ${rate}, total saved ${(stats.totalSavedMs / 1000).toFixed(1)}s)`);
+    } else {
+      console.log(`${prefix('debug', 'AnswerCache')} MISS ${toolName} - computed in ${durationMs}ms (hit rate ${rate}, ${stats.hits}/${stats.hits + stats.misses})`);
+    }
+  }
+
   /**
    * Log reranking
    */
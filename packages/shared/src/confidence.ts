@@ -10,6 +10,7 @@
 
 import type { SearchResult } from './types.js';
 import type { QueryAnalysis } from './query-analyzer.js';
+import { tracer } from './tracing.js';
 
 /**
  * Individual scoring factors for transparency
@@ -58,27 +59,29 @@ export function calculateConfidenceScore(
   results: SearchResult[],
   answer: string
 ): ConfidenceResult {
-  const factors: ConfidenceFactors = {
-    retrievalScore: calculateRetrievalScore(results),
-    coverageScore: calculateCoverageScore(query, analysis, results),
-    answerQualityScore: calculateAnswerQuality(answer, analysis),
-    sourceConsistency: calculateSourceConsistency(results)
-  };
-
-  // Weighted average
-  const score = Math.round(
-    factors.retrievalScore * FACTOR_WEIGHTS.retrievalScore +
-    factors.coverageScore * FACTOR_WEIGHTS.coverageScore +
-    factors.answerQualityScore * FACTOR_WEIGHTS.answerQualityScore +
-    factors.sourceConsistency * FACTOR_WEIGHTS.sourceConsistency
-  );
-
-  return {
-    score,
-    factors,
-    explanation: generateExplanation(score, factors),
-    suggestedActions: generateSuggestedActions(score, factors, analysis)
-  };
+  return tracer.spanSync('confidence', () => {
+    const factors: ConfidenceFactors = {
+      retrievalScore: calculateRetrievalScore(results),
+      coverageScore: calculateCoverageScore(query, analysis, results),
+      answerQualityScore: calculateAnswerQuality(answer, analysis),
+      sourceConsistency: calculateSourceConsistency(results)
+    };
+
+    // Weighted average
+    const score = Math.round(
+      factors.retrievalScore * FACTOR_WEIGHTS.retrievalScore +
+      factors.coverageScore * FACTOR_WEIGHTS.coverageScore +
+      factors.answerQualityScore * FACTOR_WEIGHTS.answerQualityScore +
+      factors.sourceConsistency * FACTOR_WEIGHTS.sourceConsistency
+    );
+
+    return {
+      score,
+      factors,
+      explanation: generateExplanation(score, factors),
+      suggestedActions: generateSuggestedActions(score, factors, analysis)
+    };
+  });
 }
 
 /**
@@ -4,7 +4,7 @@
  * Implements corrective retrieval-augmented generation:
  * - Evaluates initial retrieval quality
  * - Generates alternative queries when results are poor
- * - Retries with expanded/modified queries
+ * - Retries with expanded/modified queries (concurrently, via RetrievalPlanner)
  * - Merges results from multiple retrieval attempts
  *
  * Based on the CRAG paper: https://arxiv.org/abs/2401.15884
@@ -13,7 +13,8 @@
 import type { SearchResult } from './types.js';
 import type { QueryAnalysis } from './query-analyzer.js';
 import type { HybridSearch } from './search.js';
-import { evaluateRetrievalQuality } from './confidence.js';
+import { RetrievalPlanner, type PlannedAttempt } from './retrieval-planner.js';
+import { tracer } from './tracing.js';
 
 /**
  * Options for corrective RAG
@@ -118,133 +119,38 @@ export function generateAlternativeQueries(
 }
 
 /**
- * Merge results from multiple searches, removing duplicates
+ * Options for a single corrective search call
  */
-function mergeSearchResults(
-  primary: SearchResult[],
-  secondary: SearchResult[]
-): SearchResult[] {
-  const seenIds = new Set(primary.map(r => r.chunk.id));
-  const uniqueSecondary = secondary.filter(r => !seenIds.has(r.chunk.id));
-
-  // Combine and sort by score
-  return [...primary, ...uniqueSecondary]
-    .sort((a, b) => (b.score || 0) - (a.score || 0));
+export interface CorrectiveSearchOptions extends Partial<CorrectiveRAGOptions> {
+  /** Per-request planner to share candidate pools and the latency budget with */
+  planner?: RetrievalPlanner;
+  /** First attempt already made with the planner; only alternatives are fetched */
+  initialAttempt?: PlannedAttempt;
 }
 
 /**
- * Perform corrective search with automatic retry on poor results
+ * Perform corrective search with automatic retry on poor results.
+ *
+ * Alternative queries are fetched concurrently, fused with the first
+ * attempt, and reranked once (see RetrievalPlanner).
  */
 export async function correctiveSearch(
   search: HybridSearch,
   query: string,
   analysis: QueryAnalysis,
   project: string,
-  options: Partial<CorrectiveRAGOptions> = {}
+  options: CorrectiveSearchOptions = {}
 ): Promise<CorrectiveSearchResult> {
-  const opts = { ...DEFAULT_OPTIONS, ...options };
-  const alternativeQueries: string[] = [];
+  const { planner, ...rest } = options;
+  const opts = { ...DEFAULT_OPTIONS, ...rest };
 
-  // Initial search
-  const initialResults = await search.search(query, {
+  const activePlanner = planner ?? new RetrievalPlanner(search, { project, analysis });
+  return tracer.span('corrective', () => activePlanner.correctiveSearch(query, {
+    ...opts,
+    analysis,
     limit: 15,
-    project,
-    rerank: true,
     rerankTopK: 10
-  });
-
-  // Evaluate initial quality
-  const initialQuality = evaluateRetrievalQuality(query, initialResults);
-
-  // If quality is high, return immediately
-  if (initialQuality === 'high') {
-    return {
-      results: initialResults,
-      wasRetried: false,
-      retriesUsed: 0,
-      quality: 'high',
-      alternativeQueries: []
-    };
-  }
-
-  // If quality is medium and we have enough results, might be acceptable
-  if (initialQuality === 'medium' && initialResults.length >= opts.minResultsThreshold) {
-    return {
-      results: initialResults,
-      wasRetried: false,
-      retriesUsed: 0,
-      quality: 'medium',
-      alternativeQueries: []
-    };
-  }
-
-  // Quality is low - try alternative queries
-  const alternatives = generateAlternativeQueries(query, analysis);
-  let bestResults = initialResults;
-  let bestQuality: 'high' | 'medium' | 'low' = initialQuality;
-  let retriesUsed = 0;
-
-  for (const altQuery of alternatives.slice(0, opts.maxRetries)) {
-    retriesUsed++;
-    alternativeQueries.push(altQuery);
-
-    const altResults = await search.search(altQuery, {
-      limit: 15,
-      project,
-      rerank: true,
-      rerankTopK: 10
-    });
-
-    // Evaluate alternative results
-    const altQuality = evaluateRetrievalQuality(query, altResults);
-
-    if (opts.mergeResults) {
-      // Merge with existing results
-      bestResults = mergeSearchResults(bestResults, altResults);
-    } else if (altResults.length > bestResults.length ||
-               qualityRank(altQuality) > qualityRank(bestQuality)) {
-      // Replace if better
-      bestResults = altResults;
-      bestQuality = altQuality;
-    }
-
-    // Re-evaluate merged results
-    const mergedQuality = evaluateRetrievalQuality(query, bestResults);
-
-    // Stop if we've reached acceptable quality
-    if (mergedQuality === 'high' ||
-        (mergedQuality === 'medium' && bestResults.length >= opts.minResultsThreshold * 2)) {
-      bestQuality = mergedQuality;
-      break;
-    }
-
-    // Update best quality
-    if (qualityRank(mergedQuality) > qualityRank(bestQuality)) {
-      bestQuality = mergedQuality;
-    }
-  }
-
-  // Limit final results
-  const finalResults = bestResults.slice(0, 15);
-
-  return {
-    results: finalResults,
-    wasRetried: retriesUsed > 0,
-    retriesUsed,
-    quality: bestQuality,
-    alternativeQueries
-  };
-}
-
-/**
- * Convert quality to numeric rank for comparison
- */
-function qualityRank(quality: 'high' | 'medium' | 'low'): number {
-  switch (quality) {
-    case 'high': return 3;
-    case 'medium': return 2;
-    case 'low': return 1;
-  }
+  }));
 }
 
 /**
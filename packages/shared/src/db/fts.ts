@@ -7,57 +7,102 @@ export interface FullTextDBOptions {
   path: string;
 }
 
+/**
+ * HTTP validators stored per page for conditional re-crawls
+ */
+export interface PageValidators {
+  etag: string | null;
+  lastModified: string | null;
+  /** Outgoing links, so a 304 response can still extend the crawl frontier */
+  links: string[];
+}
+
+/**
+ * Last ingested state of one file in a GitHub source
+ */
+export interface GitHubFileState {
+  path: string;
+  blobSha: string;
+  /** Blob SHA of the README used as quality-assessment context, if any */
+  readmeSha: string | null;
+  /** Outcome of the quality pipeline for this blob */
+  verdict: 'indexed' | 'rejected';
+  reason: string | null;
+  url: string;
+  chunkCount: number;
+}
+
+/**
+ * Last ingested state of a GitHub source: the commit it was read at and
+ * a fingerprint of the scrape settings, plus per-file blob SHAs/verdicts
+ */
+export interface GitHubSourceState {
+  sourceId: string;
+  repo: string;
+  commitSha: string;
+  configHash: string;
+  files: GitHubFileState[];
+}
+
+// Parsed chunk metadata kept between searches (keyed by chunk id)
+const METADATA_CACHE_SIZE = 5000;
+
+// BM25 column weights for chunks_fts: title, section, content, project, content_type.
+// project and content_type are indexed only so MATCH can scope by them.
+const BM25_WEIGHTS = '1.0, 1.0, 1.0, 0.0, 0.0';
+
+const CHUNKS_SCHEMA = `
+  CREATE TABLE IF NOT EXISTS chunks (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    section TEXT NOT NULL,
+    content TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    project TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    orphaned INTEGER DEFAULT 0,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+  )
+`;
+
 export class FullTextDB {
   private db: Database.Database;
+  private statements = new Map<string, Database.Statement>();
+  private metadataCache = new Map<string, { raw: string; parsed: DocumentChunk['metadata'] }>();
 
   constructor(private options: FullTextDBOptions) {
     // Ensure directory exists
     mkdirSync(dirname(options.path), { recursive: true });
     this.db = new Database(options.path);
+
+    // WAL lets the server read while the scraper writes; mmap avoids
+    // copying pages through the SQLite page cache on reads
+    this.db.pragma('journal_mode = WAL');
+    this.db.pragma('synchronous = NORMAL');
+    this.db.pragma('mmap_size = 268435456');
+    this.db.pragma('temp_store = MEMORY');
+    this.db.pragma('cache_size = -65536');
   }
 
   async initialize(): Promise<void> {
-    // Create main table with project column
-    this.db.exec(`
-      CREATE TABLE IF NOT EXISTS chunks (
-        id TEXT PRIMARY KEY,
-        url TEXT NOT NULL,
-        title TEXT NOT NULL,
-        section TEXT NOT NULL,
-        content TEXT NOT NULL,
-        content_type TEXT NOT NULL,
-        project TEXT NOT NULL,
-        metadata TEXT NOT NULL,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-      )
-    `);
+    // Older databases keyed chunks_fts by an UNINDEXED content_id column and
+    // stored a second copy of the text; convert them before anything else
+    this.migrateChunkStorage();
 
-    // Create index for project filtering
+    // Main table. seq is the stable rowid that chunks_fts points at.
+    this.db.exec(CHUNKS_SCHEMA);
+
+    // Indexes for project filtering and URL-based deletion
     this.db.exec(`
       CREATE INDEX IF NOT EXISTS idx_chunks_project ON chunks(project)
     `);
-
-    // Add orphaned column if it doesn't exist (migration for existing databases)
-    const columns = this.db.prepare("PRAGMA table_info(chunks)").all() as Array<{name: string}>;
-    if (!columns.some(c => c.name === 'orphaned')) {
-      this.db.exec(`ALTER TABLE chunks ADD COLUMN orphaned INTEGER DEFAULT 0`);
-    }
-
-    // Create index for URL-based deletion
     this.db.exec(`
       CREATE INDEX IF NOT EXISTS idx_chunks_url ON chunks(url)
     `);
 
-    // Create FTS5 virtual table
-    this.db.exec(`
-      CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
-        title,
-        section,
-        content,
-        content_id UNINDEXED,
-        tokenize='porter unicode61'
-      )
-    `);
+    this.createFtsIndex();
 
     // Create page_hashes table for change detection
     this.db.exec(`
@@ -74,21 +119,80 @@ export class FullTextDB {
     this.db.exec(`
       CREATE INDEX IF NOT EXISTS idx_page_hashes_project ON page_hashes(project)
     `);
-  }
 
-  async upsert(chunks: DocumentChunk[]): Promise<void> {
-    const insertChunk = this.db.prepare(`
-      INSERT OR REPLACE INTO chunks (id, url, title, section, content, content_type, project, metadata, orphaned)
-      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    // Add HTTP validator columns if they don't exist (migration for existing databases)
+    const hashColumns = this.db.prepare("PRAGMA table_info(page_hashes)").all() as Array<{name: string}>;
+    if (!hashColumns.some(c => c.name === 'etag')) {
+      this.db.exec(`ALTER TABLE page_hashes ADD COLUMN etag TEXT`);
+    }
+    if (!hashColumns.some(c => c.name === 'last_modified')) {
+      this.db.exec(`ALTER TABLE page_hashes ADD COLUMN last_modified TEXT`);
+    }
+    if (!hashColumns.some(c => c.name === 'links')) {
+      this.db.exec(`ALTER TABLE page_hashes ADD COLUMN links TEXT`);
+    }
+
+    // Incremental GitHub ingestion state (blob SHAs and quality verdicts)
+    this.db.exec(`
+      CREATE TABLE IF NOT EXISTS github_sources (
+        source_id TEXT PRIMARY KEY,
+        repo TEXT NOT NULL,
+        commit_sha TEXT NOT NULL,
+        config_hash TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+      )
+    `);
+    this.db.exec(`
+      CREATE TABLE IF NOT EXISTS github_files (
+        source_id TEXT NOT NULL,
+        path TEXT NOT NULL,
+        blob_sha TEXT NOT NULL,
+        readme_sha TEXT,
+        verdict TEXT NOT NULL,
+        reason TEXT,
+        url TEXT NOT NULL,
+        chunk_count INTEGER NOT NULL,
+        PRIMARY KEY (source_id, path)
+      )
     `);
 
-    const deleteFts = this.db.prepare(`
-      DELETE FROM chunks_fts WHERE content_id = ?
+    // Persistent cache of query embeddings (see QueryEmbeddingCache)
+    this.db.exec(`
+      CREATE TABLE IF NOT EXISTS query_embeddings (
+        model TEXT NOT NULL,
+        text TEXT NOT NULL,
+        embedding BLOB NOT NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (model, text)
+      )
     `);
 
-    const insertFts = this.db.prepare(`
-      INSERT INTO chunks_fts (title, section, content, content_id)
-      VALUES (?, ?, ?, ?)
+    // Last use (epoch ms) drives LRU/TTL pruning of the persistent cache
+    const embeddingColumns = this.db.prepare("PRAGMA table_info(query_embeddings)").all() as Array<{name: string}>;
+    if (!embeddingColumns.some(c => c.name === 'last_used_at')) {
+      this.db.exec(`ALTER TABLE query_embeddings ADD COLUMN last_used_at INTEGER NOT NULL DEFAULT 0`);
+      this.db.prepare('UPDATE query_embeddings SET last_used_at = ?').run(Date.now());
+    }
+    this.db.exec(`
+      CREATE INDEX IF NOT EXISTS idx_query_embeddings_last_used ON query_embeddings(last_used_at)
+    `);
+  }
+
+  async upsert(chunks: DocumentChunk[]): Promise<void> {
+    // ON CONFLICT keeps the row's seq, so the FTS update trigger replaces
+    // the indexed text in place instead of deleting and re-adding the row
+    const insertChunk = this.prepare(`
+      INSERT INTO chunks (id, url, title, section, content, content_type, project, metadata, orphaned)
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+      ON CONFLICT(id) DO UPDATE SET
+        url = excluded.url,
+        title = excluded.title,
+        section = excluded.section,
+        content = excluded.content,
+        content_type = excluded.content_type,
+        project = excluded.project,
+        metadata = excluded.metadata,
+        orphaned = excluded.orphaned
     `);
 
     const transaction = this.db.transaction((chunks: DocumentChunk[]) => {
@@ -104,10 +208,6 @@ export class FullTextDB {
           JSON.stringify(chunk.metadata),
           chunk.metadata.orphaned ? 1 : 0
         );
-
-        // Update FTS index
-        deleteFts.run(chunk.id);
-        insertFts.run(chunk.title, chunk.section, chunk.content, chunk.id);
       }
     });
 
@@ -132,47 +232,42 @@ export class FullTextDB {
       return [];
     }
 
+    // Terms only match the text columns. Project / type filters are part of
+    // the MATCH so other projects' rows are never ranked; the column
+    // equality checks below keep the filter exact.
+    let match = `{title section content} : (${escapedQuery})`;
     let sql = `
       SELECT
         c.*,
-        bm25(chunks_fts) as score
-      FROM chunks_fts fts
-      JOIN chunks c ON c.id = fts.content_id
+        bm25(chunks_fts, ${BM25_WEIGHTS}) as score
+      FROM chunks_fts
+      JOIN chunks c ON c.seq = chunks_fts.rowid
       WHERE chunks_fts MATCH ?
     `;
 
-    const params: any[] = [escapedQuery];
+    const params: any[] = [];
 
     if (contentType) {
+      match += ` AND content_type : ${quoteFtsPhrase(contentType)}`;
       sql += ` AND c.content_type = ?`;
       params.push(contentType);
     }
 
     if (project) {
+      match += ` AND project : ${quoteFtsPhrase(project)}`;
       sql += ` AND c.project = ?`;
       params.push(project);
     }
 
     sql += ` ORDER BY score LIMIT ?`;
+    params.unshift(match);
     params.push(limit);
 
     try {
-      const rows = this.db.prepare(sql).all(...params) as any[];
+      const rows = this.prepare(sql).all(...params) as any[];
 
       return rows.map(row => ({
-        chunk: {
-          id: row.id,
-          url: row.url,
-          title: row.title,
-          section: row.section,
-          content: row.content,
-          contentType: row.content_type,
-          project: row.project,
-          metadata: {
-            ...JSON.parse(row.metadata),
-            orphaned: row.orphaned === 1
-          }
-        },
+        chunk: this.rowToChunk(row),
         score: Math.abs(row.score) // BM25 returns negative scores
       }));
     } catch (error) {
@@ -181,47 +276,90 @@ export class FullTextDB {
     }
   }
 
+  /**
+   * Load full chunks by id (used to hydrate vector search hits)
+   */
+  async getChunksByIds(ids: string[]): Promise<Map<string, DocumentChunk>> {
+    const chunks = new Map<string, DocumentChunk>();
+    if (ids.length === 0) return chunks;
+
+    // One cached statement for any number of ids
+    const rows = this.prepare(
+      'SELECT * FROM chunks WHERE id IN (SELECT value FROM json_each(?))'
+    ).all(JSON.stringify(ids)) as any[];
+    for (const row of rows) {
+      chunks.set(row.id, this.rowToChunk(row));
+    }
+
+    return chunks;
+  }
+
+  private rowToChunk(row: any): DocumentChunk {
+    return {
+      id: row.id,
+      url: row.url,
+      title: row.title,
+      section: row.section,
+      content: row.content,
+      contentType: row.content_type,
+      project: row.project,
+      metadata: {
+        ...this.parseMetadata(row.id, row.metadata),
+        orphaned: row.orphaned === 1
+      }
+    };
+  }
+
+  /**
+   * JSON.parse metadata once per chunk version; the raw string is compared
+   * so rows rewritten by another process (e.g. the scraper) are re-parsed
+   */
+  private parseMetadata(id: string, raw: string): DocumentChunk['metadata'] {
+    const cached = this.metadataCache.get(id);
+    if (cached && cached.raw === raw) {
+      return cached.parsed;
+    }
+
+    const parsed = JSON.parse(raw);
+    this.metadataCache.delete(id);
+    this.metadataCache.set(id, { raw, parsed });
+    if (this.metadataCache.size > METADATA_CACHE_SIZE) {
+      this.metadataCache.delete(this.metadataCache.keys().next().value as string);
+    }
+    return parsed;
+  }
+
   /**
    * Delete all chunks matching a specific URL
    */
   async deleteByUrl(url: string): Promise<number> {
-    const chunks = this.db.prepare('SELECT id FROM chunks WHERE url = ?').all(url) as Array<{id: string}>;
-    if (chunks.length === 0) return 0;
+    // The chunks_fts delete trigger removes index entries by rowid
+    return this.prepare('DELETE FROM chunks WHERE url = ?').run(url).changes;
+  }
 
-    const transaction = this.db.transaction(() => {
-      for (const chunk of chunks) {
-        this.db.prepare('DELETE FROM chunks_fts WHERE content_id = ?').run(chunk.id);
-      }
-      this.db.prepare('DELETE FROM chunks WHERE url = ?').run(url);
-    });
+  /**
+   * Delete all chunks matching any of the given URLs in one statement
+   */
+  async deleteByUrls(urls: string[]): Promise<number> {
+    if (urls.length === 0) return 0;
 
-    transaction();
-    return chunks.length;
+    return this.prepare(
+      'DELETE FROM chunks WHERE url IN (SELECT value FROM json_each(?))'
+    ).run(JSON.stringify(urls)).changes;
   }
 
   /**
    * Delete all chunks for a project
    */
   async deleteByProject(project: string): Promise<number> {
-    const chunks = this.db.prepare('SELECT id FROM chunks WHERE project = ?').all(project) as Array<{id: string}>;
-    if (chunks.length === 0) return 0;
-
-    const transaction = this.db.transaction(() => {
-      for (const chunk of chunks) {
-        this.db.prepare('DELETE FROM chunks_fts WHERE content_id = ?').run(chunk.id);
-      }
-      this.db.prepare('DELETE FROM chunks WHERE project = ?').run(project);
-    });
-
-    transaction();
-    return chunks.length;
+    return this.prepare('DELETE FROM chunks WHERE project = ?').run(project).changes;
   }
 
   /**
    * Get all unique URLs for a project
    */
   async getUrlsForProject(project: string): Promise<string[]> {
-    const rows = this.db.prepare('SELECT DISTINCT url FROM chunks WHERE project = ?').all(project) as Array<{url: string}>;
+    const rows = this.prepare('SELECT DISTINCT url FROM chunks WHERE project = ?').all(project) as Array<{url: string}>;
     return rows.map(r => r.url);
   }
 
@@ -229,20 +367,26 @@ export class FullTextDB {
    * Mark all chunks for given URLs as orphaned
    */
   async markOrphaned(urls: string[], orphaned: boolean): Promise<void> {
-    const stmt = this.db.prepare('UPDATE chunks SET orphaned = ? WHERE url = ?');
-    const transaction = this.db.transaction(() => {
-      for (const url of urls) {
-        stmt.run(orphaned ? 1 : 0, url);
-      }
-    });
-    transaction();
+    if (urls.length === 0) return;
+
+    this.prepare(
+      'UPDATE chunks SET orphaned = ? WHERE url IN (SELECT value FROM json_each(?))'
+    ).run(orphaned ? 1 : 0, JSON.stringify(urls));
+  }
+
+  /**
+   * Get URLs in a project that currently have orphaned chunks
+   */
+  async getOrphanedUrlsForProject(project: string): Promise<string[]> {
+    const rows = this.prepare('SELECT DISTINCT url FROM chunks WHERE project = ? AND orphaned = 1').all(project) as Array<{url: string}>;
+    return rows.map(r => r.url);
   }
 
   /**
    * Get the stored content hash for a URL
    */
   async getPageHash(url: string): Promise<string | null> {
-    const row = this.db.prepare('SELECT content_hash FROM page_hashes WHERE url = ?').get(url) as {content_hash: string} | undefined;
+    const row = this.prepare('SELECT content_hash FROM page_hashes WHERE url = ?').get(url) as {content_hash: string} | undefined;
     return row?.content_hash || null;
   }
 
@@ -250,28 +394,293 @@ export class FullTextDB {
    * Update or insert the content hash for a URL
    */
   async setPageHash(url: string, project: string, contentHash: string, chunkCount: number): Promise<void> {
-    this.db.prepare(`
+    this.prepare(`
       INSERT OR REPLACE INTO page_hashes (url, project, content_hash, chunk_count, last_indexed)
       VALUES (?, ?, ?, ?, ?)
     `).run(url, project, contentHash, chunkCount, new Date().toISOString());
   }
 
+  /**
+   * Get stored HTTP validators (ETag / Last-Modified) and links for a URL
+   */
+  async getPageValidators(url: string): Promise<PageValidators | null> {
+    const row = this.prepare('SELECT etag, last_modified, links FROM page_hashes WHERE url = ?').get(url) as {etag: string | null; last_modified: string | null; links: string | null} | undefined;
+    if (!row || (!row.etag && !row.last_modified)) return null;
+
+    return {
+      etag: row.etag,
+      lastModified: row.last_modified,
+      links: row.links ? JSON.parse(row.links) : []
+    };
+  }
+
+  /**
+   * Store HTTP validators for a URL (the page hash row must already exist)
+   */
+  async setPageValidators(url: string, validators: PageValidators): Promise<void> {
+    this.prepare(`
+      UPDATE page_hashes SET etag = ?, last_modified = ?, links = ? WHERE url = ?
+    `).run(validators.etag, validators.lastModified, JSON.stringify(validators.links), url);
+  }
+
   /**
    * Get all indexed URLs for a project (from page_hashes table)
    */
   async getIndexedUrlsForProject(project: string): Promise<string[]> {
-    const rows = this.db.prepare('SELECT url FROM page_hashes WHERE project = ?').all(project) as Array<{url: string}>;
+    const rows = this.prepare('SELECT url FROM page_hashes WHERE project = ?').all(project) as Array<{url: string}>;
     return rows.map(r => r.url);
   }
 
+  /**
+   * Get a version string for a project's index.
+   * Changes whenever a page is added, re-indexed, or removed.
+   */
+  async getIndexVersion(project: string): Promise<string> {
+    const row = this.prepare(`
+      SELECT
+        COUNT(*) as pages,
+        COALESCE(SUM(chunk_count), 0) as chunks,
+        COALESCE(MAX(last_indexed), '') as latest
+      FROM page_hashes
+      WHERE project = ?
+    `).get(project) as {pages: number; chunks: number; latest: string};
+    return `${row.pages}:${row.chunks}:${row.latest}`;
+  }
+
   /**
    * Delete page hash record
    */
   async deletePageHash(url: string): Promise<void> {
-    this.db.prepare('DELETE FROM page_hashes WHERE url = ?').run(url);
+    this.prepare('DELETE FROM page_hashes WHERE url = ?').run(url);
+  }
+
+  /**
+   * Get the last ingested state of a GitHub source
+   */
+  async getGitHubSourceState(sourceId: string): Promise<GitHubSourceState | null> {
+    const source = this.prepare(
+      'SELECT repo, commit_sha, config_hash FROM github_sources WHERE source_id = ?'
+    ).get(sourceId) as {repo: string; commit_sha: string; config_hash: string} | undefined;
+    if (!source) return null;
+
+    const rows = this.prepare(`
+      SELECT path, blob_sha, readme_sha, verdict, reason, url, chunk_count
+      FROM github_files WHERE source_id = ?
+    `).all(sourceId) as Array<{
+      path: string; blob_sha: string; readme_sha: string | null;
+      verdict: 'indexed' | 'rejected'; reason: string | null; url: string; chunk_count: number;
+    }>;
+
+    return {
+      sourceId,
+      repo: source.repo,
+      commitSha: source.commit_sha,
+      configHash: source.config_hash,
+      files: rows.map(r => ({
+        path: r.path,
+        blobSha: r.blob_sha,
+        readmeSha: r.readme_sha,
+        verdict: r.verdict,
+        reason: r.reason,
+        url: r.url,
+        chunkCount: r.chunk_count
+      }))
+    };
+  }
+
+  /**
+   * Replace the stored state of a GitHub source (one transaction)
+   */
+  async saveGitHubSourceState(state: GitHubSourceState): Promise<void> {
+    const upsertSource = this.prepare(`
+      INSERT OR REPLACE INTO github_sources (source_id, repo, commit_sha, config_hash, updated_at)
+      VALUES (?, ?, ?, ?, ?)
+    `);
+    const clearFiles = this.prepare('DELETE FROM github_files WHERE source_id = ?');
+    const insertFile = this.prepare(`
+      INSERT INTO github_files (source_id, path, blob_sha, readme_sha, verdict, reason, url, chunk_count)
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    `);
+
+    this.db.transaction(() => {
+      upsertSource.run(state.sourceId, state.repo, state.commitSha, state.configHash, new Date().toISOString());
+      clearFiles.run(state.sourceId);
+      for (const file of state.files) {
+        insertFile.run(
+          state.sourceId, file.path, file.blobSha, file.readmeSha,
+          file.verdict, file.reason, file.url, file.chunkCount
+        );
+      }
+    })();
+  }
+
+  /**
+   * Get a cached query embedding (stored as Float32 little-endian bytes).
+   * A hit refreshes the entry's last-used time.
+   */
+  async getQueryEmbedding(model: string, text: string): Promise<number[] | null> {
+    const row = this.prepare('SELECT embedding FROM query_embeddings WHERE model = ? AND text = ?').get(model, text) as {embedding: Buffer} | undefined;
+    if (!row) return null;
+
+    this.prepare('UPDATE query_embeddings SET last_used_at = ? WHERE model = ? AND text = ?').run(Date.now(), model, text);
+
+    const floats = new Float32Array(row.embedding.buffer, row.embedding.byteOffset, row.embedding.byteLength / 4);
+    return Array.from(floats);
+  }
+
+  /**
+   * Store a query embedding for reuse across restarts
+   */
+  async setQueryEmbedding(model: string, text: string, embedding: number[]): Promise<void> {
+    const bytes = Buffer.from(new Float32Array(embedding).buffer);
+    this.prepare(`
+      INSERT OR REPLACE INTO query_embeddings (model, text, embedding, last_used_at)
+      VALUES (?, ?, ?, ?)
+    `).run(model, text, bytes, Date.now());
+  }
+
+  /**
+   * Drop query embeddings unused for longer than maxAgeMs, then the least
+   * recently used ones beyond maxEntries. Returns the number removed.
+   */
+  async pruneQueryEmbeddings(options: { maxEntries?: number; maxAgeMs?: number }): Promise<number> {
+    let removed = 0;
+
+    if (options.maxAgeMs !== undefined) {
+      removed += this.prepare('DELETE FROM query_embeddings WHERE last_used_at < ?')
+        .run(Date.now() - options.maxAgeMs).changes;
+    }
+
+    if (options.maxEntries !== undefined) {
+      removed += this.prepare(`
+        DELETE FROM query_embeddings WHERE rowid IN (
+          SELECT rowid FROM query_embeddings ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+        )
+      `).run(options.maxEntries).changes;
+    }
+
+    return removed;
+  }
+
+  /**
+   * Number of query embeddings stored on disk
+   */
+  async getQueryEmbeddingCount(): Promise<number> {
+    const row = this.prepare('SELECT COUNT(*) as count FROM query_embeddings').get() as { count: number };
+    return row.count;
   }
 
   async close(): Promise<void> {
+    this.statements.clear();
     this.db.close();
   }
+
+  /**
+   * Prepare a statement once and reuse it
+   */
+  private prepare(sql: string): Database.Statement {
+    let statement = this.statements.get(sql);
+    if (!statement) {
+      statement = this.db.prepare(sql);
+      this.statements.set(sql, statement);
+    }
+    return statement;
+  }
+
+  /**
+   * External-content FTS5 index over chunks, kept in sync by triggers.
+   * Text is stored once (in chunks); the index only holds postings.
+   */
+  private createFtsIndex(): void {
+    this.db.exec(`
+      CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+        title,
+        section,
+        content,
+        project,
+        content_type,
+        content='chunks',
+        content_rowid='seq',
+        tokenize='porter unicode61'
+      );
+
+      CREATE TRIGGER IF NOT EXISTS chunks_fts_insert AFTER INSERT ON chunks BEGIN
+        INSERT INTO chunks_fts (rowid, title, section, content, project, content_type)
+        VALUES (new.seq, new.title, new.section, new.content, new.project, new.content_type);
+      END;
+
+      CREATE TRIGGER IF NOT EXISTS chunks_fts_delete AFTER DELETE ON chunks BEGIN
+        INSERT INTO chunks_fts (chunks_fts, rowid, title, section, content, project, content_type)
+        VALUES ('delete', old.seq, old.title, old.section, old.content, old.project, old.content_type);
+      END;
+
+      CREATE TRIGGER IF NOT EXISTS chunks_fts_update
+      AFTER UPDATE OF title, section, content, project, content_type ON chunks BEGIN
+        INSERT INTO chunks_fts (chunks_fts, rowid, title, section, content, project, content_type)
+        VALUES ('delete', old.seq, old.title, old.section, old.content, old.project, old.content_type);
+        INSERT INTO chunks_fts (rowid, title, section, content, project, content_type)
+        VALUES (new.seq, new.title, new.section, new.content, new.project, new.content_type);
+      END;
+    `);
+  }
+
+  /**
+   * Convert a database from the original layout (chunks keyed by TEXT id
+   * only, chunks_fts holding its own copy of the text plus content_id) to
+   * the external-content layout. Runs once; a no-op for new databases.
+   */
+  private migrateChunkStorage(): void {
+    const tables = this.db.prepare(`
+      SELECT name, sql FROM sqlite_master WHERE name IN ('chunks', 'chunks_fts')
+    `).all() as Array<{name: string; sql: string}>;
+
+    const chunksTable = tables.find(t => t.name === 'chunks');
+    const ftsTable = tables.find(t => t.name === 'chunks_fts');
+    if (!chunksTable) return;
+
+    const columns = this.db.prepare('PRAGMA table_info(chunks)').all() as Array<{name: string}>;
+    const needsSeq = !columns.some(c => c.name === 'seq');
+    const legacyFts = ftsTable !== undefined && ftsTable.sql.includes('content_id');
+    if (!needsSeq && !legacyFts) return;
+
+    console.log('[FullTextDB] Migrating chunk storage to external-content FTS5 (one-time)...');
+    const start = Date.now();
+    const hasOrphaned = columns.some(c => c.name === 'orphaned');
+
+    const migrate = this.db.transaction(() => {
+      this.db.exec('DROP TABLE IF EXISTS chunks_fts');
+
+      if (needsSeq) {
+        this.db.exec('ALTER TABLE chunks RENAME TO chunks_legacy');
+        this.db.exec(CHUNKS_SCHEMA);
+        this.db.exec(`
+          INSERT INTO chunks (id, url, title, section, content, content_type, project, metadata, orphaned, created_at)
+          SELECT id, url, title, section, content, content_type, project, metadata,
+                 ${hasOrphaned ? 'COALESCE(orphaned, 0)' : '0'}, created_at
+          FROM chunks_legacy
+        `);
+        this.db.exec('DROP TABLE chunks_legacy');
+      }
+
+      // Indexes were dropped with the old table; recreate before rebuilding
+      this.db.exec('CREATE INDEX IF NOT EXISTS idx_chunks_project ON chunks(project)');
+      this.db.exec('CREATE INDEX IF NOT EXISTS idx_chunks_url ON chunks(url)');
+
+      this.createFtsIndex();
+      this.db.exec(`INSERT INTO chunks_fts (chunks_fts) VALUES ('rebuild')`);
+    });
+
+    migrate();
+
+    // Reclaim the space held by the duplicated FTS text
+    this.db.exec('VACUUM');
+    console.log(`[FullTextDB] Migration complete in ${((Date.now() - start) / 1000).toFixed(1)}s`);
+  }
+}
+
+/**
+ * Quote a value as an FTS5 phrase (used for column-scoped filters)
+ */
+function quoteFtsPhrase(value: string): string {
+  return `"${value.replace(/"/g, '""')}"`;
 }
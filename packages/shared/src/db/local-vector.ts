@@ -0,0 +1,941 @@
+/**
+ * Embedded Local Vector Store
+ *
+ * In-process alternative to Qdrant:
+ * - Embeddings kept as one contiguous Float32Array (L2-normalized, so the
+ *   dot product is the cosine similarity)
+ * - Optional int8-quantized copy used for a fast first pass, rescored
+ *   with the float32 vectors
+ * - Per-project row lists for pre-filtering by project / contentType
+ * - IVF (inverted file) index used once a filtered candidate set is large
+ * - Search returns ids only; chunk bodies are hydrated from SQLite
+ *
+ * Everything lives in a single flat file next to the SQLite database.
+ * The file is read into one buffer and the vector sections are used as
+ * typed-array views over it, so the layout is ready for mmap.
+ *
+ * The file is rewritten whole on flush, so only one process may write it
+ * at a time: the first write takes a lock file (<path>.lock, holding the
+ * writer's pid) and a second writer fails instead of overwriting the
+ * first one's vectors. Readers (the server) need no lock.
+ */
+
+import {
+  closeSync,
+  existsSync,
+  mkdirSync,
+  openSync,
+  readFileSync,
+  renameSync,
+  statSync,
+  unlinkSync,
+  writeFileSync
+} from 'fs';
+import { dirname } from 'path';
+import type { DocumentChunk } from '../types.js';
+import type { VectorStore, VectorUpsertOptions, VectorSearchOptions } from './vector-store.js';
+
+export interface LocalVectorStoreOptions {
+  /** Path to the vector file */
+  path: string;
+  /** Load full chunks for a set of ids (normally FullTextDB.getChunksByIds) */
+  hydrate: (ids: string[]) => Promise<Map<string, DocumentChunk>>;
+  /** Embedding dimensions. Default: 1536 (text-embedding-3-small) */
+  dimensions?: number;
+  /** Keep an int8-quantized copy for the first scoring pass. Default: false */
+  quantize?: boolean;
+  /** Candidate count above which the IVF index is used. Default: 20000 */
+  annThreshold?: number;
+  /** IVF lists probed per query. Default: 12 */
+  nprobe?: number;
+}
+
+export interface VectorHit {
+  id: string;
+  score: number;
+}
+
+export interface LocalSearchOptions extends VectorSearchOptions {
+  /** Force exact brute-force search (used for recall benchmarks) */
+  exact?: boolean;
+}
+
+interface IvfIndex {
+  nlist: number;
+  centroids: Float32Array;
+  lists: number[][];
+  /** List index for each row, -1 if unassigned */
+  assignment: Int32Array;
+}
+
+const FILE_MAGIC = 0x53564443; // "CDVS"
+const FILE_VERSION = 1;
+const HEADER_BYTES = 28;
+const FLAG_QUANTIZED = 1;
+const FLAG_IVF = 2;
+
+const DEFAULT_DIMENSIONS = 1536;
+const DEFAULT_ANN_THRESHOLD = 20000;
+const DEFAULT_NPROBE = 12;
+const KMEANS_ITERATIONS = 8;
+const KMEANS_SAMPLE_PER_LIST = 40;
+// Quantized first pass keeps this many candidates per requested result
+const RESCORE_FACTOR = 4;
+// How often a read-only process checks whether the file was rewritten
+const RELOAD_CHECK_MS = 5000;
+
+/**
+ * Fixed-size min-heap that keeps the k highest scores
+ */
+class TopK {
+  private rows: number[] = [];
+  private scores: number[] = [];
+
+  constructor(private k: number) {}
+
+  push(row: number, score: number): void {
+    if (this.rows.length < this.k) {
+      this.rows.push(row);
+      this.scores.push(score);
+      this.siftUp(this.rows.length - 1);
+    } else if (score > this.scores[0]) {
+      this.rows[0] = row;
+      this.scores[0] = score;
+      this.siftDown(0);
+    }
+  }
+
+  /**
+   * Results sorted by descending score
+   */
+  sorted(): Array<{ row: number; score: number }> {
+    return this.rows
+      .map((row, i) => ({ row, score: this.scores[i] }))
+      .sort((a, b) => b.score - a.score);
+  }
+
+  private siftUp(i: number): void {
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (this.scores[parent] <= this.scores[i]) break;
+      this.swap(i, parent);
+      i = parent;
+    }
+  }
+
+  private siftDown(i: number): void {
+    const n = this.rows.length;
+    while (true) {
+      const left = 2 * i + 1;
+      const right = left + 1;
+      let smallest = i;
+      if (left < n && this.scores[left] < this.scores[smallest]) smallest = left;
+      if (right < n && this.scores[right] < this.scores[smallest]) smallest = right;
+      if (smallest === i) break;
+      this.swap(i, smallest);
+      i = smallest;
+    }
+  }
+
+  private swap(a: number, b: number): void {
+    [this.rows[a], this.rows[b]] = [this.rows[b], this.rows[a]];
+    [this.scores[a], this.scores[b]] = [this.scores[b], this.scores[a]];
+  }
+}
+
+export class LocalVectorStore implements VectorStore {
+  private dim: number;
+  private quantize: boolean;
+  private annThreshold: number;
+  private nprobe: number;
+
+  private count = 0;
+  private capacity = 0;
+  private vectors = new Float32Array(0);
+  private qvectors = new Int8Array(0);
+  private qscales = new Float32Array(0);
+  private alive = new Uint8Array(0);
+
+  private ids: string[] = [];
+  private urls: string[] = [];
+  private projects: string[] = [];
+  private contentTypes: string[] = [];
+  private orphaned: boolean[] = [];
+  private idToRow = new Map<string, number>();
+  private projectRows = new Map<string, number[]>();
+  private deadRows = 0;
+
+  private ivf: IvfIndex | null = null;
+  private dirty = false;
+  private lockPath: string | null = null;
+  private loadedMtimeMs = 0;
+  private lastReloadCheck = 0;
+
+  constructor(private options: LocalVectorStoreOptions) {
+    this.dim = options.dimensions ?? DEFAULT_DIMENSIONS;
+    this.quantize = options.quantize ?? false;
+    this.annThreshold = options.annThreshold ?? DEFAULT_ANN_THRESHOLD;
+    this.nprobe = options.nprobe ?? DEFAULT_NPROBE;
+  }
+
+  async initialize(): Promise<void> {
+    mkdirSync(dirname(this.options.path), { recursive: true });
+    if (existsSync(this.options.path)) {
+      this.load();
+    }
+  }
+
+  get size(): number {
+    return this.count - this.deadRows;
+  }
+
+  async upsert(
+    chunks: DocumentChunk[],
+    embeddings: number[][],
+    _options: VectorUpsertOptions = {}
+  ): Promise<void> {
+    this.acquireWriteLock();
+    chunks.forEach((chunk, i) => {
+      const embedding = embeddings[i];
+      if (!embedding || embedding.length !== this.dim) {
+        throw new Error(`Embedding for ${chunk.id} has ${embedding?.length ?? 0} dimensions, expected ${this.dim}`);
+      }
+
+      let row = this.idToRow.get(chunk.id);
+      if (row === undefined) {
+        row = this.appendRow(chunk);
+      } else if (this.projects[row] !== chunk.project) {
+        // Project changed: retire the old row so project row lists stay valid
+        this.killRow(row);
+        row = this.appendRow(chunk);
+      } else {
+        this.urls[row] = chunk.url;
+        this.contentTypes[row] = chunk.contentType;
+        this.orphaned[row] = chunk.metadata.orphaned || false;
+      }
+
+      this.writeVector(row, embedding);
+      if (this.ivf) this.assignToIvf(row);
+    });
+
+    this.dirty = true;
+  }
+
+  async search(
+    embedding: number[],
+    options: VectorSearchOptions = {}
+  ): Promise<Array<{ chunk: DocumentChunk; score: number }>> {
+    const hits = this.searchIds(embedding, options);
+    const chunks = await this.options.hydrate(hits.map(h => h.id));
+
+    return hits
+      .filter(h => chunks.has(h.id))
+      .map(h => ({ chunk: chunks.get(h.id)!, score: h.score }));
+  }
+
+  /**
+   * Top-k cosine search returning ids only
+   */
+  searchIds(embedding: number[], options: LocalSearchOptions = {}): VectorHit[] {
+    this.maybeReload();
+
+    const { limit = 10, filter, exact = false } = options;
+    if (this.size === 0 || limit <= 0) return [];
+
+    const query = normalize(Float32Array.from(embedding));
+    let candidates = this.candidateRows(filter);
+
+    if (!exact && candidates.length > this.annThreshold) {
+      this.ensureIvf();
+      candidates = this.probeIvf(query, candidates, limit, filter);
+    }
+
+    const matches = (row: number) =>
+      this.alive[row] === 1 && this.matchesFilter(row, filter);
+
+    let top: Array<{ row: number; score: number }>;
+
+    if (this.quantize && !exact) {
+      // Int8 first pass, then exact rescoring of the best candidates
+      const coarse = new TopK(limit * RESCORE_FACTOR);
+      for (const row of candidates) {
+        if (matches(row)) coarse.push(row, this.dotQuantized(query, row));
+      }
+      const fine = new TopK(limit);
+      for (const { row } of coarse.sorted()) {
+        fine.push(row, this.dot(query, row));
+      }
+      top = fine.sorted();
+    } else {
+      const heap = new TopK(limit);
+      for (const row of candidates) {
+        if (matches(row)) heap.push(row, this.dot(query, row));
+      }
+      top = heap.sorted();
+    }
+
+    return top.map(({ row, score }) => ({ id: this.ids[row], score }));
+  }
+
+  async deleteByUrl(url: string): Promise<void> {
+    await this.deleteByUrls([url]);
+  }
+
+  async deleteByUrls(urls: string[]): Promise<void> {
+    this.acquireWriteLock();
+    const targets = new Set(urls);
+    for (let row = 0; row < this.count; row++) {
+      if (this.alive[row] && targets.has(this.urls[row])) {
+        this.killRow(row);
+      }
+    }
+    this.dirty = true;
+  }
+
+  async deleteByProject(project: string): Promise<void> {
+    this.acquireWriteLock();
+    for (const row of this.projectRows.get(project) ?? []) {
+      if (this.alive[row]) this.killRow(row);
+    }
+    this.projectRows.delete(project);
+    this.dirty = true;
+  }
+
+  async getUrlsForProject(project: string): Promise<string[]> {
+    const urls = new Set<string>();
+    for (const row of this.projectRows.get(project) ?? []) {
+      if (this.alive[row]) urls.add(this.urls[row]);
+    }
+    return Array.from(urls);
+  }
+
+  async markOrphaned(urls: string[], orphaned: boolean): Promise<void> {
+    this.acquireWriteLock();
+    const targets = new Set(urls);
+    for (let row = 0; row < this.count; row++) {
+      if (this.alive[row] && targets.has(this.urls[row])) {
+        this.orphaned[row] = orphaned;
+      }
+    }
+    this.dirty = true;
+  }
+
+  /**
+   * Compact, (re)build the IVF index if needed, and write the file
+   */
+  async flush(): Promise<void> {
+    if (!this.dirty) return;
+
+    if (this.deadRows > 0) this.compact();
+    if (this.size > this.annThreshold) this.ensureIvf();
+
+    this.save();
+    this.dirty = false;
+  }
+
+  async close(): Promise<void> {
+    await this.flush();
+    this.releaseWriteLock();
+  }
+
+  // ---------------------------------------------------------------------------
+  // Single-writer lock
+  // ---------------------------------------------------------------------------
+
+  /**
+   * Take the writer lock before the first change. Throws if another live
+   * process holds it; a lock left by a process that died is taken over.
+   * If the file changed since it was loaded, it is reloaded first so the
+   * other writer's vectors are kept.
+   */
+  private acquireWriteLock(): void {
+    if (this.lockPath) return;
+
+    const lockPath = `${this.options.path}.lock`;
+    for (let attempt = 0; ; attempt++) {
+      try {
+        const fd = openSync(lockPath, 'wx');
+        writeFileSync(fd, String(process.pid));
+        closeSync(fd);
+        break;
+      } catch (error) {
+        if ((error as NodeJS.ErrnoException).code !== 'EEXIST' || attempt > 0) throw error;
+
+        const holder = parseInt(readFileSync(lockPath, 'utf8'), 10);
+        if (holder !== process.pid && processAlive(holder)) {
+          throw new Error(
+            `${this.options.path} is being written by process ${holder}; ` +
+            'the local vector store supports one writer at a time'
+          );
+        }
+        unlinkSync(lockPath); // stale lock
+      }
+    }
+    this.lockPath = lockPath;
+
+    if (!this.dirty && existsSync(this.options.path) &&
+        statSync(this.options.path).mtimeMs !== this.loadedMtimeMs) {
+      this.load();
+    }
+  }
+
+  private releaseWriteLock(): void {
+    if (!this.lockPath) return;
+    try {
+      unlinkSync(this.lockPath);
+    } catch {
+      // Already removed
+    }
+    this.lockPath = null;
+  }
+
+  // ---------------------------------------------------------------------------
+  // Row management
+  // ---------------------------------------------------------------------------
+
+  private appendRow(chunk: DocumentChunk): number {
+    this.ensureCapacity(this.count + 1);
+    const row = this.count++;
+
+    this.ids[row] = chunk.id;
+    this.urls[row] = chunk.url;
+    this.projects[row] = chunk.project;
+    this.contentTypes[row] = chunk.contentType;
+    this.orphaned[row] = chunk.metadata.orphaned || false;
+    this.alive[row] = 1;
+    this.idToRow.set(chunk.id, row);
+
+    let rows = this.projectRows.get(chunk.project);
+    if (!rows) {
+      rows = [];
+      this.projectRows.set(chunk.project, rows);
+    }
+    rows.push(row);
+
+    return row;
+  }
+
+  private killRow(row: number): void {
+    this.alive[row] = 0;
+    this.idToRow.delete(this.ids[row]);
+    this.deadRows++;
+  }
+
+  private writeVector(row: number, embedding: number[]): void {
+    const offset = row * this.dim;
+    let norm = 0;
+    for (let i = 0; i < this.dim; i++) norm += embedding[i] * embedding[i];
+    const inv = norm > 0 ? 1 / Math.sqrt(norm) : 0;
+
+    let maxAbs = 0;
+    for (let i = 0; i < this.dim; i++) {
+      const v = embedding[i] * inv;
+      this.vectors[offset + i] = v;
+      if (Math.abs(v) > maxAbs) maxAbs = Math.abs(v);
+    }
+
+    if (this.quantize) {
+      const scale = maxAbs > 0 ? maxAbs / 127 : 1;
+      this.qscales[row] = scale;
+      for (let i = 0; i < this.dim; i++) {
+        this.qvectors[offset + i] = Math.round(this.vectors[offset + i] / scale);
+      }
+    }
+  }
+
+  private ensureCapacity(needed: number): void {
+    if (needed <= this.capacity) return;
+
+    const capacity = Math.max(needed, this.capacity * 2, 1024);
+    const vectors = new Float32Array(capacity * this.dim);
+    vectors.set(this.vectors.subarray(0, this.count * this.dim));
+    this.vectors = vectors;
+
+    const alive = new Uint8Array(capacity);
+    alive.set(this.alive.subarray(0, this.count));
+    this.alive = alive;
+
+    if (this.quantize) {
+      const qvectors = new Int8Array(capacity * this.dim);
+      qvectors.set(this.qvectors.subarray(0, this.count * this.dim));
+      this.qvectors = qvectors;
+
+      const qscales = new Float32Array(capacity);
+      qscales.set(this.qscales.subarray(0, this.count));
+      this.qscales = qscales;
+    }
+
+    if (this.ivf) {
+      const assignment = new Int32Array(capacity).fill(-1);
+      assignment.set(this.ivf.assignment.subarray(0, this.count));
+      this.ivf.assignment = assignment;
+    }
+
+    this.capacity = capacity;
+  }
+
+  /**
+   * Drop deleted rows and rebuild row lists; invalidates the IVF index
+   */
+  private compact(): void {
+    const liveRows: number[] = [];
+    for (let row = 0; row < this.count; row++) {
+      if (this.alive[row]) liveRows.push(row);
+    }
+
+    const n = liveRows.length;
+    const vectors = new Float32Array(Math.max(n, 1) * this.dim);
+    const qvectors = this.quantize ? new Int8Array(Math.max(n, 1) * this.dim) : new Int8Array(0);
+    const qscales = this.quantize ? new Float32Array(Math.max(n, 1)) : new Float32Array(0);
+
+    liveRows.forEach((oldRow, newRow) => {
+      const src = oldRow * this.dim;
+      vectors.set(this.vectors.subarray(src, src + this.dim), newRow * this.dim);
+      if (this.quantize) {
+        qvectors.set(this.qvectors.subarray(src, src + this.dim), newRow * this.dim);
+        qscales[newRow] = this.qscales[oldRow];
+      }
+    });
+
+    this.setRows(
+      n,
+      vectors,
+      qvectors,
+      qscales,
+      liveRows.map(r => this.ids[r]),
+      liveRows.map(r => this.urls[r]),
+      liveRows.map(r => this.projects[r]),
+      liveRows.map(r => this.contentTypes[r]),
+      liveRows.map(r => this.orphaned[r])
+    );
+    this.ivf = null;
+  }
+
+  private setRows(
+    count: number,
+    vectors: Float32Array,
+    qvectors: Int8Array,
+    qscales: Float32Array,
+    ids: string[],
+    urls: string[],
+    projects: string[],
+    contentTypes: string[],
+    orphaned: boolean[]
+  ): void {
+    this.count = count;
+    this.capacity = count;
+    this.vectors = vectors;
+    this.qvectors = qvectors;
+    this.qscales = qscales;
+    this.alive = new Uint8Array(count).fill(1);
+    this.ids = ids;
+    this.urls = urls;
+    this.projects = projects;
+    this.contentTypes = contentTypes;
+    this.orphaned = orphaned;
+    this.deadRows = 0;
+
+    this.idToRow.clear();
+    this.projectRows.clear();
+    for (let row = 0; row < count; row++) {
+      this.idToRow.set(ids[row], row);
+      let rows = this.projectRows.get(projects[row]);
+      if (!rows) {
+        rows = [];
+        this.projectRows.set(projects[row], rows);
+      }
+      rows.push(row);
+    }
+  }
+
+  // ---------------------------------------------------------------------------
+  // Scoring and filtering
+  // ---------------------------------------------------------------------------
+
+  private candidateRows(filter?: Record<string, string>): number[] {
+    if (filter?.project) {
+      return this.projectRows.get(filter.project) ?? [];
+    }
+    return Array.from({ length: this.count }, (_, i) => i);
+  }
+
+  private matchesFilter(row: number, filter?: Record<string, string>): boolean {
+    if (!filter) return true;
+    for (const [key, value] of Object.entries(filter)) {
+      switch (key) {
+        case 'project':
+          if (this.projects[row] !== value) return false;
+          break;
+        case 'contentType':
+          if (this.contentTypes[row] !== value) return false;
+          break;
+        case 'url':
+          if (this.urls[row] !== value) return false;
+          break;
+        default:
+          // Unknown payload fields are not indexed locally
+          return false;
+      }
+    }
+    return true;
+  }
+
+  private dot(query: Float32Array, row: number): number {
+    const offset = row * this.dim;
+    const v = this.vectors;
+    let sum = 0;
+    for (let i = 0; i < this.dim; i++) sum += query[i] * v[offset + i];
+    return sum;
+  }
+
+  private dotQuantized(query: Float32Array, row: number): number {
+    const offset = row * this.dim;
+    const v = this.qvectors;
+    let sum = 0;
+    for (let i = 0; i < this.dim; i++) sum += query[i] * v[offset + i];
+    return sum * this.qscales[row];
+  }
+
+  // ---------------------------------------------------------------------------
+  // IVF index
+  // ---------------------------------------------------------------------------
+
+  private ensureIvf(): void {
+    if (this.ivf) return;
+
+    const liveRows: number[] = [];
+    for (let row = 0; row < this.count; row++) {
+      if (this.alive[row]) liveRows.push(row);
+    }
+
+    const nlist = Math.min(4096, Math.max(16, Math.round(Math.sqrt(liveRows.length))));
+    const sample = sampleRows(liveRows, nlist * KMEANS_SAMPLE_PER_LIST);
+    const centroids = new Float32Array(nlist * this.dim);
+
+    // Seed centroids from distinct sample rows
+    for (let c = 0; c < nlist; c++) {
+      const row = sample[Math.floor((c * sample.length) / nlist)];
+      centroids.set(this.vectors.subarray(row * this.dim, (row + 1) * this.dim), c * this.dim);
+    }
+
+    // Spherical k-means on the sample
+    const sampleAssign = new Int32Array(sample.length);
+    for (let iter = 0; iter < KMEANS_ITERATIONS; iter++) {
+      sample.forEach((row, i) => {
+        sampleAssign[i] = this.nearestCentroid(centroids, nlist, row);
+      });
+
+      const sums = new Float32Array(nlist * this.dim);
+      const counts = new Int32Array(nlist);
+      sample.forEach((row, i) => {
+        const c = sampleAssign[i];
+        counts[c]++;
+        const src = row * this.dim;
+        const dst = c * this.dim;
+        for (let d = 0; d < this.dim; d++) sums[dst + d] += this.vectors[src + d];
+      });
+
+      for (let c = 0; c < nlist; c++) {
+        if (counts[c] === 0) continue; // keep previous centroid for empty clusters
+        const centroid = normalize(sums.subarray(c * this.dim, (c + 1) * this.dim));
+        centroids.set(centroid, c * this.dim);
+      }
+    }
+
+    this.ivf = {
+      nlist,
+      centroids,
+      lists: Array.from({ length: nlist }, () => []),
+      assignment: new Int32Array(Math.max(this.capacity, this.count)).fill(-1)
+    };
+
+    for (const row of liveRows) {
+      this.assignToIvf(row);
+    }
+  }
+
+  /**
+   * Put a row in the list of its nearest centroid, moving it if its
+   * vector changed since it was last assigned
+   */
+  private assignToIvf(row: number): void {
+    const ivf = this.ivf!;
+    const c = this.nearestCentroid(ivf.centroids, ivf.nlist, row);
+    const previous = ivf.assignment[row];
+    if (previous === c) return;
+
+    if (previous >= 0) {
+      const list = ivf.lists[previous];
+      const i = list.indexOf(row);
+      if (i >= 0) list.splice(i, 1);
+    }
+    ivf.assignment[row] = c;
+    ivf.lists[c].push(row);
+  }
+
+  private nearestCentroid(centroids: Float32Array, nlist: number, row: number): number {
+    const offset = row * this.dim;
+    let best = 0;
+    let bestScore = -Infinity;
+    for (let c = 0; c < nlist; c++) {
+      const coff = c * this.dim;
+      let sum = 0;
+      for (let d = 0; d < this.dim; d++) sum += centroids[coff + d] * this.vectors[offset + d];
+      if (sum > bestScore) {
+        bestScore = sum;
+        best = c;
+      }
+    }
+    return best;
+  }
+
+  /**
+   * Restrict candidates to the lists closest to the query: at least
+   * nprobe lists, and more while fewer than `limit` live rows match the
+   * filter, so selective filters (e.g. contentType) still fill the limit.
+   * Falls back to the full candidate set if nothing matches.
+   */
+  private probeIvf(
+    query: Float32Array,
+    candidates: number[],
+    limit: number,
+    filter?: Record<string, string>
+  ): number[] {
+    const ivf = this.ivf!;
+    const order: Array<{ list: number; score: number }> = [];
+    for (let c = 0; c < ivf.nlist; c++) {
+      const coff = c * this.dim;
+      let sum = 0;
+      for (let d = 0; d < this.dim; d++) sum += ivf.centroids[coff + d] * query[d];
+      order.push({ list: c, score: sum });
+    }
+    order.sort((a, b) => b.score - a.score);
+
+    const probed: number[] = [];
+    for (let i = 0; i < order.length; i++) {
+      if (i >= this.nprobe && probed.length >= limit) break;
+      for (const row of ivf.lists[order[i].list]) {
+        if (this.alive[row] === 1 && this.matchesFilter(row, filter)) {
+          probed.push(row);
+        }
+      }
+    }
+
+    return probed.length > 0 ? probed : candidates;
+  }
+
+  // ---------------------------------------------------------------------------
+  // Persistence
+  // ---------------------------------------------------------------------------
+
+  /**
+   * File layout (little-endian):
+   *   header: magic, version, dim, count, flags, metaBytes, nlist (7 x u32)
+   *   meta JSON (ids, urls, projects, contentTypes, orphaned), padded to 4 bytes
+   *   float32 vectors [count * dim]
+   *   if quantized: float32 scales [count], int8 vectors [count * dim] padded to 4
+   *   if ivf: float32 centroids [nlist * dim], int32 assignment [count]
+   */
+  private save(): void {
+    const n = this.count;
+    const flags = (this.quantize ? FLAG_QUANTIZED : 0) | (this.ivf ? FLAG_IVF : 0);
+    const meta = Buffer.from(JSON.stringify({
+      ids: this.ids.slice(0, n),
+      urls: this.urls.slice(0, n),
+      projects: this.projects.slice(0, n),
+      contentTypes: this.contentTypes.slice(0, n),
+      orphaned: this.orphaned.slice(0, n).map(o => (o ? 1 : 0))
+    }), 'utf8');
+
+    const header = Buffer.alloc(HEADER_BYTES);
+    header.writeUInt32LE(FILE_MAGIC, 0);
+    header.writeUInt32LE(FILE_VERSION, 4);
+    header.writeUInt32LE(this.dim, 8);
+    header.writeUInt32LE(n, 12);
+    header.writeUInt32LE(flags, 16);
+    header.writeUInt32LE(meta.length, 20);
+    header.writeUInt32LE(this.ivf?.nlist ?? 0, 24);
+
+    const parts: Buffer[] = [header, meta, Buffer.alloc(pad4(meta.length))];
+    parts.push(typedBytes(this.vectors.subarray(0, n * this.dim)));
+
+    if (this.quantize) {
+      parts.push(typedBytes(this.qscales.subarray(0, n)));
+      parts.push(typedBytes(this.qvectors.subarray(0, n * this.dim)));
+      parts.push(Buffer.alloc(pad4(n * this.dim)));
+    }
+
+    if (this.ivf) {
+      parts.push(typedBytes(this.ivf.centroids));
+      parts.push(typedBytes(this.ivf.assignment.subarray(0, n)));
+    }
+
+    // Write to a temp file and rename so readers never see a partial file
+    const tmpPath = `${this.options.path}.tmp`;
+    writeFileSync(tmpPath, Buffer.concat(parts));
+    renameSync(tmpPath, this.options.path);
+    this.loadedMtimeMs = statSync(this.options.path).mtimeMs;
+  }
+
+  private load(): void {
+    const file = readFileSync(this.options.path);
+    this.loadedMtimeMs = statSync(this.options.path).mtimeMs;
+
+    if (file.readUInt32LE(0) !== FILE_MAGIC) {
+      throw new Error(`${this.options.path} is not a vector store file`);
+    }
+    const version = file.readUInt32LE(4);
+    if (version !== FILE_VERSION) {
+      throw new Error(`Unsupported vector store file version ${version}`);
+    }
+
+    const dim = file.readUInt32LE(8);
+    if (dim !== this.dim) {
+      throw new Error(`Vector store has ${dim} dimensions, expected ${this.dim}`);
+    }
+
+    const n = file.readUInt32LE(12);
+    const flags = file.readUInt32LE(16);
+    const metaBytes = file.readUInt32LE(20);
+    const nlist = file.readUInt32LE(24);
+
+    let offset = HEADER_BYTES;
+    const meta = JSON.parse(file.subarray(offset, offset + metaBytes).toString('utf8'));
+    offset += metaBytes + pad4(metaBytes);
+
+    const vectors = float32View(file, offset, n * this.dim);
+    offset += n * this.dim * 4;
+
+    let qvectors = new Int8Array(0);
+    let qscales = new Float32Array(0);
+    const fileQuantized = (flags & FLAG_QUANTIZED) !== 0;
+    if (fileQuantized) {
+      qscales = float32View(file, offset, n);
+      offset += n * 4;
+      qvectors = new Int8Array(file.buffer, file.byteOffset + offset, n * this.dim);
+      offset += n * this.dim + pad4(n * this.dim);
+    }
+
+    let ivfCentroids: Float32Array | null = null;
+    let ivfAssignment: Int32Array | null = null;
+    if ((flags & FLAG_IVF) !== 0 && nlist > 0) {
+      ivfCentroids = float32View(file, offset, nlist * this.dim);
+      offset += nlist * this.dim * 4;
+      ivfAssignment = int32View(file, offset, n);
+    }
+
+    this.setRows(
+      n,
+      vectors,
+      qvectors,
+      qscales,
+      meta.ids,
+      meta.urls,
+      meta.projects,
+      meta.contentTypes,
+      (meta.orphaned as number[]).map(o => o === 1)
+    );
+
+    // Quantization setting changed since the file was written: rebuild codes
+    if (this.quantize && !fileQuantized) {
+      this.qvectors = new Int8Array(n * this.dim);
+      this.qscales = new Float32Array(n);
+      for (let row = 0; row < n; row++) this.requantize(row);
+    }
+
+    this.ivf = null;
+    if (ivfCentroids && ivfAssignment) {
+      const lists: number[][] = Array.from({ length: nlist }, () => []);
+      const assignment = new Int32Array(ivfAssignment);
+      for (let row = 0; row < n; row++) {
+        if (assignment[row] >= 0) lists[assignment[row]].push(row);
+      }
+      this.ivf = { nlist, centroids: ivfCentroids, lists, assignment };
+    }
+
+    this.dirty = false;
+  }
+
+  private requantize(row: number): void {
+    const offset = row * this.dim;
+    let maxAbs = 0;
+    for (let i = 0; i < this.dim; i++) maxAbs = Math.max(maxAbs, Math.abs(this.vectors[offset + i]));
+    const scale = maxAbs > 0 ? maxAbs / 127 : 1;
+    this.qscales[row] = scale;
+    for (let i = 0; i < this.dim; i++) {
+      this.qvectors[offset + i] = Math.round(this.vectors[offset + i] / scale);
+    }
+  }
+
+  /**
+   * Pick up a file rewritten by another process (e.g. the scraper)
+   */
+  private maybeReload(): void {
+    if (this.dirty) return;
+    const now = Date.now();
+    if (now - this.lastReloadCheck < RELOAD_CHECK_MS) return;
+    this.lastReloadCheck = now;
+
+    try {
+      const mtimeMs = statSync(this.options.path).mtimeMs;
+      if (mtimeMs !== this.loadedMtimeMs) {
+        this.load();
+      }
+    } catch {
+      // File not written yet
+    }
+  }
+}
+
+function processAlive(pid: number): boolean {
+  if (!Number.isInteger(pid) || pid <= 0) return false;
+  try {
+    process.kill(pid, 0);
+    return true;
+  } catch (error) {
+    // EPERM: the process exists but belongs to another user
+    return (error as NodeJS.ErrnoException).code === 'EPERM';
+  }
+}
+
+function normalize(vector: Float32Array): Float32Array {
+  let norm = 0;
+  for (let i = 0; i < vector.length; i++) norm += vector[i] * vector[i];
+  if (norm === 0) return vector;
+  const inv = 1 / Math.sqrt(norm);
+  for (let i = 0; i < vector.length; i++) vector[i] *= inv;
+  return vector;
+}
+
+function sampleRows(rows: number[], size: number): number[] {
+  if (rows.length <= size) return rows;
+  const step = rows.length / size;
+  return Array.from({ length: size }, (_, i) => rows[Math.floor(i * step)]);
+}
+
+function pad4(bytes: number): number {
+  return (4 - (bytes % 4)) % 4;
+}
+
+function typedBytes(array: Float32Array | Int8Array | Int32Array): Buffer {
+  return Buffer.from(array.buffer, array.byteOffset, array.byteLength);
+}
+
+/**
+ * View into the file buffer when aligned, otherwise a copy
+ */
+function float32View(file: Buffer, offset: number, length: number): Float32Array {
+  const start = file.byteOffset + offset;
+  if (start % 4 === 0) {
+    return new Float32Array(file.buffer, start, length);
+  }
+  return new Float32Array(file.buffer.slice(start, start + length * 4));
+}
+
+function int32View(file: Buffer, offset: number, length: number): Int32Array {
+  const start = file.byteOffset + offset;
+  if (start % 4 === 0) {
+    return new Int32Array(file.buffer, start, length);
+  }
+  return new Int32Array(file.buffer.slice(start, start + length * 4));
+}
@@ -0,0 +1,79 @@
+import type { DocumentChunk } from '../types.js';
+import type { FullTextDB } from './fts.js';
+import { VectorDB } from './vector.js';
+import { LocalVectorStore } from './local-vector.js';
+
+export interface VectorUpsertOptions {
+  /** Wait for the write to be applied before returning. Default: true */
+  wait?: boolean;
+}
+
+export interface VectorSearchOptions {
+  limit?: number;
+  filter?: Record<string, string>;
+}
+
+/**
+ * Common interface for vector backends (Qdrant or the embedded local index)
+ */
+export interface VectorStore {
+  initialize(): Promise<void>;
+  upsert(chunks: DocumentChunk[], embeddings: number[][], options?: VectorUpsertOptions): Promise<void>;
+  search(embedding: number[], options?: VectorSearchOptions): Promise<Array<{ chunk: DocumentChunk; score: number }>>;
+  deleteByUrl(url: string): Promise<void>;
+  deleteByUrls(urls: string[]): Promise<void>;
+  deleteByProject(project: string): Promise<void>;
+  getUrlsForProject(project: string): Promise<string[]>;
+  markOrphaned(urls: string[], orphaned: boolean): Promise<void>;
+  /** Make every write so far durable (the local backend writes its file) */
+  flush(): Promise<void>;
+  close(): Promise<void>;
+}
+
+export type VectorBackend = 'qdrant' | 'local';
+
+export interface VectorStoreConfig {
+  backend: VectorBackend;
+  qdrant: {
+    url: string;
+    collection: string;
+  };
+  local: {
+    /** Vector file path, e.g. ./data/crypto_docs.vec */
+    path: string;
+    /** Keep an int8-quantized copy for the first scoring pass */
+    quantize?: boolean;
+  };
+  /** Used by the local backend to hydrate chunk bodies from SQLite */
+  ftsDb: FullTextDB;
+}
+
+/**
+ * Derive the default local vector file path from the SQLite path
+ */
+export function defaultLocalVectorPath(sqlitePath: string): string {
+  return sqlitePath.replace(/\.db$/, '') + '.vec';
+}
+
+/**
+ * Create the configured vector backend
+ */
+export function createVectorStore(config: VectorStoreConfig): VectorStore {
+  switch (config.backend) {
+    case 'qdrant':
+      return new VectorDB({
+        url: config.qdrant.url,
+        collection: config.qdrant.collection
+      });
+
+    case 'local':
+      return new LocalVectorStore({
+        path: config.local.path,
+        quantize: config.local.quantize,
+        hydrate: ids => config.ftsDb.getChunksByIds(ids)
+      });
+
+    default:
+      throw new Error(`Unknown vector backend: ${config.backend}`);
+  }
+}
@@ -1,12 +1,16 @@
 import { QdrantClient } from '@qdrant/js-client-rest';
 import type { DocumentChunk } from '../types.js';
+import type { VectorStore, VectorUpsertOptions, VectorSearchOptions } from './vector-store.js';
 
 export interface VectorDBOptions {
   url: string;
   collection: string;
 }
 
-export class VectorDB {
+// Maximum URLs per filter in bulk delete / orphan operations
+const URL_FILTER_BATCH_SIZE = 500;
+
+export class VectorDB implements VectorStore {
   private client: QdrantClient;
   private collection: string;
 
@@ -47,7 +51,13 @@ export class VectorDB {
     }
   }
 
-  async upsert(chunks: DocumentChunk[], embeddings: number[][]): Promise<void> {
+  async upsert(
+    chunks: DocumentChunk[],
+    embeddings: number[][],
+    options: VectorUpsertOptions = {}
+  ): Promise<void> {
+    const { wait = true } = options;
+
     const points = chunks.map((chunk, i) => ({
       id: chunk.id,
       vector: embeddings[i],
@@ -66,13 +76,13 @@ export class VectorDB {
     // Upsert in batches of 100
     for (let i = 0; i < points.length; i += 100) {
       const batch = points.slice(i, i + 100);
-      await this.client.upsert(this.collection, { points: batch });
+      await this.client.upsert(this.collection, { wait, points: batch });
     }
   }
 
   async search(
     embedding: number[],
-    options: { limit?: number; filter?: Record<string, string> } = {}
+    options: VectorSearchOptions = {}
   ): Promise<Array<{ chunk: DocumentChunk; score: number }>> {
     const { limit = 10, filter } = options;
 
@@ -122,6 +132,20 @@ export class VectorDB {
     });
   }
 
+  /**
+   * Delete all points matching any of the given URLs
+   */
+  async deleteByUrls(urls: string[]): Promise<void> {
+    for (let i = 0; i < urls.length; i += URL_FILTER_BATCH_SIZE) {
+      const batch = urls.slice(i, i + URL_FILTER_BATCH_SIZE);
+      await this.client.delete(this.collection, {
+        filter: {
+          must: [{ key: 'url', match: { any: batch } }]
+        }
+      });
+    }
+  }
+
   /**
    * Delete all points for a project
    */
@@ -173,16 +197,21 @@ export class VectorDB {
    * Mark all chunks for given URLs as orphaned
    */
   async markOrphaned(urls: string[], orphaned: boolean): Promise<void> {
-    for (const url of urls) {
+    for (let i = 0; i < urls.length; i += URL_FILTER_BATCH_SIZE) {
+      const batch = urls.slice(i, i + URL_FILTER_BATCH_SIZE);
       await this.client.setPayload(this.collection, {
         payload: { orphaned },
         filter: {
-          must: [{ key: 'url', match: { value: url } }]
+          must: [{ key: 'url', match: { any: batch } }]
         }
       });
     }
   }
 
+  async flush(): Promise<void> {
+    // Qdrant persists writes itself
+  }
+
   async close(): Promise<void> {
     // QdrantClient doesn't require explicit close
   }
@@ -0,0 +1,276 @@
+/**
+ * Query Embedding Cache
+ *
+ * Shared embedding layer for search queries:
+ * - Bounded in-memory LRU keyed by model + normalized text
+ * - Optional persistent store (e.g. the FullTextDB SQLite file), pruned
+ *   by age and LRU order so it stays bounded like the in-memory map
+ * - In-flight deduplication: identical concurrent queries share one request
+ * - Micro-batching: concurrent misses go out as one embeddings call
+ *
+ * The embedding function is injectable so the cache can be exercised
+ * against a stub without network access.
+ */
+
+import { createEmbedFunction, EMBEDDING_MODEL, type EmbedFunction } from './embeddings.js';
+
+/**
+ * Persistent backing store for query embeddings
+ */
+export interface QueryEmbeddingStore {
+  getQueryEmbedding(model: string, text: string): Promise<number[] | null>;
+  setQueryEmbedding(model: string, text: string, embedding: number[]): Promise<void>;
+  /** Drop stale and least recently used entries; returns the number removed */
+  pruneQueryEmbeddings?(options: { maxEntries?: number; maxAgeMs?: number }): Promise<number>;
+}
+
+export interface QueryEmbeddingCacheOptions {
+  /** OpenAI API key (used when no embed function is supplied) */
+  apiKey?: string;
+  /** Custom batch embedding function (e.g. a stub for tests) */
+  embed?: EmbedFunction;
+  /** Embedding model name, part of the cache key */
+  model?: string;
+  /** Maximum entries kept in memory. Default: 1000 */
+  maxEntries?: number;
+  /** Optional persistent store consulted on memory misses */
+  store?: QueryEmbeddingStore;
+  /** Maximum entries kept in the persistent store. Default: 10000 */
+  persistentMaxEntries?: number;
+  /** Drop persisted entries unused for this long. Default: 30 days */
+  persistentMaxAgeMs?: number;
+  /** How long to wait for more misses before sending a batch. Default: 5ms */
+  batchWindowMs?: number;
+  /** Maximum texts per embeddings call. Default: 64 */
+  maxBatchSize?: number;
+}
+
+export interface QueryEmbeddingCacheStats {
+  /** Lookups answered from memory */
+  hits: number;
+  /** Lookups answered from the persistent store */
+  persistentHits: number;
+  /** Lookups that required an embeddings call */
+  misses: number;
+  /** Lookups that joined an identical in-flight request */
+  coalesced: number;
+  /** Number of embeddings calls made */
+  batches: number;
+  /** Entries currently held in memory */
+  size: number;
+}
+
+interface PendingRequest {
+  text: string;
+  resolve: (embedding: number[]) => void;
+  reject: (error: unknown) => void;
+}
+
+const DEFAULT_MAX_ENTRIES = 1000;
+const DEFAULT_BATCH_WINDOW_MS = 5;
+const DEFAULT_MAX_BATCH_SIZE = 64;
+const DEFAULT_PERSISTENT_MAX_ENTRIES = 10000;
+const DEFAULT_PERSISTENT_MAX_AGE_MS = 30 * 24 * 60 * 60 * 1000;
+// Prune the persistent store on the first write and every N writes after
+const PRUNE_EVERY_WRITES = 100;
+
+/**
+ * Normalize query text so trivially different strings share a cache entry
+ */
+export function normalizeQueryText(text: string): string {
+  return text.trim().replace(/\s+/g, ' ');
+}
+
+export class QueryEmbeddingCache {
+  private embedFn: EmbedFunction;
+  private model: string;
+  private maxEntries: number;
+  private store?: QueryEmbeddingStore;
+  private batchWindowMs: number;
+  private maxBatchSize: number;
+  private persistentMaxEntries: number;
+  private persistentMaxAgeMs: number;
+  private writesSincePrune = PRUNE_EVERY_WRITES;
+
+  // Map preserves insertion order; re-inserting on access gives LRU order
+  private entries = new Map<string, number[]>();
+  private inFlight = new Map<string, Promise<number[]>>();
+  private pending: PendingRequest[] = [];
+  private flushTimer: NodeJS.Timeout | null = null;
+
+  private counters = {
+    hits: 0,
+    persistentHits: 0,
+    misses: 0,
+    coalesced: 0,
+    batches: 0
+  };
+
+  constructor(options: QueryEmbeddingCacheOptions) {
+    this.model = options.model || EMBEDDING_MODEL;
+
+    if (options.embed) {
+      this.embedFn = options.embed;
+    } else if (options.apiKey) {
+      this.embedFn = createEmbedFunction(options.apiKey, this.model);
+    } else {
+      throw new Error('QueryEmbeddingCache requires either an apiKey or an embed function');
+    }
+
+    this.maxEntries = options.maxEntries ?? DEFAULT_MAX_ENTRIES;
+    this.store = options.store;
+    this.batchWindowMs = options.batchWindowMs ?? DEFAULT_BATCH_WINDOW_MS;
+    this.maxBatchSize = options.maxBatchSize ?? DEFAULT_MAX_BATCH_SIZE;
+    this.persistentMaxEntries = options.persistentMaxEntries ?? DEFAULT_PERSISTENT_MAX_ENTRIES;
+    this.persistentMaxAgeMs = options.persistentMaxAgeMs ?? DEFAULT_PERSISTENT_MAX_AGE_MS;
+  }
+
+  /**
+   * Get the embedding for a single query, using the cache where possible
+   */
+  async embed(text: string): Promise<number[]> {
+    const normalized = normalizeQueryText(text);
+    const key = `${this.model}\u0000${normalized}`;
+
+    const cached = this.entries.get(key);
+    if (cached) {
+      this.counters.hits++;
+      this.touch(key, cached);
+      return cached;
+    }
+
+    const existing = this.inFlight.get(key);
+    if (existing) {
+      this.counters.coalesced++;
+      return existing;
+    }
+
+    const promise = this.resolveMiss(normalized, key).finally(() => {
+      this.inFlight.delete(key);
+    });
+    this.inFlight.set(key, promise);
+    return promise;
+  }
+
+  /**
+   * Get embeddings for several queries; misses are batched together
+   */
+  async embedMany(texts: string[]): Promise<number[][]> {
+    return Promise.all(texts.map(t => this.embed(t)));
+  }
+
+  get stats(): QueryEmbeddingCacheStats {
+    return {
+      ...this.counters,
+      size: this.entries.size
+    };
+  }
+
+  /**
+   * Fraction of lookups served without an embeddings call
+   */
+  get hitRate(): number {
+    const { hits, persistentHits, misses, coalesced } = this.counters;
+    const total = hits + persistentHits + misses + coalesced;
+    return total === 0 ? 0 : (hits + persistentHits + coalesced) / total;
+  }
+
+  clear(): void {
+    this.entries.clear();
+  }
+
+  private async resolveMiss(text: string, key: string): Promise<number[]> {
+    if (this.store) {
+      try {
+        const stored = await this.store.getQueryEmbedding(this.model, text);
+        if (stored) {
+          this.counters.persistentHits++;
+          this.touch(key, stored);
+          return stored;
+        }
+      } catch (error) {
+        console.error('[EmbeddingCache] Persistent lookup failed:', error instanceof Error ? error.message : error);
+      }
+    }
+
+    this.counters.misses++;
+    const embedding = await this.enqueue(text);
+    this.touch(key, embedding);
+
+    if (this.store) {
+      this.store.setQueryEmbedding(this.model, text, embedding)
+        .then(() => this.prunePersistent())
+        .catch(error => {
+          console.error('[EmbeddingCache] Persistent write failed:', error instanceof Error ? error.message : error);
+        });
+    }
+
+    return embedding;
+  }
+
+  private async prunePersistent(): Promise<void> {
+    if (!this.store?.pruneQueryEmbeddings || ++this.writesSincePrune < PRUNE_EVERY_WRITES) return;
+    this.writesSincePrune = 0;
+
+    const removed = await this.store.pruneQueryEmbeddings({
+      maxEntries: this.persistentMaxEntries,
+      maxAgeMs: this.persistentMaxAgeMs
+    });
+    if (removed > 0) {
+      console.error(`[EmbeddingCache] Pruned ${removed} persisted query embeddings`);
+    }
+  }
+
+  private enqueue(text: string): Promise<number[]> {
+    return new Promise<number[]>((resolve, reject) => {
+      this.pending.push({ text, resolve, reject });
+
+      if (this.pending.length >= this.maxBatchSize) {
+        this.flush();
+      } else if (!this.flushTimer) {
+        this.flushTimer = setTimeout(() => this.flush(), this.batchWindowMs);
+      }
+    });
+  }
+
+  private flush(): void {
+    if (this.flushTimer) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+
+    const batch = this.pending.splice(0, this.maxBatchSize);
+    if (batch.length === 0) return;
+
+    // Anything left over gets its own timer
+    if (this.pending.length > 0) {
+      this.flushTimer = setTimeout(() => this.flush(), this.batchWindowMs);
+    }
+
+    this.counters.batches++;
+    this.embedFn(batch.map(p => p.text))
+      .then(embeddings => {
+        batch.forEach((p, i) => {
+          const embedding = embeddings[i];
+          if (embedding) {
+            p.resolve(embedding);
+          } else {
+            p.reject(new Error(`No embedding returned for query: ${p.text.slice(0, 60)}`));
+          }
+        });
+      })
+      .catch(error => {
+        for (const p of batch) p.reject(error);
+      });
+  }
+
+  private touch(key: string, embedding: number[]): void {
+    this.entries.delete(key);
+    this.entries.set(key, embedding);
+
+    while (this.entries.size > this.maxEntries) {
+      const oldest = this.entries.keys().next().value as string;
+      this.entries.delete(oldest);
+    }
+  }
+}
@@ -1,7 +1,13 @@
 import OpenAI from 'openai';
 
 const BATCH_SIZE = 100;
-const MODEL = 'text-embedding-3-small';
+export const EMBEDDING_MODEL = 'text-embedding-3-small';
+const MODEL = EMBEDDING_MODEL;
+
+/**
+ * Batch embedding function: one vector per input text, in order
+ */
+export type EmbedFunction = (texts: string[]) => Promise<number[][]>;
 
 export async function generateEmbeddings(
   texts: string[],
@@ -40,3 +46,35 @@ export async function generateSingleEmbedding(
 
   return response.data[0].embedding;
 }
+
+/**
+ * Create a batch embedding function that reuses a single OpenAI client
+ */
+export function createEmbedFunction(
+  apiKey: string,
+  model: string = MODEL
+): EmbedFunction {
+  const client = new OpenAI({ apiKey });
+
+  return async (texts: string[]) => {
+    const embeddings: number[][] = [];
+
+    for (let i = 0; i < texts.length; i += BATCH_SIZE) {
+      const batch = texts.slice(i, i + BATCH_SIZE);
+
+      const response = await client.embeddings.create({
+        model,
+        input: batch
+      });
+
+      // The API may return items out of order; place them by index
+      const ordered = new Array<number[]>(batch.length);
+      for (const item of response.data) {
+        ordered[item.index] = item.embedding;
+      }
+      embeddings.push(...ordered);
+    }
+
+    return embeddings;
+  };
+}
@@ -1,7 +1,10 @@
 export * from './types.js';
 export * from './db/vector.js';
+export * from './db/vector-store.js';
+export * from './db/local-vector.js';
 export * from './db/fts.js';
 export * from './embeddings.js';
+export * from './embedding-cache.js';
 export * from './search.js';
 export * from './config/project-config.js';
 export * from './config/load-config.js';
@@ -12,5 +15,7 @@ export * from './reranker.js';
 export * from './query-analyzer.js';
 export * from './confidence.js';
 export * from './corrective-rag.js';
+export * from './retrieval-planner.js';
+export * from './tracing.js';
 export * from './understanding-extractor.js';
 export * from './search-query-generator.js';
@@ -1,4 +1,5 @@
 import OpenAI from 'openai';
+import { tracer } from './tracing.js';
 
 export interface LLMConfig {
   apiKey: string;
@@ -34,7 +35,7 @@ export class LLMClient {
     userPrompt: string,
     options: SynthesisOptions = {}
   ): Promise<string> {
-    const response = await this.client.chat.completions.create({
+    const response = await tracer.span('synthesis', () => this.client.chat.completions.create({
       model: this.model,
       messages: [
         { role: 'system', content: systemPrompt },
@@ -42,7 +43,7 @@ export class LLMClient {
       ],
       max_tokens: options.maxTokens || this.defaultMaxTokens,
       temperature: options.temperature || this.defaultTemperature
-    });
+    }));
 
     return response.choices[0]?.message?.content || '';
   }
@@ -7,6 +7,8 @@
  * - Adjust RRF weights for different query types
  */
 
+import { tracer } from './tracing.js';
+
 export type QueryType = 'error' | 'howto' | 'concept' | 'code_lookup' | 'api_reference' | 'general';
 
 export interface QueryAnalysis {
@@ -239,17 +241,19 @@ export function extractKeywords(query: string): string[] {
  * Perform full query analysis
  */
 export function analyzeQuery(query: string): QueryAnalysis {
-  const type = classifyQuery(query);
-  const expandedQuery = expandQuery(query, type);
-  const keywords = extractKeywords(query);
+  return tracer.spanSync('query_analysis', () => {
+    const type = classifyQuery(query);
+    const expandedQuery = expandQuery(query, type);
+    const keywords = extractKeywords(query);
 
-  return {
-    type,
-    expandedQuery,
-    suggestedContentType: getSuggestedContentType(type),
-    suggestedLimit: getSuggestedLimit(type),
-    keywords
-  };
+    return {
+      type,
+      expandedQuery,
+      suggestedContentType: getSuggestedContentType(type),
+      suggestedLimit: getSuggestedLimit(type),
+      keywords
+    };
+  });
 }
 
 /**
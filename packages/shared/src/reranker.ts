@@ -1,32 +1,230 @@
+/**
+ * Tiered Reranker
+ *
+ * Stage 1 (local, offline): scores candidates from signals retrieval already
+ * produced - vector similarity, BM25, class/method/function name matches
+ * against the query's extracted keywords, content type vs. query type, and
+ * the orphan flag. Raw vector/BM25 scores carry no orphan penalty, so the
+ * local score applies it again on top of the penalized fused score.
+ *
+ * Stage 2 (LLM listwise): only when the local top-k is ambiguous, i.e.
+ * several candidates outside the top-k score within a small margin of the
+ * cutoff. Results are cached by (query, candidate-id set).
+ */
+
 import OpenAI from 'openai';
 import type { SearchResult } from './types.js';
+import { analyzeQuery, type QueryAnalysis, type QueryType } from './query-analyzer.js';
+import { ORPHAN_PENALTY } from './search.js';
+
+export type RerankMode = 'tiered' | 'local' | 'llm';
 
 export interface RerankerConfig {
   apiKey: string;
   model?: string;
+  /**
+   * tiered: local scoring, LLM only for ambiguous rankings (default)
+   * local: never call the LLM
+   * llm: always use the LLM pass (previous behaviour)
+   */
+  mode?: RerankMode;
+  /** Local score distance from the top-k cutoff that counts as a near tie. Default: 0.03 */
+  escalationMargin?: number;
+  /** Near ties outside the top-k needed to escalate to the LLM. Default: 2 */
+  escalationContenders?: number;
+  /** Cached LLM rankings. Default: 500 */
+  cacheSize?: number;
 }
 
 export interface RerankerOptions {
   topK?: number;
   /** Use extended context (2000 chars) for better accuracy. Default: true */
   extendedContext?: boolean;
+  /** Analysis of the original question; derived from the query if omitted */
+  analysis?: QueryAnalysis;
+  /** Skip the LLM stage (e.g. when the request is out of latency budget) */
+  localOnly?: boolean;
+}
+
+export interface LocalRerankFeatures {
+  vector: number;
+  bm25: number;
+  fused: number;
+  metadata: number;
+  contentType: number;
+  orphaned: boolean;
+}
+
+export interface LocalRerankScore {
+  result: SearchResult;
+  score: number;
+  features: LocalRerankFeatures;
+}
+
+export interface RerankerStats {
+  calls: number;
+  /** Calls answered by the local stage alone */
+  local: number;
+  /** Calls escalated to the LLM (including cache hits) */
+  escalated: number;
+  cacheHits: number;
+  llmCalls: number;
+  llmFailures: number;
+  escalationRate: number;
 }
 
 const DEFAULT_MODEL = 'gpt-4o-mini'; // Fast model for reranking
 const DEFAULT_TOP_K = 10;
 const SHORT_PREVIEW_LENGTH = 500;
 const EXTENDED_PREVIEW_LENGTH = 2000;
+const DEFAULT_ESCALATION_MARGIN = 0.03;
+const DEFAULT_ESCALATION_CONTENDERS = 2;
+const DEFAULT_CACHE_SIZE = 500;
+
+// Local feature weights (sum to 1 before the orphan penalty)
+const LOCAL_WEIGHTS = {
+  vector: 0.35,
+  bm25: 0.2,
+  fused: 0.15,
+  metadata: 0.2,
+  contentType: 0.1
+};
 
 // Debug flag - set via environment variable
 const DEBUG_RERANKER = process.env.DEBUG_RERANKER === 'true';
 
+/**
+ * Content types that best answer each query type (1 = preferred, 0.5 = acceptable)
+ */
+const CONTENT_TYPE_AFFINITY: Record<QueryType, Partial<Record<SearchResult['chunk']['contentType'], number>>> = {
+  code_lookup: { code: 1, 'api-reference': 0.5 },
+  api_reference: { 'api-reference': 1, code: 0.5 },
+  howto: { code: 1, prose: 1 },
+  concept: { prose: 1 },
+  error: { prose: 1, code: 0.5 },
+  general: { prose: 0.5, code: 0.5, 'api-reference': 0.5 }
+};
+
+/**
+ * Min-max normalize within the candidate set; missing values score 0
+ */
+function normalizeScores(values: Array<number | undefined>): number[] {
+  const present = values.filter((v): v is number => v !== undefined);
+  if (present.length === 0) return values.map(() => 0);
+
+  const min = Math.min(...present);
+  const max = Math.max(...present);
+  const range = max - min;
+  return values.map(v => {
+    if (v === undefined) return 0;
+    return range > 0 ? (v - min) / range : 1;
+  });
+}
+
+/**
+ * How strongly a chunk's code metadata and title match the query keywords
+ */
+function metadataMatch(result: SearchResult, keywords: string[]): number {
+  if (keywords.length === 0) return 0;
+
+  const { metadata, title } = result.chunk;
+  const names = [metadata.className, metadata.methodName, metadata.functionName, metadata.typeName]
+    .filter((n): n is string => !!n)
+    .map(n => n.toLowerCase());
+  const lowerTitle = title.toLowerCase();
+
+  let total = 0;
+  for (const keyword of keywords) {
+    const k = keyword.toLowerCase();
+    if (names.some(n => n === k)) {
+      total += 1;
+    } else if (names.some(n => n.includes(k) || k.includes(n))) {
+      total += 0.6;
+    } else if (lowerTitle.includes(k)) {
+      total += 0.4;
+    }
+  }
+  return Math.min(1, total / keywords.length);
+}
+
+/**
+ * Stage 1: score candidates locally. Pure and deterministic.
+ * Returns candidates sorted by descending local score.
+ */
+export function scoreCandidatesLocally(
+  results: SearchResult[],
+  analysis: Pick<QueryAnalysis, 'type' | 'keywords'>
+): LocalRerankScore[] {
+  const vector = normalizeScores(results.map(r => r.vectorScore ?? (r.matchType === 'vector' ? r.score : undefined)));
+  const bm25 = normalizeScores(results.map(r => r.ftsScore ?? (r.matchType === 'fts' ? r.score : undefined)));
+  const fused = normalizeScores(results.map(r => r.score));
+  const affinity = CONTENT_TYPE_AFFINITY[analysis.type];
+
+  return results
+    .map((result, i) => {
+      const features: LocalRerankFeatures = {
+        vector: vector[i],
+        bm25: bm25[i],
+        fused: fused[i],
+        metadata: metadataMatch(result, analysis.keywords),
+        contentType: affinity[result.chunk.contentType] ?? 0,
+        orphaned: result.chunk.metadata.orphaned === true
+      };
+
+      let score =
+        LOCAL_WEIGHTS.vector * features.vector +
+        LOCAL_WEIGHTS.bm25 * features.bm25 +
+        LOCAL_WEIGHTS.fused * features.fused +
+        LOCAL_WEIGHTS.metadata * features.metadata +
+        LOCAL_WEIGHTS.contentType * features.contentType;
+      if (features.orphaned) score *= ORPHAN_PENALTY;
+
+      return { result, score, features, index: i };
+    })
+    // Stable on ties: keep retrieval order
+    .sort((a, b) => b.score - a.score || a.index - b.index)
+    .map(({ result, score, features }) => ({ result, score, features }));
+}
+
+/**
+ * Whether the local top-k is too close to call: counts candidates outside
+ * the top-k whose score is within `margin` of the k-th score
+ */
+export function isAmbiguousRanking(
+  scored: Array<{ score: number }>,
+  topK: number,
+  margin: number = DEFAULT_ESCALATION_MARGIN,
+  contenders: number = DEFAULT_ESCALATION_CONTENDERS
+): boolean {
+  if (scored.length <= topK) return false;
+
+  const cutoff = scored[topK - 1].score;
+  let nearTies = 0;
+  for (let i = topK; i < scored.length; i++) {
+    if (cutoff - scored[i].score > margin) break; // sorted, so no more near ties
+    nearTies++;
+  }
+  return nearTies >= contenders;
+}
+
 export class Reranker {
   private client: OpenAI;
   private model: string;
+  private mode: RerankMode;
+  private escalationMargin: number;
+  private escalationContenders: number;
+  private cacheSize: number;
+  // (query, candidate ids, topK) -> ranked chunk ids, in LRU order
+  private cache = new Map<string, string[]>();
+  private counters = { calls: 0, local: 0, escalated: 0, cacheHits: 0, llmCalls: 0, llmFailures: 0 };
 
   constructor(config: RerankerConfig) {
     this.client = new OpenAI({ apiKey: config.apiKey });
     this.model = config.model || DEFAULT_MODEL;
+    this.mode = config.mode || 'tiered';
+    this.escalationMargin = config.escalationMargin ?? DEFAULT_ESCALATION_MARGIN;
+    this.escalationContenders = config.escalationContenders ?? DEFAULT_ESCALATION_CONTENDERS;
+    this.cacheSize = config.cacheSize ?? DEFAULT_CACHE_SIZE;
   }
 
   async rerank(
@@ -40,6 +238,107 @@ export class Reranker {
     if (results.length === 0) return [];
     if (results.length <= topK) return results;
 
+    this.counters.calls++;
+
+    // Stage 1: local scoring
+    const analysis = options.analysis || analyzeQuery(query);
+    const scored = scoreCandidatesLocally(results, analysis);
+    const localOrder = scored.map(s => s.result);
+
+    const escalate = !options.localOnly && (this.mode === 'llm' ||
+      (this.mode === 'tiered' && isAmbiguousRanking(scored, topK, this.escalationMargin, this.escalationContenders)));
+
+    if (!escalate) {
+      this.counters.local++;
+      if (DEBUG_RERANKER) {
+        console.log(`[Reranker] Local ranking decisive for "${query}" (${results.length} → ${topK})`);
+      }
+      return localOrder.slice(0, topK);
+    }
+
+    this.counters.escalated++;
+
+    // Stage 2: LLM listwise pass, cached by query + candidate set
+    const cacheKey = this.cacheKey(query, results, topK);
+    const cachedIds = this.cache.get(cacheKey);
+    if (cachedIds) {
+      this.counters.cacheHits++;
+      this.cache.delete(cacheKey);
+      this.cache.set(cacheKey, cachedIds);
+      return this.orderByIds(cachedIds, localOrder, topK);
+    }
+
+    // In tiered mode the LLM only sees the contested window, not every candidate
+    const candidates = this.mode === 'llm'
+      ? results
+      : localOrder.slice(0, Math.min(localOrder.length, topK * 2));
+
+    this.counters.llmCalls++;
+    const indices = await this.llmRerank(query, candidates, topK, extendedContext);
+    if (!indices) {
+      this.counters.llmFailures++;
+      return localOrder.slice(0, topK);
+    }
+
+    const rankedIds = indices.map(i => candidates[i].chunk.id);
+    this.cache.set(cacheKey, rankedIds);
+    if (this.cache.size > this.cacheSize) {
+      this.cache.delete(this.cache.keys().next().value as string);
+    }
+
+    return this.orderByIds(rankedIds, localOrder, topK);
+  }
+
+  /**
+   * Local/LLM split and cache effectiveness
+   */
+  get stats(): RerankerStats {
+    return {
+      ...this.counters,
+      escalationRate: this.counters.calls === 0 ? 0 : this.counters.escalated / this.counters.calls
+    };
+  }
+
+  private cacheKey(query: string, results: SearchResult[], topK: number): string {
+    const ids = results.map(r => r.chunk.id).sort();
+    return [query.trim().toLowerCase(), topK, ids.join(',')].join('\u0000');
+  }
+
+  /**
+   * LLM-ranked ids first, then fill from the local order
+   */
+  private orderByIds(ids: string[], localOrder: SearchResult[], topK: number): SearchResult[] {
+    const byId = new Map(localOrder.map(r => [r.chunk.id, r]));
+    const ordered: SearchResult[] = [];
+    const seen = new Set<string>();
+
+    for (const id of ids) {
+      const result = byId.get(id);
+      if (result && !seen.has(id)) {
+        ordered.push(result);
+        seen.add(id);
+      }
+    }
+    for (const result of localOrder) {
+      if (ordered.length >= topK) break;
+      if (!seen.has(result.chunk.id)) {
+        ordered.push(result);
+        seen.add(result.chunk.id);
+      }
+    }
+
+    return ordered.slice(0, topK);
+  }
+
+  /**
+   * Listwise LLM pass. Returns candidate indices in ranked order, or null on failure.
+   */
+  private async llmRerank(
+    query: string,
+    results: SearchResult[],
+    topK: number,
+    extendedContext: boolean
+  ): Promise<number[] | null> {
     // Use extended preview length for better code understanding
     const previewLength = extendedContext ? EXTENDED_PREVIEW_LENGTH : SHORT_PREVIEW_LENGTH;
 
@@ -132,7 +431,7 @@ Only return the JSON array, nothing else.`;
       if (!jsonMatch) {
         console.error('[Reranker] Failed: no valid JSON array in response');
         console.error('[Reranker] Raw content was:', content);
-        return results.slice(0, topK);
+        return null;
       }
 
       if (DEBUG_RERANKER) {
@@ -145,10 +444,9 @@ Only return the JSON array, nothing else.`;
         console.log('[Reranker] Parsed indices:', indices);
       }
 
-      // Return results in reranked order
+      // Valid, de-duplicated indices in reranked order
       const reranked = indices
-        .filter(i => i >= 0 && i < results.length)
-        .map(i => results[i])
+        .filter((i, pos) => Number.isInteger(i) && i >= 0 && i < results.length && indices.indexOf(i) === pos)
         .slice(0, topK);
 
       if (DEBUG_RERANKER) {
@@ -157,11 +455,11 @@ Only return the JSON array, nothing else.`;
 
       return reranked;
     } catch (error) {
-      console.error('[Reranker] Failed, returning original order:', error);
+      console.error('[Reranker] Failed, using local order:', error);
       if (DEBUG_RERANKER && error instanceof Error) {
         console.error('[Reranker] Error stack:', error.stack);
       }
-      return results.slice(0, topK);
+      return null;
     }
   }
 }
@@ -0,0 +1,375 @@
+/**
+ * Retrieval Planner
+ *
+ * Coordinates all searches made while answering one request:
+ * - Candidate pools for the original and alternative queries are fetched
+ *   concurrently instead of one retry at a time
+ * - Identical sub-searches within the request run once (single flight)
+ * - Pools are merged with reciprocal rank fusion and reranked once
+ * - Content-type searches share one embedding and one candidate fetch
+ * - An optional latency budget stops waiting for further retries and
+ *   keeps the final rerank local
+ *
+ * Create one planner per request; it holds no cross-request state.
+ */
+
+import type { SearchResult } from './types.js';
+import type { QueryAnalysis } from './query-analyzer.js';
+import { candidatePoolSize, ORPHAN_PENALTY, type HybridSearch } from './search.js';
+import { normalizeQueryText } from './embedding-cache.js';
+import { evaluateRetrievalQuality } from './confidence.js';
+import { tracer } from './tracing.js';
+import {
+  generateAlternativeQueries,
+  type CorrectiveRAGOptions,
+  type CorrectiveSearchResult
+} from './corrective-rag.js';
+
+type ContentType = 'prose' | 'code' | 'api-reference';
+
+export interface RetrievalPlannerOptions {
+  project: string;
+  /** Analysis of the user's question, passed to the reranker */
+  analysis?: QueryAnalysis;
+  /** Latency budget in milliseconds, counted from planner creation */
+  budgetMs?: number;
+  /** Absolute deadline (epoch ms); takes precedence over budgetMs */
+  deadline?: number;
+}
+
+export interface PlannedSearchOptions {
+  limit: number;
+  rerankTopK: number;
+  contentType?: ContentType;
+}
+
+export interface ContentTypeRequest {
+  contentType: ContentType;
+  limit: number;
+  rerankTopK: number;
+}
+
+/**
+ * One retrieval attempt: the candidate pool and its reranked results
+ */
+export interface PlannedAttempt {
+  /** Query the pool was fetched and reranked with */
+  query: string;
+  pool: SearchResult[];
+  results: SearchResult[];
+}
+
+export interface PlannedCorrectiveOptions extends Partial<CorrectiveRAGOptions> {
+  /** Analysis used to generate alternative queries; defaults to the planner's */
+  analysis?: QueryAnalysis;
+  /**
+   * Attempt already made for this request (see attempt()); used as the
+   * first attempt instead of fetching and reranking the query again
+   */
+  initialAttempt?: PlannedAttempt;
+  /** Results returned. Default: 15 */
+  limit?: number;
+  /** Candidates kept by the single rerank. Default: 10 */
+  rerankTopK?: number;
+}
+
+export interface RetrievalPlannerStats {
+  /** Candidate fetches actually issued */
+  fetches: number;
+  /** Fetches answered by an identical in-flight or finished fetch */
+  deduplicated: number;
+  reranks: number;
+  /** Retry pools that had not arrived by the deadline */
+  lateDropped: number;
+  elapsedMs: number;
+}
+
+const RRF_K = 60;
+const CORRECTIVE_DEFAULTS: CorrectiveRAGOptions = {
+  minResultsThreshold: 3,
+  maxRetries: 2,
+  mergeResults: true
+};
+
+/**
+ * Merge ranked lists with reciprocal rank fusion, penalizing orphaned
+ * chunks as HybridSearch does. Keeps the best raw vector/BM25 score seen
+ * for each chunk so the reranker's local stage still has them.
+ */
+export function fuseRankedLists(lists: SearchResult[][], limit?: number): SearchResult[] {
+  const fused = new Map<string, SearchResult>();
+
+  for (const list of lists) {
+    list.forEach((result, rank) => {
+      let rrfScore = 1 / (RRF_K + rank + 1);
+      if (result.chunk.metadata.orphaned) {
+        rrfScore *= ORPHAN_PENALTY;
+      }
+      const existing = fused.get(result.chunk.id);
+
+      if (!existing) {
+        fused.set(result.chunk.id, { ...result, score: rrfScore });
+        return;
+      }
+
+      existing.score += rrfScore;
+      if (result.vectorScore !== undefined) {
+        existing.vectorScore = Math.max(existing.vectorScore ?? -Infinity, result.vectorScore);
+      }
+      if (result.ftsScore !== undefined) {
+        existing.ftsScore = Math.max(existing.ftsScore ?? -Infinity, result.ftsScore);
+      }
+      if (existing.matchType !== result.matchType) {
+        existing.matchType = 'hybrid';
+      }
+    });
+  }
+
+  const merged = Array.from(fused.values()).sort((a, b) => b.score - a.score);
+  return limit === undefined ? merged : merged.slice(0, limit);
+}
+
+export class RetrievalPlanner {
+  readonly deadline: number;
+  private startTime = Date.now();
+  private pools = new Map<string, Promise<SearchResult[]>>();
+  private counters = { fetches: 0, deduplicated: 0, reranks: 0, lateDropped: 0 };
+
+  constructor(
+    private search: HybridSearch,
+    private options: RetrievalPlannerOptions
+  ) {
+    this.deadline = options.deadline ??
+      (options.budgetMs && options.budgetMs > 0 ? this.startTime + options.budgetMs : Infinity);
+  }
+
+  get remainingMs(): number {
+    return this.deadline - Date.now();
+  }
+
+  get expired(): boolean {
+    return this.remainingMs <= 0;
+  }
+
+  get stats(): RetrievalPlannerStats {
+    return { ...this.counters, elapsedMs: Date.now() - this.startTime };
+  }
+
+  /**
+   * Candidate pool for a query (no reranking). Identical requests within
+   * this planner share one fetch.
+   */
+  candidates(
+    query: string,
+    options: { limit: number; contentType?: ContentType; embedding?: number[] }
+  ): Promise<SearchResult[]> {
+    const key = [normalizeQueryText(query), options.contentType ?? '*', options.limit].join('\u0000');
+
+    const existing = this.pools.get(key);
+    if (existing) {
+      this.counters.deduplicated++;
+      return existing;
+    }
+
+    this.counters.fetches++;
+    const pool = this.search.retrieve(query, {
+      limit: options.limit,
+      contentType: options.contentType,
+      project: this.options.project,
+      embedding: options.embedding
+    }).catch(error => {
+      console.error(`[RetrievalPlanner] Candidate fetch failed for "${query}":`, error instanceof Error ? error.message : error);
+      return [] as SearchResult[];
+    });
+
+    this.pools.set(key, pool);
+    return pool;
+  }
+
+  /**
+   * Single search: fetch a candidate pool and rerank it once
+   */
+  async searchOne(query: string, options: PlannedSearchOptions): Promise<SearchResult[]> {
+    return (await this.attempt(query, options)).results;
+  }
+
+  /**
+   * Like searchOne, but also returns the candidate pool so a later
+   * correctiveSearch can reuse the attempt
+   */
+  async attempt(query: string, options: PlannedSearchOptions): Promise<PlannedAttempt> {
+    const pool = await this.candidates(query, {
+      limit: candidatePoolSize(options.limit),
+      contentType: options.contentType
+    });
+    const ranked = await this.rerank(query, pool, options.rerankTopK);
+    return { query, pool, results: ranked.slice(0, options.limit) };
+  }
+
+  /**
+   * Several content-type-filtered searches for one query, sharing one
+   * embedding and one unfiltered candidate fetch. A type with too few
+   * candidates in the shared pool to fill its limit gets a filtered
+   * top-up fetch (same embedding, run concurrently). Results are in
+   * request order.
+   */
+  async searchByContentType(query: string, requests: ContentTypeRequest[]): Promise<SearchResult[][]> {
+    const embedding = await tracer.span('embedding', () => this.search.embeddingCache.embed(query));
+    const poolLimit = requests.reduce((sum, r) => sum + candidatePoolSize(r.limit), 0);
+    const pool = await this.candidates(query, { limit: poolLimit, embedding });
+
+    const partitions = await Promise.all(requests.map(async request => {
+      const wanted = candidatePoolSize(request.limit);
+      let partition = pool.filter(r => r.chunk.contentType === request.contentType);
+
+      if (partition.length < request.limit) {
+        const topUp = await this.candidates(query, {
+          limit: wanted,
+          contentType: request.contentType,
+          embedding
+        });
+        partition = fuseRankedLists([partition, topUp], wanted);
+      }
+
+      return partition;
+    }));
+
+    return Promise.all(requests.map(async (request, i) => {
+      const ranked = await this.rerank(query, partitions[i], request.rerankTopK);
+      return ranked.slice(0, request.limit);
+    }));
+  }
+
+  /**
+   * Corrective retrieval: evaluate the first attempt and, if it is poor,
+   * fuse it with the alternative queries' pools and rerank once.
+   *
+   * Alternative pools are requested up front, concurrently with the first
+   * attempt, so retries cost one round of latency rather than one per
+   * alternative. When the caller passes its own first attempt, only the
+   * alternatives are fetched, and only if that attempt is poor. Pools that
+   * miss the deadline are left out.
+   */
+  async correctiveSearch(query: string, options: PlannedCorrectiveOptions = {}): Promise<CorrectiveSearchResult> {
+    const opts = { ...CORRECTIVE_DEFAULTS, ...options };
+    const limit = options.limit ?? 15;
+    const rerankTopK = options.rerankTopK ?? 10;
+    const poolLimit = candidatePoolSize(limit);
+    const analysis = options.analysis ?? this.options.analysis;
+
+    const alternatives = analysis
+      ? generateAlternativeQueries(query, analysis).slice(0, opts.maxRetries)
+      : [];
+
+    const initial = options.initialAttempt;
+    const fetchAlternatives = () => alternatives.map(q => this.candidates(q, { limit: poolLimit }));
+
+    // Without a first attempt, start every pool up front; single flight makes repeats free
+    const primaryPool = initial ? Promise.resolve(initial.pool) : this.candidates(query, { limit: poolLimit });
+    const alternativePools = initial ? null : fetchAlternatives();
+
+    const initialResults = initial
+      ? initial.results.slice(0, limit)
+      : (await this.rerank(query, await primaryPool, rerankTopK)).slice(0, limit);
+    const initialQuality = evaluateRetrievalQuality(query, initialResults);
+
+    if (
+      initialQuality === 'high' ||
+      (initialQuality === 'medium' && initialResults.length >= opts.minResultsThreshold) ||
+      alternatives.length === 0
+    ) {
+      return {
+        results: initialResults,
+        wasRetried: false,
+        retriesUsed: 0,
+        quality: initialQuality,
+        alternativeQueries: []
+      };
+    }
+
+    const arrived = await this.settleByDeadline(alternativePools ?? fetchAlternatives());
+    const usedQueries = alternatives.filter((_, i) => arrived[i] !== null);
+    const usedPools = arrived.filter((p): p is SearchResult[] => p !== null);
+
+    if (usedPools.length === 0) {
+      return {
+        results: initialResults,
+        wasRetried: false,
+        retriesUsed: 0,
+        quality: initialQuality,
+        alternativeQueries: []
+      };
+    }
+
+    let results: SearchResult[];
+    if (opts.mergeResults) {
+      // The first attempt's whole pool (not just its top results) joins the fusion
+      const fused = fuseRankedLists([await primaryPool, ...usedPools], poolLimit);
+      results = await this.rerank(query, fused, rerankTopK);
+    } else {
+      // Keep whichever single attempt scores best
+      results = initialResults;
+      let bestRank = qualityRank(initialQuality);
+      for (let i = 0; i < usedPools.length; i++) {
+        const ranked = await this.rerank(usedQueries[i], usedPools[i], rerankTopK);
+        const rank = qualityRank(evaluateRetrievalQuality(query, ranked));
+        if (rank > bestRank || (rank === bestRank && ranked.length > results.length)) {
+          results = ranked;
+          bestRank = rank;
+        }
+      }
+    }
+
+    const finalResults = results.slice(0, limit);
+    return {
+      results: finalResults,
+      wasRetried: true,
+      retriesUsed: usedQueries.length,
+      quality: evaluateRetrievalQuality(query, finalResults),
+      alternativeQueries: usedQueries
+    };
+  }
+
+  /**
+   * Rerank once; past the deadline only the local stage runs
+   */
+  private async rerank(query: string, results: SearchResult[], topK: number): Promise<SearchResult[]> {
+    this.counters.reranks++;
+    return this.search.rerankResults(query, results, {
+      topK,
+      analysis: this.options.analysis,
+      localOnly: this.expired
+    });
+  }
+
+  /**
+   * Wait for promises until the deadline; entries still pending are null
+   */
+  private async settleByDeadline<T>(promises: Promise<T>[]): Promise<Array<T | null>> {
+    if (this.deadline === Infinity) {
+      return Promise.all(promises);
+    }
+
+    const settled: Array<T | null> = promises.map(() => null);
+    const tracked = promises.map((p, i) => p.then(value => { settled[i] = value; }));
+
+    let timer: NodeJS.Timeout | undefined;
+    const timeout = new Promise<void>(resolve => {
+      timer = setTimeout(resolve, Math.max(0, this.remainingMs));
+    });
+
+    await Promise.race([Promise.all(tracked), timeout]);
+    clearTimeout(timer);
+
+    this.counters.lateDropped += settled.filter(v => v === null).length;
+    return settled;
+  }
+}
+
+function qualityRank(quality: 'high' | 'medium' | 'low'): number {
+  switch (quality) {
+    case 'high': return 3;
+    case 'medium': return 2;
+    case 'low': return 1;
+  }
+}
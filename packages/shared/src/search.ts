@@ -1,14 +1,18 @@
 import type { DocumentChunk, SearchResult } from './types.js';
-import { VectorDB } from './db/vector.js';
+import type { VectorStore } from './db/vector-store.js';
 import { FullTextDB } from './db/fts.js';
-import { generateSingleEmbedding } from './embeddings.js';
+import { QueryEmbeddingCache } from './embedding-cache.js';
+import { tracer } from './tracing.js';
 import type { Reranker } from './reranker.js';
+import type { QueryAnalysis } from './query-analyzer.js';
 
 export interface HybridSearchOptions {
-  vectorDb: VectorDB;
+  vectorDb: VectorStore;
   ftsDb: FullTextDB;
   openaiApiKey: string;
   reranker?: Reranker;
+  /** Shared query embedding cache; an in-memory one is created if omitted */
+  embeddingCache?: QueryEmbeddingCache;
 }
 
 export interface SearchOptions {
@@ -18,10 +22,40 @@ export interface SearchOptions {
   mode?: 'hybrid' | 'vector' | 'fts';
   rerank?: boolean;
   rerankTopK?: number;
+  /** Analysis of the user's question, used by the local rerank stage */
+  analysis?: QueryAnalysis;
+}
+
+export interface RetrieveOptions {
+  limit: number;
+  contentType?: 'prose' | 'code' | 'api-reference';
+  project?: string;
+  mode?: 'hybrid' | 'vector' | 'fts';
+  /** Precomputed query embedding */
+  embedding?: number[];
+}
+
+/** Score multiplier for chunks whose page was not seen in the last crawl */
+export const ORPHAN_PENALTY = 0.5;
+
+/**
+ * Number of candidates fetched when results will be reranked down to `limit`
+ */
+export function candidatePoolSize(limit: number): number {
+  return Math.max(limit * 3, 30);
 }
 
 export class HybridSearch {
-  constructor(private options: HybridSearchOptions) {}
+  readonly embeddingCache: QueryEmbeddingCache;
+
+  constructor(private options: HybridSearchOptions) {
+    this.embeddingCache = options.embeddingCache ||
+      new QueryEmbeddingCache({ apiKey: options.openaiApiKey });
+  }
+
+  get reranker(): Reranker | undefined {
+    return this.options.reranker;
+  }
 
   async search(query: string, options: SearchOptions = {}): Promise<SearchResult[]> {
     const {
@@ -30,59 +64,84 @@ export class HybridSearch {
       project,
       mode = 'hybrid',
       rerank = false,
-      rerankTopK = 10
+      rerankTopK = 10,
+      analysis
     } = options;
 
     // Fetch more candidates if reranking
-    const fetchLimit = rerank ? Math.max(limit * 3, 30) : limit;
-
-    let results: SearchResult[];
+    const fetchLimit = rerank ? candidatePoolSize(limit) : limit;
 
-    if (mode === 'fts') {
-      results = await this.ftsSearch(query, { limit: fetchLimit, contentType, project });
-    } else if (mode === 'vector') {
-      results = await this.vectorSearch(query, { limit: fetchLimit, contentType, project });
-    } else {
-      // Hybrid: combine vector and FTS results
-      const [vectorResults, ftsResults] = await Promise.all([
-        this.vectorSearch(query, { limit: fetchLimit, contentType, project }),
-        this.ftsSearch(query, { limit: fetchLimit, contentType, project })
-      ]);
-
-      // Merge and deduplicate results using reciprocal rank fusion
-      results = this.reciprocalRankFusion(vectorResults, ftsResults, fetchLimit);
-    }
+    let results = await this.retrieve(query, { limit: fetchLimit, contentType, project, mode });
 
     // Apply reranking if enabled and reranker is available
-    if (rerank && this.options.reranker && results.length > rerankTopK) {
-      results = await this.options.reranker.rerank(query, results, { topK: rerankTopK });
+    if (rerank) {
+      results = await this.rerankResults(query, results, { topK: rerankTopK, analysis });
     }
 
     return results.slice(0, limit);
   }
 
+  /**
+   * Candidate retrieval without reranking.
+   * A precomputed query embedding can be passed to skip the embedding lookup.
+   */
+  async retrieve(query: string, options: RetrieveOptions): Promise<SearchResult[]> {
+    const { limit, contentType, project, mode = 'hybrid', embedding } = options;
+
+    if (mode === 'fts') {
+      return this.ftsSearch(query, { limit, contentType, project });
+    }
+    if (mode === 'vector') {
+      return this.vectorSearch(query, { limit, contentType, project, embedding });
+    }
+
+    // Hybrid: combine vector and FTS results
+    const [vectorResults, ftsResults] = await Promise.all([
+      this.vectorSearch(query, { limit, contentType, project, embedding }),
+      this.ftsSearch(query, { limit, contentType, project })
+    ]);
+
+    // Merge and deduplicate results using reciprocal rank fusion
+    return tracer.spanSync('rrf', () => this.reciprocalRankFusion(vectorResults, ftsResults, limit));
+  }
+
+  /**
+   * Rerank a candidate list down to topK (no-op without a reranker or
+   * when there are already topK or fewer candidates)
+   */
+  async rerankResults(
+    query: string,
+    results: SearchResult[],
+    options: { topK: number; analysis?: QueryAnalysis; localOnly?: boolean }
+  ): Promise<SearchResult[]> {
+    if (!this.options.reranker || results.length <= options.topK) {
+      return results;
+    }
+    const reranker = this.options.reranker;
+    return tracer.span('rerank', () => reranker.rerank(query, results, options));
+  }
+
   private async vectorSearch(
     query: string,
-    options: { limit: number; contentType?: string; project?: string }
+    options: { limit: number; contentType?: string; project?: string; embedding?: number[] }
   ): Promise<SearchResult[]> {
-    const embedding = await generateSingleEmbedding(
-      query,
-      this.options.openaiApiKey
-    );
+    const embedding = options.embedding ??
+      await tracer.span('embedding', () => this.embeddingCache.embed(query));
 
     const filter: Record<string, string> = {};
     if (options.contentType) filter.contentType = options.contentType;
     if (options.project) filter.project = options.project;
 
-    const results = await this.options.vectorDb.search(embedding, {
+    const results = await tracer.span('vector_search', () => this.options.vectorDb.search(embedding, {
       limit: options.limit,
       filter: Object.keys(filter).length > 0 ? filter : undefined
-    });
+    }));
 
     return results.map(r => ({
       chunk: r.chunk,
       score: r.score,
-      matchType: 'vector' as const
+      matchType: 'vector' as const,
+      vectorScore: r.score
     }));
   }
 
@@ -90,16 +149,17 @@ export class HybridSearch {
     query: string,
     options: { limit: number; contentType?: string; project?: string }
   ): Promise<SearchResult[]> {
-    const results = await this.options.ftsDb.search(query, {
+    const results = await tracer.span('fts', () => this.options.ftsDb.search(query, {
       limit: options.limit,
       contentType: options.contentType,
       project: options.project
-    });
+    }));
 
     return results.map(r => ({
       chunk: r.chunk,
       score: r.score,
-      matchType: 'fts' as const
+      matchType: 'fts' as const,
+      ftsScore: r.score
     }));
   }
 
@@ -109,8 +169,7 @@ export class HybridSearch {
     limit: number
   ): SearchResult[] {
     const k = 60; // RRF constant
-    const ORPHAN_PENALTY = 0.5; // Reduce orphaned chunk scores by 50%
-    const scores = new Map<string, { chunk: DocumentChunk; score: number; matchType: SearchResult['matchType'] }>();
+    const scores = new Map<string, SearchResult>();
 
     // Score vector results
     vectorResults.forEach((result, rank) => {
@@ -124,7 +183,8 @@ export class HybridSearch {
       scores.set(result.chunk.id, {
         chunk: result.chunk,
         score: rrfScore,
-        matchType: 'hybrid'
+        matchType: 'hybrid',
+        vectorScore: result.score
       });
     });
 
@@ -142,11 +202,13 @@ export class HybridSearch {
       if (existing) {
         existing.score += rrfScore;
         existing.matchType = 'hybrid';
+        existing.ftsScore = result.score;
       } else {
         scores.set(result.chunk.id, {
           chunk: result.chunk,
           score: rrfScore,
-          matchType: 'hybrid'
+          matchType: 'hybrid',
+          ftsScore: result.score
         });
       }
     });
@@ -0,0 +1,292 @@
+/**
+ * Pipeline Tracing
+ *
+ * Lightweight per-stage timing for the retrieval/synthesis pipeline:
+ * - span() / spanSync() time one stage (embedding, fts, rerank, ...)
+ * - trace() groups the spans of one request (via AsyncLocalStorage, so
+ *   concurrent requests do not mix)
+ * - snapshot() aggregates count, mean and p50/p95/p99 per stage and per
+ *   request name from a bounded window of recent samples
+ *
+ * Stages nest (corrective retries contain embedding and search spans),
+ * so stage times overlap and do not sum to the request time.
+ */
+
+import { AsyncLocalStorage } from 'async_hooks';
+
+/** Stage names used by the shared pipeline and the server tools */
+export const TRACE_STAGES = [
+  'query_analysis',
+  'embedding',
+  'vector_search',
+  'fts',
+  'rrf',
+  'rerank',
+  'corrective',
+  'synthesis',
+  'confidence'
+] as const;
+
+export type TraceStage = typeof TRACE_STAGES[number];
+
+export interface SpanRecord {
+  stage: string;
+  /** Offset from the start of the enclosing trace */
+  startMs: number;
+  durationMs: number;
+  error?: boolean;
+}
+
+export interface TraceRecord {
+  id: number;
+  name: string;
+  startedAt: string;
+  durationMs: number;
+  error?: boolean;
+  spans: SpanRecord[];
+}
+
+export interface LatencySummary {
+  count: number;
+  errors: number;
+  meanMs: number;
+  p50Ms: number;
+  p95Ms: number;
+  p99Ms: number;
+  maxMs: number;
+}
+
+export interface TracingSnapshot {
+  since: string;
+  stages: Record<string, LatencySummary>;
+  requests: Record<string, LatencySummary>;
+}
+
+export interface TracerOptions {
+  /** Samples kept per stage for percentiles. Default: 4096 */
+  windowSize?: number;
+  /** Completed traces kept for inspection. Default: 50 */
+  recentTraces?: number;
+}
+
+interface ActiveTrace {
+  id: number;
+  name: string;
+  start: number;
+  startedAt: string;
+  spans: SpanRecord[];
+}
+
+/**
+ * Latency samples for one stage: exact totals plus a ring buffer of the
+ * most recent samples for percentiles
+ */
+class LatencyWindow {
+  private samples: Float64Array;
+  private next = 0;
+  private filled = 0;
+  private count = 0;
+  private errors = 0;
+  private sum = 0;
+  private max = 0;
+
+  constructor(size: number) {
+    this.samples = new Float64Array(size);
+  }
+
+  add(durationMs: number, error: boolean): void {
+    this.samples[this.next] = durationMs;
+    this.next = (this.next + 1) % this.samples.length;
+    this.filled = Math.min(this.filled + 1, this.samples.length);
+    this.count++;
+    this.sum += durationMs;
+    if (durationMs > this.max) this.max = durationMs;
+    if (error) this.errors++;
+  }
+
+  summary(): LatencySummary {
+    const sorted = this.samples.slice(0, this.filled).sort();
+    return {
+      count: this.count,
+      errors: this.errors,
+      meanMs: round(this.count > 0 ? this.sum / this.count : 0),
+      p50Ms: round(percentile(sorted, 0.5)),
+      p95Ms: round(percentile(sorted, 0.95)),
+      p99Ms: round(percentile(sorted, 0.99)),
+      maxMs: round(this.max)
+    };
+  }
+}
+
+/**
+ * Nearest-rank percentile of an ascending array
+ */
+export function percentile(sorted: ArrayLike<number>, p: number): number {
+  if (sorted.length === 0) return 0;
+  const rank = Math.ceil(p * sorted.length) - 1;
+  return sorted[Math.min(sorted.length - 1, Math.max(0, rank))];
+}
+
+function round(ms: number): number {
+  return Math.round(ms * 100) / 100;
+}
+
+export class Tracer {
+  private windowSize: number;
+  private maxRecentTraces: number;
+  private stages = new Map<string, LatencyWindow>();
+  private requests = new Map<string, LatencyWindow>();
+  private recent: TraceRecord[] = [];
+  private listeners = new Set<(trace: TraceRecord) => void>();
+  private context = new AsyncLocalStorage<ActiveTrace>();
+  private nextTraceId = 1;
+  private since = new Date();
+
+  constructor(options: TracerOptions = {}) {
+    this.windowSize = options.windowSize ?? 4096;
+    this.maxRecentTraces = options.recentTraces ?? 50;
+  }
+
+  /**
+   * Run a request and collect the spans recorded inside it
+   */
+  async trace<T>(name: string, fn: () => Promise<T>): Promise<T> {
+    const active: ActiveTrace = {
+      id: this.nextTraceId++,
+      name,
+      start: performance.now(),
+      startedAt: new Date().toISOString(),
+      spans: []
+    };
+
+    let error = false;
+    try {
+      return await this.context.run(active, fn);
+    } catch (err) {
+      error = true;
+      throw err;
+    } finally {
+      const durationMs = performance.now() - active.start;
+      this.window(this.requests, name).add(durationMs, error);
+      this.finish({
+        id: active.id,
+        name,
+        startedAt: active.startedAt,
+        durationMs: round(durationMs),
+        ...(error ? { error } : {}),
+        spans: active.spans
+      });
+    }
+  }
+
+  /**
+   * Time one async pipeline stage
+   */
+  async span<T>(stage: string, fn: () => Promise<T>): Promise<T> {
+    const start = performance.now();
+    let error = false;
+    try {
+      return await fn();
+    } catch (err) {
+      error = true;
+      throw err;
+    } finally {
+      this.record(stage, performance.now() - start, error, start);
+    }
+  }
+
+  /**
+   * Time one synchronous pipeline stage
+   */
+  spanSync<T>(stage: string, fn: () => T): T {
+    const start = performance.now();
+    let error = false;
+    try {
+      return fn();
+    } catch (err) {
+      error = true;
+      throw err;
+    } finally {
+      this.record(stage, performance.now() - start, error, start);
+    }
+  }
+
+  /**
+   * Record an externally measured stage duration
+   */
+  record(stage: string, durationMs: number, error = false, start = performance.now() - durationMs): void {
+    this.window(this.stages, stage).add(durationMs, error);
+
+    const active = this.context.getStore();
+    if (active) {
+      active.spans.push({
+        stage,
+        startMs: round(start - active.start),
+        durationMs: round(durationMs),
+        ...(error ? { error } : {})
+      });
+    }
+  }
+
+  /**
+   * Subscribe to completed traces; returns an unsubscribe function
+   */
+  onTrace(listener: (trace: TraceRecord) => void): () => void {
+    this.listeners.add(listener);
+    return () => this.listeners.delete(listener);
+  }
+
+  /**
+   * Most recent completed traces, newest last
+   */
+  recentTraces(limit = this.maxRecentTraces): TraceRecord[] {
+    return this.recent.slice(-limit);
+  }
+
+  snapshot(): TracingSnapshot {
+    const summarize = (windows: Map<string, LatencyWindow>) =>
+      Object.fromEntries(Array.from(windows, ([name, w]) => [name, w.summary()]));
+
+    return {
+      since: this.since.toISOString(),
+      stages: summarize(this.stages),
+      requests: summarize(this.requests)
+    };
+  }
+
+  reset(): void {
+    this.stages.clear();
+    this.requests.clear();
+    this.recent = [];
+    this.since = new Date();
+  }
+
+  private window(windows: Map<string, LatencyWindow>, name: string): LatencyWindow {
+    let window = windows.get(name);
+    if (!window) {
+      window = new LatencyWindow(this.windowSize);
+      windows.set(name, window);
+    }
+    return window;
+  }
+
+  private finish(trace: TraceRecord): void {
+    this.recent.push(trace);
+    if (this.recent.length > this.maxRecentTraces) {
+      this.recent.shift();
+    }
+
+    for (const listener of this.listeners) {
+      try {
+        listener(trace);
+      } catch (error) {
+        console.error('[Tracer] Trace listener failed:', error instanceof Error ? error.message : error);
+      }
+    }
+  }
+}
+
+/**
+ * Process-wide tracer used by the pipeline
+ */
+export const tracer = new Tracer();
@@ -45,6 +45,10 @@ export interface SearchResult {
   chunk: DocumentChunk;
   score: number;
   matchType: 'vector' | 'fts' | 'hybrid';
+  /** Raw cosine similarity, when the chunk came from vector search */
+  vectorScore?: number;
+  /** Raw BM25 score, when the chunk came from full-text search */
+  ftsScore?: number;
 }
 
 export interface EmbeddingResult {
@@ -0,0 +1,285 @@
+#!/usr/bin/env npx ts-node
+
+/**
+ * FullTextDB storage benchmark (before / after the external-content rework)
+ *
+ * Usage: npm run bench:fts -- [--sizes 10000,100000,1000000] [--ops 100]
+ *
+ * For each corpus size, seeds a fresh database and measures:
+ *   - upsert   re-indexing existing chunks (ms per chunk)
+ *   - delete   deleteByUrls for a set of pages (ms per page)
+ *   - search   project-scoped FTS queries (p50 / p95 ms)
+ *   - size     database file size
+ *
+ * "before" replays the original layout: chunks_fts holds its own copy of
+ * the text, keyed by an UNINDEXED content_id, and every upsert/delete
+ * issues DELETE FROM chunks_fts WHERE content_id = ? (a full FTS scan).
+ * Seeding the "before" layout skips those deletes so large sizes finish;
+ * only the measured operations use the original statements.
+ *
+ * "after" is the current FullTextDB.
+ */
+
+import Database from 'better-sqlite3';
+import { mkdtempSync, rmSync, statSync, existsSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { parseArgs } from 'util';
+import { FullTextDB } from '../packages/shared/src/db/fts.js';
+import type { DocumentChunk } from '../packages/shared/src/types.js';
+
+const { values: args } = parseArgs({
+  options: {
+    sizes: { type: 'string', default: '10000,100000,1000000' },
+    ops: { type: 'string', default: '100' },
+    queries: { type: 'string', default: '200' }
+  }
+});
+
+const SIZES = args.sizes!.split(',').map(s => parseInt(s.trim()));
+const OPS = parseInt(args.ops!);
+const QUERIES = parseInt(args.queries!);
+const PROJECTS = ['mina', 'solana', 'cosmos', 'secret', 'beam', 'pirate-chain'];
+const CHUNKS_PER_PAGE = 8;
+const SEED_BATCH = 5000;
+
+const VOCABULARY = (
+  'zkapp deploy contract proof circuit field struct method state account ' +
+  'transaction signature verify token bridge validator stake reward ' +
+  'network client server query module keeper handler message event ' +
+  'program instruction wallet balance fee block hash merkle tree ' +
+  'recursive compile witness provable public private input output ' +
+  'error timeout retry config install setup example tutorial guide'
+).split(' ');
+
+let seed = 7;
+function random(): number {
+  seed = (seed * 1664525 + 1013904223) >>> 0;
+  return seed / 4294967296;
+}
+
+function words(n: number): string {
+  return Array.from({ length: n }, () => VOCABULARY[Math.floor(random() * VOCABULARY.length)]).join(' ');
+}
+
+function makeChunk(i: number): DocumentChunk {
+  const page = Math.floor(i / CHUNKS_PER_PAGE);
+  return {
+    id: `chunk-${i}`,
+    url: `https://docs.example.com/page-${page}`,
+    title: `Page ${page} ${words(3)}`,
+    section: words(4),
+    content: words(120),
+    contentType: i % 3 === 0 ? 'code' : 'prose',
+    project: PROJECTS[page % PROJECTS.length],
+    metadata: { headings: [words(2)], lastScraped: new Date(0).toISOString() }
+  };
+}
+
+function percentile(sorted: number[], p: number): number {
+  return sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))];
+}
+
+interface Store {
+  seed(chunks: DocumentChunk[]): void;
+  upsert(chunks: DocumentChunk[]): Promise<void>;
+  deleteByUrls(urls: string[]): Promise<number>;
+  search(query: string, project: string): Promise<unknown[]>;
+  close(): Promise<void>;
+}
+
+/**
+ * The original FullTextDB statements, kept here for comparison only
+ */
+class LegacyStore implements Store {
+  private db: Database.Database;
+
+  constructor(path: string) {
+    this.db = new Database(path);
+    this.db.exec(`
+      CREATE TABLE chunks (
+        id TEXT PRIMARY KEY, url TEXT NOT NULL, title TEXT NOT NULL,
+        section TEXT NOT NULL, content TEXT NOT NULL, content_type TEXT NOT NULL,
+        project TEXT NOT NULL, metadata TEXT NOT NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP, orphaned INTEGER DEFAULT 0
+      );
+      CREATE INDEX idx_chunks_project ON chunks(project);
+      CREATE INDEX idx_chunks_url ON chunks(url);
+      CREATE VIRTUAL TABLE chunks_fts USING fts5(
+        title, section, content, content_id UNINDEXED, tokenize='porter unicode61'
+      );
+    `);
+  }
+
+  seed(chunks: DocumentChunk[]): void {
+    const insertChunk = this.db.prepare(`
+      INSERT INTO chunks (id, url, title, section, content, content_type, project, metadata, orphaned)
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
+    `);
+    const insertFts = this.db.prepare(`
+      INSERT INTO chunks_fts (title, section, content, content_id) VALUES (?, ?, ?, ?)
+    `);
+    this.db.transaction(() => {
+      for (const c of chunks) {
+        insertChunk.run(c.id, c.url, c.title, c.section, c.content, c.contentType, c.project, JSON.stringify(c.metadata));
+        insertFts.run(c.title, c.section, c.content, c.id);
+      }
+    })();
+  }
+
+  async upsert(chunks: DocumentChunk[]): Promise<void> {
+    const insertChunk = this.db.prepare(`
+      INSERT OR REPLACE INTO chunks (id, url, title, section, content, content_type, project, metadata, orphaned)
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    `);
+    const deleteFts = this.db.prepare(`DELETE FROM chunks_fts WHERE content_id = ?`);
+    const insertFts = this.db.prepare(`
+      INSERT INTO chunks_fts (title, section, content, content_id) VALUES (?, ?, ?, ?)
+    `);
+    this.db.transaction(() => {
+      for (const c of chunks) {
+        insertChunk.run(c.id, c.url, c.title, c.section, c.content, c.contentType, c.project, JSON.stringify(c.metadata), 0);
+        deleteFts.run(c.id);
+        insertFts.run(c.title, c.section, c.content, c.id);
+      }
+    })();
+  }
+
+  async deleteByUrls(urls: string[]): Promise<number> {
+    const selectIds = this.db.prepare('SELECT id FROM chunks WHERE url = ?');
+    const deleteFts = this.db.prepare('DELETE FROM chunks_fts WHERE content_id = ?');
+    const deleteChunks = this.db.prepare('DELETE FROM chunks WHERE url = ?');
+    return this.db.transaction(() => {
+      let deleted = 0;
+      for (const url of urls) {
+        for (const row of selectIds.all(url) as Array<{ id: string }>) {
+          deleteFts.run(row.id);
+        }
+        deleted += deleteChunks.run(url).changes;
+      }
+      return deleted;
+    })();
+  }
+
+  async search(query: string, project: string): Promise<unknown[]> {
+    const match = query.split(/\s+/).map(w => `"${w}"`).join(' OR ');
+    const rows = this.db.prepare(`
+      SELECT c.*, bm25(chunks_fts) as score
+      FROM chunks_fts fts
+      JOIN chunks c ON c.id = fts.content_id
+      WHERE chunks_fts MATCH ? AND c.project = ?
+      ORDER BY score LIMIT 10
+    `).all(match, project) as any[];
+    return rows.map(row => ({ ...row, metadata: JSON.parse(row.metadata) }));
+  }
+
+  async close(): Promise<void> {
+    this.db.close();
+  }
+}
+
+class CurrentStore implements Store {
+  constructor(private db: FullTextDB) {}
+
+  seed(chunks: DocumentChunk[]): void {
+    // upsert is synchronous under the hood (better-sqlite3)
+    void this.db.upsert(chunks);
+  }
+
+  upsert(chunks: DocumentChunk[]): Promise<void> {
+    return this.db.upsert(chunks);
+  }
+
+  deleteByUrls(urls: string[]): Promise<number> {
+    return this.db.deleteByUrls(urls);
+  }
+
+  search(query: string, project: string): Promise<unknown[]> {
+    return this.db.search(query, { project, limit: 10 });
+  }
+
+  close(): Promise<void> {
+    return this.db.close();
+  }
+}
+
+function fileSizeMb(path: string): number {
+  let bytes = statSync(path).size;
+  if (existsSync(`${path}-wal`)) bytes += statSync(`${path}-wal`).size;
+  return bytes / (1024 * 1024);
+}
+
+async function measure(label: string, size: number, store: Store, path: string): Promise<void> {
+  const seedStart = Date.now();
+  for (let i = 0; i < size; i += SEED_BATCH) {
+    const batch: DocumentChunk[] = [];
+    for (let j = i; j < Math.min(size, i + SEED_BATCH); j++) batch.push(makeChunk(j));
+    store.seed(batch);
+  }
+  const seedMs = Date.now() - seedStart;
+
+  // Re-index existing chunks spread across the corpus
+  const upsertChunks = Array.from({ length: OPS }, () => makeChunk(Math.floor(random() * size)));
+  const upsertStart = process.hrtime.bigint();
+  await store.upsert(upsertChunks);
+  const upsertMs = Number(process.hrtime.bigint() - upsertStart) / 1e6;
+
+  // Delete whole pages
+  const pages = Math.floor(size / CHUNKS_PER_PAGE);
+  const deleteUrls = Array.from({ length: Math.max(1, Math.floor(OPS / CHUNKS_PER_PAGE)) }, () =>
+    `https://docs.example.com/page-${Math.floor(random() * pages)}`
+  );
+  const deleteStart = process.hrtime.bigint();
+  await store.deleteByUrls(deleteUrls);
+  const deleteMs = Number(process.hrtime.bigint() - deleteStart) / 1e6;
+
+  const latencies: number[] = [];
+  for (let q = 0; q < QUERIES; q++) {
+    const start = process.hrtime.bigint();
+    await store.search(words(3), PROJECTS[q % PROJECTS.length]);
+    latencies.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  latencies.sort((a, b) => a - b);
+
+  console.log(
+    `${String(size).padStart(8)}  ${label.padEnd(7)}` +
+    `${(seedMs / 1000).toFixed(1).padStart(7)}s ` +
+    `${(upsertMs / upsertChunks.length).toFixed(3).padStart(9)}ms ` +
+    `${(deleteMs / deleteUrls.length).toFixed(3).padStart(9)}ms ` +
+    `${percentile(latencies, 0.5).toFixed(2).padStart(8)}ms ` +
+    `${percentile(latencies, 0.95).toFixed(2).padStart(8)}ms ` +
+    `${fileSizeMb(path).toFixed(0).padStart(7)}MB`
+  );
+}
+
+async function main() {
+  console.log(`FullTextDB benchmark: sizes ${SIZES.join(', ')}, ${OPS} upserts, ${QUERIES} queries per size`);
+  console.log('\n   size   layout     seed  upsert/chk  delete/pg  search50  search95     size');
+
+  const dir = mkdtempSync(join(tmpdir(), 'fts-bench-'));
+  try {
+    for (const size of SIZES) {
+      const legacyPath = join(dir, `legacy-${size}.db`);
+      const legacy = new LegacyStore(legacyPath);
+      await measure('before', size, legacy, legacyPath);
+      await legacy.close();
+
+      const currentPath = join(dir, `current-${size}.db`);
+      const fts = new FullTextDB({ path: currentPath });
+      await fts.initialize();
+      const current = new CurrentStore(fts);
+      await measure('after', size, current, currentPath);
+      await current.close();
+
+      rmSync(legacyPath, { force: true });
+      rmSync(currentPath, { force: true });
+    }
+  } finally {
+    rmSync(dir, { recursive: true, force: true });
+  }
+}
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,402 @@
+#!/usr/bin/env npx ts-node
+
+/**
+ * Offline load test with per-stage latency breakdown
+ *
+ * Usage: npm run bench:load -- [--concurrency 1,4,16] [--iterations 2]
+ *          [--project mina] [--tool ask_docs] [--tag zkapp]
+ *          [--embed-latency 40] [--rerank-latency 400] [--chat-latency 1500]
+ *          [--filler 2000] [--answer-cache]
+ *          [--output report.json] [--baseline report.json] [--tolerance 0.25]
+ *
+ * Boots the MCP server in-process against local stand-ins, with no network access:
+ *   - OpenAI embeddings/chat -> scripts/stubs/openai-stub.ts (deterministic,
+ *     configurable latency), wired in through OPENAI_BASE_URL
+ *   - Qdrant -> the embedded local vector store (VECTOR_BACKEND=local)
+ *   - SQLite FTS -> a temporary database
+ * The corpus is synthesized from the evaluator YAML datasets (questions,
+ * expected facts, keywords, required code) plus filler chunks.
+ *
+ * Each concurrency level replays the dataset tool calls over /mcp and
+ * reports throughput, end-to-end p50/p95/p99, and the server's per-stage
+ * latency from /metrics (query analysis, embedding, vector search, FTS,
+ * RRF, rerank, corrective retries, synthesis, confidence scoring).
+ *
+ * --baseline compares stage and end-to-end p95 against a previous
+ * --output report and exits 1 on regressions beyond --tolerance.
+ *
+ * Requires `npm run build` (the server resolves @mina-docs/shared from dist).
+ */
+
+import { mkdtempSync, rmSync, readFileSync, writeFileSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { parseArgs } from 'util';
+import type { AddressInfo } from 'net';
+import type { Server } from 'http';
+import {
+  FullTextDB,
+  createVectorStore,
+  percentile,
+  tracer,
+  TRACE_STAGES,
+  type DocumentChunk,
+  type LatencySummary
+} from '@mina-docs/shared';
+import { loadDatasets } from '../packages/evaluator/src/datasets.js';
+import type { TestCase } from '../packages/evaluator/src/types.js';
+import { startOpenAIStub, deterministicEmbedding } from './stubs/openai-stub.js';
+
+const { values: args } = parseArgs({
+  options: {
+    concurrency: { type: 'string', default: '1,4,16' },
+    iterations: { type: 'string', default: '1' },
+    project: { type: 'string' },
+    tool: { type: 'string' },
+    tag: { type: 'string' },
+    'embed-latency': { type: 'string', default: '40' },
+    'rerank-latency': { type: 'string', default: '400' },
+    'chat-latency': { type: 'string', default: '1500' },
+    filler: { type: 'string', default: '2000' },
+    'answer-cache': { type: 'boolean', default: false },
+    output: { type: 'string' },
+    baseline: { type: 'string' },
+    tolerance: { type: 'string', default: '0.25' }
+  }
+});
+
+const CONCURRENCY = args.concurrency!.split(',').map(s => parseInt(s.trim()));
+const ITERATIONS = parseInt(args.iterations!);
+const FILLER_PER_PROJECT = parseInt(args.filler!);
+const TOLERANCE = parseFloat(args.tolerance!);
+const SEED_BATCH = 500;
+// Stage p95 changes smaller than this are noise, whatever the ratio
+const MIN_REGRESSION_MS = 2;
+
+const TOOL_NAMES: Record<string, string> = {
+  ask_docs: 'crypto_ask_docs',
+  get_working_example: 'crypto_get_working_example',
+  explain_error: 'crypto_explain_error',
+  search_docs: 'crypto_search_docs'
+};
+
+interface LevelReport {
+  concurrency: number;
+  requests: number;
+  errors: number;
+  durationMs: number;
+  throughput: number;
+  endToEnd: { p50Ms: number; p95Ms: number; p99Ms: number };
+  stages: Record<string, LatencySummary>;
+  tools: Record<string, LatencySummary>;
+}
+
+interface LoadReport {
+  timestamp: string;
+  settings: Record<string, unknown>;
+  levels: LevelReport[];
+}
+
+let seed = 11;
+function random(): number {
+  seed = (seed * 1664525 + 1013904223) >>> 0;
+  return seed / 4294967296;
+}
+
+/**
+ * Build a corpus the dataset questions can actually retrieve from
+ */
+function buildCorpus(tests: TestCase[]): DocumentChunk[] {
+  const chunks: DocumentChunk[] = [];
+  const vocabulary = new Map<string, string[]>();
+  const lastScraped = new Date(0).toISOString();
+
+  const chunk = (
+    test: TestCase,
+    contentType: DocumentChunk['contentType'],
+    content: string
+  ): DocumentChunk => ({
+    id: `${test.id}-${contentType}`,
+    url: `https://bench.local/${test.project}/${test.id}`,
+    title: test.name,
+    section: contentType,
+    content,
+    contentType,
+    project: test.project,
+    metadata: { headings: [test.name], lastScraped }
+  });
+
+  for (const test of tests) {
+    const input = Object.values(test.input).filter(v => typeof v === 'string').join(' ');
+    const expected = test.expected;
+    const facts = expected.groundTruth?.expectedFacts ?? [];
+    const keywords = expected.expectedKeywords ?? [];
+    const code = [...(expected.codeRequirements?.mustInclude ?? []), ...(expected.expectedImports ?? [])];
+
+    chunks.push(chunk(test, 'prose', [input, ...facts, keywords.join(', ')].join('\n\n')));
+    chunks.push(chunk(test, 'code', [`// ${input}`, ...code.map(c => `${c};`), ...keywords.map(k => `// ${k}`)].join('\n')));
+    chunks.push(chunk(test, 'api-reference', [test.name, ...keywords, ...code].join('\n')));
+
+    const words = `${input} ${facts.join(' ')} ${keywords.join(' ')}`.toLowerCase().match(/[a-z][a-z0-9]{2,}/g) ?? [];
+    vocabulary.set(test.project, [...(vocabulary.get(test.project) ?? []), ...words]);
+  }
+
+  // Filler: same vocabulary, no structure, so searches have competition
+  const types: DocumentChunk['contentType'][] = ['prose', 'code', 'api-reference'];
+  for (const [project, words] of vocabulary) {
+    for (let i = 0; i < FILLER_PER_PROJECT; i++) {
+      const text = Array.from({ length: 80 }, () => words[Math.floor(random() * words.length)]).join(' ');
+      chunks.push({
+        id: `filler-${project}-${i}`,
+        url: `https://bench.local/${project}/filler-${Math.floor(i / 8)}`,
+        title: `Filler ${i}`,
+        section: text.slice(0, 40),
+        content: text,
+        contentType: types[i % types.length],
+        project,
+        metadata: { headings: [], lastScraped }
+      });
+    }
+  }
+
+  return chunks;
+}
+
+async function seedStores(chunks: DocumentChunk[], sqlitePath: string, vectorPath: string): Promise<void> {
+  const ftsDb = new FullTextDB({ path: sqlitePath });
+  await ftsDb.initialize();
+  const vectorDb = createVectorStore({
+    backend: 'local',
+    qdrant: { url: '', collection: '' },
+    local: { path: vectorPath },
+    ftsDb
+  });
+  await vectorDb.initialize();
+
+  for (let i = 0; i < chunks.length; i += SEED_BATCH) {
+    const batch = chunks.slice(i, i + SEED_BATCH);
+    await ftsDb.upsert(batch);
+    await vectorDb.upsert(batch, batch.map(c => deterministicEmbedding(`${c.title} ${c.section} ${c.content}`)));
+  }
+
+  await vectorDb.close();
+  await ftsDb.close();
+}
+
+async function callTool(baseUrl: string, test: TestCase, id: number): Promise<void> {
+  const response = await fetch(`${baseUrl}/mcp`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      jsonrpc: '2.0',
+      method: 'tools/call',
+      params: {
+        name: TOOL_NAMES[test.tool] || test.tool,
+        arguments: { ...test.input, project: test.project }
+      },
+      id
+    })
+  });
+
+  const data = await response.json() as { error?: { message: string } };
+  if (data.error) {
+    throw new Error(data.error.message);
+  }
+}
+
+async function runLevel(baseUrl: string, tests: TestCase[], concurrency: number): Promise<LevelReport> {
+  const queue = Array.from({ length: ITERATIONS }, () => tests).flat();
+  const latencies: number[] = [];
+  let errors = 0;
+  let next = 0;
+
+  tracer.reset();
+  const start = performance.now();
+
+  await Promise.all(Array.from({ length: concurrency }, async () => {
+    while (next < queue.length) {
+      const index = next++;
+      const requestStart = performance.now();
+      try {
+        await callTool(baseUrl, queue[index], index);
+      } catch (error) {
+        errors++;
+        if (errors <= 3) {
+          console.error(`  ${queue[index].id} failed:`, error instanceof Error ? error.message : error);
+        }
+      }
+      latencies.push(performance.now() - requestStart);
+    }
+  }));
+
+  const durationMs = performance.now() - start;
+  latencies.sort((a, b) => a - b);
+
+  // Stage timings come from the server's own metrics endpoint
+  const metrics = await (await fetch(`${baseUrl}/metrics`)).json() as {
+    stages: Record<string, LatencySummary>;
+    requests: Record<string, LatencySummary>;
+  };
+
+  return {
+    concurrency,
+    requests: queue.length,
+    errors,
+    durationMs: Math.round(durationMs),
+    throughput: Number((queue.length / (durationMs / 1000)).toFixed(2)),
+    endToEnd: {
+      p50Ms: Math.round(percentile(latencies, 0.5)),
+      p95Ms: Math.round(percentile(latencies, 0.95)),
+      p99Ms: Math.round(percentile(latencies, 0.99))
+    },
+    stages: metrics.stages,
+    tools: metrics.requests
+  };
+}
+
+function printLevel(level: LevelReport): void {
+  console.log(
+    `\nconcurrency ${level.concurrency}: ${level.requests} requests in ${(level.durationMs / 1000).toFixed(1)}s, ` +
+    `${level.throughput} req/s, ${level.errors} errors`
+  );
+  console.log(
+    `  end-to-end   p50 ${level.endToEnd.p50Ms}ms  p95 ${level.endToEnd.p95Ms}ms  p99 ${level.endToEnd.p99Ms}ms`
+  );
+  console.log('\n  stage                count     mean      p50      p95      p99');
+
+  const names = [
+    ...TRACE_STAGES.filter(s => level.stages[s]),
+    ...Object.keys(level.stages).filter(s => !(TRACE_STAGES as readonly string[]).includes(s))
+  ];
+  const row = (name: string, s: LatencySummary) => console.log(
+    `  ${name.padEnd(18)}${String(s.count).padStart(7)}` +
+    `${s.meanMs.toFixed(1).padStart(8)}ms${s.p50Ms.toFixed(1).padStart(7)}ms` +
+    `${s.p95Ms.toFixed(1).padStart(7)}ms${s.p99Ms.toFixed(1).padStart(7)}ms`
+  );
+
+  for (const name of names) row(name, level.stages[name]);
+  for (const [name, summary] of Object.entries(level.tools)) row(name, summary);
+}
+
+/**
+ * Compare p95s with a previous report; returns the regressions found
+ */
+function compareWithBaseline(report: LoadReport, baseline: LoadReport): string[] {
+  const regressions: string[] = [];
+  const regressed = (current: number, previous: number) =>
+    current - previous > MIN_REGRESSION_MS && current > previous * (1 + TOLERANCE);
+
+  for (const level of report.levels) {
+    const before = baseline.levels.find(l => l.concurrency === level.concurrency);
+    if (!before) continue;
+
+    if (regressed(level.endToEnd.p95Ms, before.endToEnd.p95Ms)) {
+      regressions.push(`c=${level.concurrency} end-to-end p95 ${before.endToEnd.p95Ms}ms -> ${level.endToEnd.p95Ms}ms`);
+    }
+    for (const [stage, summary] of Object.entries(level.stages)) {
+      const previous = before.stages[stage];
+      if (previous && regressed(summary.p95Ms, previous.p95Ms)) {
+        regressions.push(`c=${level.concurrency} ${stage} p95 ${previous.p95Ms}ms -> ${summary.p95Ms}ms`);
+      }
+    }
+  }
+
+  return regressions;
+}
+
+async function main() {
+  let tests = (await loadDatasets(args.project)).flatMap(d => d.tests);
+  if (args.tool) tests = tests.filter(t => t.tool === args.tool);
+  if (args.tag) tests = tests.filter(t => t.tags?.includes(args.tag!));
+  if (tests.length === 0) {
+    throw new Error('No dataset tests match the filters');
+  }
+
+  const dir = mkdtempSync(join(tmpdir(), 'load-bench-'));
+  const stub = await startOpenAIStub({
+    embeddingLatencyMs: parseInt(args['embed-latency']!),
+    rerankLatencyMs: parseInt(args['rerank-latency']!),
+    chatLatencyMs: parseInt(args['chat-latency']!)
+  });
+  let server: Server | undefined;
+  let closeServices: (() => Promise<void>) | undefined;
+
+  try {
+    const sqlitePath = join(dir, 'bench.db');
+    const vectorPath = join(dir, 'bench.vec');
+
+    // Server config is read from the environment at import time
+    Object.assign(process.env, {
+      OPENAI_API_KEY: 'stub',
+      OPENAI_BASE_URL: stub.url,
+      VECTOR_BACKEND: 'local',
+      SQLITE_PATH: sqlitePath,
+      LOCAL_VECTOR_PATH: vectorPath,
+      EMBEDDING_CACHE_PERSIST: 'false',
+      ANSWER_CACHE_SIZE: args['answer-cache'] ? process.env.ANSWER_CACHE_SIZE || '200' : '0'
+    });
+
+    const corpus = buildCorpus(tests);
+    console.log(`Seeding ${corpus.length} chunks for ${new Set(tests.map(t => t.project)).size} projects...`);
+    await seedStores(corpus, sqlitePath, vectorPath);
+
+    const { initializeServices } = await import('../packages/server/src/services.js');
+    const { createHttpApp } = await import('../packages/server/src/transport.js');
+    const services = await initializeServices();
+    closeServices = () => services.close();
+
+    const app = createHttpApp(services);
+    server = await new Promise<Server>(resolve => {
+      const s = app.listen(0, '127.0.0.1', () => resolve(s));
+    });
+    const baseUrl = `http://127.0.0.1:${(server.address() as AddressInfo).port}`;
+
+    console.log(
+      `\nLoad test: ${tests.length} dataset calls x ${ITERATIONS} iteration(s), concurrency ${CONCURRENCY.join(', ')}` +
+      `\nStub latency: embed ${args['embed-latency']}ms, rerank ${args['rerank-latency']}ms, chat ${args['chat-latency']}ms`
+    );
+
+    const report: LoadReport = {
+      timestamp: new Date().toISOString(),
+      settings: { ...args, tests: tests.length, corpus: corpus.length },
+      levels: []
+    };
+
+    for (const concurrency of CONCURRENCY) {
+      const level = await runLevel(baseUrl, tests, concurrency);
+      report.levels.push(level);
+      printLevel(level);
+    }
+
+    console.log(
+      `\nStub calls: ${stub.stats.embeddingCalls} embedding (${stub.stats.embeddedTexts} texts), ` +
+      `${stub.stats.rerankCalls} rerank, ${stub.stats.synthesisCalls} synthesis`
+    );
+
+    if (args.output) {
+      writeFileSync(args.output, JSON.stringify(report, null, 2));
+      console.log(`Report saved to ${args.output}`);
+    }
+
+    if (args.baseline) {
+      const regressions = compareWithBaseline(report, JSON.parse(readFileSync(args.baseline, 'utf-8')));
+      if (regressions.length > 0) {
+        console.log(`\n${regressions.length} p95 regression(s) beyond ${Math.round(TOLERANCE * 100)}%:`);
+        regressions.forEach(r => console.log(`  ${r}`));
+        process.exitCode = 1;
+      } else {
+        console.log(`\nNo p95 regressions beyond ${Math.round(TOLERANCE * 100)}% against ${args.baseline}`);
+      }
+    }
+  } finally {
+    server?.close();
+    await closeServices?.();
+    await stub.close();
+    rmSync(dir, { recursive: true, force: true });
+  }
+}
+
+main().catch(error => {
+  console.error('Load test failed:', error);
+  process.exit(1);
+});
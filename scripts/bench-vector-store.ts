@@ -0,0 +1,166 @@
+#!/usr/bin/env npx ts-node
+
+/**
+ * Recall / latency benchmark for the embedded local vector store
+ *
+ * Usage: npm run bench:vector -- [--size 50000] [--dims 1536] [--queries 200]
+ *
+ * Generates clustered synthetic embeddings (documentation chunks cluster by
+ * topic, so uniform random vectors would make IVF look worse than it is),
+ * then compares each search mode against exact brute force:
+ *   - exact         float32 brute force over the filtered rows
+ *   - ivf           IVF probe + float32 scoring
+ *   - ivf + int8    IVF probe + int8 first pass + float32 rescoring
+ *
+ * Reports recall@k against exact results and p50/p95 query latency.
+ * No Qdrant, OpenAI or SQLite needed.
+ */
+
+import { mkdtempSync, rmSync, statSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { parseArgs } from 'util';
+import { LocalVectorStore } from '../packages/shared/src/db/local-vector.js';
+import type { DocumentChunk } from '../packages/shared/src/types.js';
+
+const { values: args } = parseArgs({
+  options: {
+    size: { type: 'string', default: '50000' },
+    dims: { type: 'string', default: '1536' },
+    queries: { type: 'string', default: '200' },
+    k: { type: 'string', default: '10' },
+    projects: { type: 'string', default: '4' }
+  }
+});
+
+const SIZE = parseInt(args.size!);
+const DIMS = parseInt(args.dims!);
+const QUERIES = parseInt(args.queries!);
+const K = parseInt(args.k!);
+const PROJECTS = parseInt(args.projects!);
+const TOPICS = Math.max(8, Math.round(Math.sqrt(SIZE) / 2));
+
+// Deterministic PRNG so runs are comparable
+let seed = 42;
+function random(): number {
+  seed = (seed * 1664525 + 1013904223) >>> 0;
+  return seed / 4294967296;
+}
+
+function gaussian(): number {
+  const u = Math.max(random(), 1e-12);
+  return Math.sqrt(-2 * Math.log(u)) * Math.cos(2 * Math.PI * random());
+}
+
+function randomVector(): number[] {
+  return Array.from({ length: DIMS }, gaussian);
+}
+
+function around(center: number[], spread: number): number[] {
+  return center.map(v => v + gaussian() * spread);
+}
+
+function percentile(sorted: number[], p: number): number {
+  return sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))];
+}
+
+function makeChunk(i: number): DocumentChunk {
+  return {
+    id: `chunk-${i}`,
+    url: `https://docs.example.com/page-${Math.floor(i / 8)}`,
+    title: `Page ${Math.floor(i / 8)}`,
+    section: 'Section',
+    content: '',
+    contentType: i % 3 === 0 ? 'code' : 'prose',
+    project: `project-${i % PROJECTS}`,
+    metadata: { headings: [], lastScraped: new Date(0).toISOString() }
+  };
+}
+
+async function buildStore(path: string, quantize: boolean, chunks: DocumentChunk[], vectors: number[][]) {
+  const store = new LocalVectorStore({
+    path,
+    dimensions: DIMS,
+    quantize,
+    // Force the IVF path whenever the filtered set is non-trivial
+    annThreshold: 1000,
+    hydrate: async () => new Map()
+  });
+  await store.initialize();
+
+  const start = Date.now();
+  for (let i = 0; i < chunks.length; i += 1000) {
+    await store.upsert(chunks.slice(i, i + 1000), vectors.slice(i, i + 1000));
+  }
+  await store.flush();
+  return { store, buildMs: Date.now() - start };
+}
+
+async function main() {
+  console.log(`Local vector store benchmark: ${SIZE} vectors x ${DIMS} dims, ${TOPICS} topics, ${QUERIES} queries, k=${K}`);
+
+  const centers = Array.from({ length: TOPICS }, randomVector);
+  const chunks: DocumentChunk[] = [];
+  const vectors: number[][] = [];
+  for (let i = 0; i < SIZE; i++) {
+    chunks.push(makeChunk(i));
+    vectors.push(around(centers[Math.floor(random() * TOPICS)], 0.6));
+  }
+  const queries = Array.from({ length: QUERIES }, () => ({
+    vector: around(centers[Math.floor(random() * TOPICS)], 0.7),
+    project: `project-${Math.floor(random() * PROJECTS)}`
+  }));
+
+  const dir = mkdtempSync(join(tmpdir(), 'vec-bench-'));
+
+  try {
+    const modes: Array<{ label: string; quantize: boolean; exact: boolean }> = [
+      { label: 'exact', quantize: false, exact: true },
+      { label: 'ivf', quantize: false, exact: false },
+      { label: 'ivf + int8', quantize: true, exact: false }
+    ];
+
+    const truth: string[][] = [];
+    console.log('\nmode          build     file      recall@k  p50       p95');
+
+    for (const [index, mode] of modes.entries()) {
+      const path = join(dir, `mode-${index}.vec`);
+      const { store, buildMs } = await buildStore(path, mode.quantize, chunks, vectors);
+      const latencies: number[] = [];
+      let recallSum = 0;
+
+      queries.forEach((q, i) => {
+        const start = process.hrtime.bigint();
+        const hits = store.searchIds(q.vector, { limit: K, filter: { project: q.project }, exact: mode.exact });
+        latencies.push(Number(process.hrtime.bigint() - start) / 1e6);
+
+        const ids = hits.map(h => h.id);
+        if (mode.exact) {
+          truth[i] = ids;
+          recallSum += 1;
+        } else {
+          const expected = new Set(truth[i]);
+          recallSum += ids.filter(id => expected.has(id)).length / Math.max(expected.size, 1);
+        }
+      });
+
+      latencies.sort((a, b) => a - b);
+      const fileMb = statSync(path).size / (1024 * 1024);
+      console.log(
+        `${mode.label.padEnd(14)}` +
+        `${(buildMs / 1000).toFixed(1).padStart(5)}s   ` +
+        `${fileMb.toFixed(0).padStart(5)}MB   ` +
+        `${(recallSum / queries.length).toFixed(3).padStart(8)}  ` +
+        `${percentile(latencies, 0.5).toFixed(2).padStart(7)}ms ` +
+        `${percentile(latencies, 0.95).toFixed(2).padStart(7)}ms`
+      );
+    }
+  } finally {
+    rmSync(dir, { recursive: true, force: true });
+  }
+}
+
+main().catch(error => {
+  console.error('Benchmark failed:', error);
+  process.exit(1);
+});
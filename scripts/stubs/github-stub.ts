@@ -0,0 +1,311 @@
+/**
+ * Local GitHub API stand-in for offline ingestion tests
+ *
+ * Serves the endpoints the GitHub scrapers use, on 127.0.0.1, from
+ * in-memory fixture repositories (path -> content):
+ *   GET /repos/{owner}/{repo}                       repository metadata
+ *   GET /repos/{owner}/{repo}/commits/{ref}         commit + root tree SHA
+ *   GET /repos/{owner}/{repo}/git/trees/{sha}       tree with blob SHAs (?recursive=1)
+ *   GET /repos/{owner}/{repo}/tarball/{sha}         gzipped tar, git-archive layout
+ *   GET /repos/{owner}/{repo}/contents/{path}       base64 file content
+ *
+ * Blob SHAs are real git blob hashes, so they only change with content.
+ * commit() replaces a repository's files as a new commit. An optional
+ * request quota answers 403 with x-ratelimit-* headers once spent, to
+ * exercise the client's rate-limit budget, and an optional tree limit
+ * truncates recursive listings the way the API does for huge repositories.
+ *
+ * Point the scrapers at it with GITHUB_API_URL=<url>.
+ */
+
+import { createHash } from 'crypto';
+import { createServer, type Server } from 'http';
+import type { AddressInfo } from 'net';
+import { gzipSync } from 'zlib';
+
+export type FixtureFiles = Record<string, string>;
+
+export interface GitHubStubOptions {
+  /** Fixture repositories keyed by "owner/repo" */
+  repos: Record<string, FixtureFiles>;
+  /** Requests allowed per rate-limit window. Default: unlimited */
+  rateLimit?: number;
+  /** Rate-limit window length. Default: 2s */
+  rateLimitWindowMs?: number;
+  /** Added to every response. Default: 0 */
+  latencyMs?: number;
+  /** Entries per recursive tree listing before it is truncated. Default: unlimited */
+  treeLimit?: number;
+}
+
+export interface GitHubStubStats {
+  requests: number;
+  /** Requests per route: repo, commits, trees, tarball, contents */
+  routes: Record<string, number>;
+  rateLimited: number;
+}
+
+export interface GitHubStub {
+  /** API base URL, e.g. http://127.0.0.1:54321 */
+  url: string;
+  stats: GitHubStubStats;
+  /** Replace a repository's files as a new commit; returns the commit SHA */
+  commit(repo: string, files: FixtureFiles): string;
+  resetStats(): void;
+  close(): Promise<void>;
+}
+
+interface FixtureCommit {
+  sha: string;
+  treeSha: string;
+  files: FixtureFiles;
+}
+
+interface FixtureTree {
+  commit: FixtureCommit;
+  /** Directory path with a trailing slash; '' for the root */
+  dir: string;
+}
+
+function sha1(data: string | Buffer): string {
+  return createHash('sha1').update(data).digest('hex');
+}
+
+function subtreeSha(fixture: FixtureCommit, dir: string): string {
+  return sha1(`tree:${fixture.sha}:${dir}`);
+}
+
+/**
+ * Git blob SHA: sha1("blob <size>\0<content>")
+ */
+export function gitBlobSha(content: string): string {
+  const body = Buffer.from(content, 'utf-8');
+  return sha1(Buffer.concat([Buffer.from(`blob ${body.length}\0`), body]));
+}
+
+function tarHeader(name: string, size: number, type: string): Buffer {
+  const header = Buffer.alloc(512);
+  header.write(name.slice(0, 100), 0, 'utf-8');
+  header.write('0000644\0', 100);
+  header.write('0000000\0', 108);
+  header.write('0000000\0', 116);
+  header.write(size.toString(8).padStart(11, '0') + '\0', 124);
+  header.write('00000000000\0', 136);
+  header.write('        ', 148);
+  header.write(type, 156);
+  header.write('ustar\0', 257);
+  header.write('00', 263);
+
+  let checksum = 0;
+  for (const byte of header) checksum += byte;
+  header.write(checksum.toString(8).padStart(6, '0') + '\0 ', 148);
+  return header;
+}
+
+function tarEntry(name: string, data: Buffer, type = '0'): Buffer[] {
+  const parts = [tarHeader(name, data.length, type), data];
+  const pad = (512 - (data.length % 512)) % 512;
+  if (pad > 0) parts.push(Buffer.alloc(pad));
+  return parts;
+}
+
+function paxRecord(key: string, value: string): string {
+  const body = ` ${key}=${value}\n`;
+  let length = body.length + 1;
+  while (String(length).length + body.length !== length) length++;
+  return `${length}${body}`;
+}
+
+/**
+ * Build a gzipped tarball laid out like GitHub's: a global pax header
+ * carrying the commit SHA, then every file under "{prefix}/". Paths over
+ * 100 bytes get pax path records.
+ */
+export function createTarball(files: FixtureFiles, prefix: string, commitSha = ''): Buffer {
+  const parts: Buffer[] = [];
+  parts.push(...tarEntry('pax_global_header', Buffer.from(paxRecord('comment', commitSha)), 'g'));
+  parts.push(...tarEntry(`${prefix}/`, Buffer.alloc(0), '5'));
+
+  for (const path of Object.keys(files).sort()) {
+    const name = `${prefix}/${path}`;
+    if (Buffer.byteLength(name) > 100) {
+      parts.push(...tarEntry('PaxHeader', Buffer.from(paxRecord('path', name)), 'x'));
+    }
+    parts.push(...tarEntry(name, Buffer.from(files[path], 'utf-8')));
+  }
+
+  parts.push(Buffer.alloc(1024));
+  return gzipSync(Buffer.concat(parts));
+}
+
+export async function startGitHubStub(options: GitHubStubOptions): Promise<GitHubStub> {
+  const windowMs = options.rateLimitWindowMs ?? 2000;
+  const latencyMs = options.latencyMs ?? 0;
+  const history = new Map<string, FixtureCommit[]>();
+  const trees = new Map<string, FixtureTree>();
+  let commitCounter = 0;
+
+  const stats: GitHubStubStats = { requests: 0, routes: {}, rateLimited: 0 };
+  let windowStart = Date.now();
+  let windowUsed = 0;
+
+  function commit(repo: string, files: FixtureFiles): string {
+    const entries = Object.keys(files).sort().map(path => `${path}:${gitBlobSha(files[path])}`);
+    const treeSha = sha1(`tree:${entries.join('\n')}`);
+    const sha = sha1(`commit:${treeSha}:${++commitCounter}`);
+    const commits = history.get(repo) ?? [];
+    const fixture: FixtureCommit = { sha, treeSha, files: { ...files } };
+    commits.push(fixture);
+    history.set(repo, commits);
+
+    trees.set(treeSha, { commit: fixture, dir: '' });
+    for (const path of Object.keys(files)) {
+      const parts = path.split('/');
+      for (let depth = 1; depth < parts.length; depth++) {
+        const dir = parts.slice(0, depth).join('/') + '/';
+        trees.set(subtreeSha(fixture, dir), { commit: fixture, dir });
+      }
+    }
+    return sha;
+  }
+
+  /**
+   * Entries of a tree: direct children, or every descendant when recursive
+   */
+  const listTree = ({ commit: fixture, dir }: FixtureTree, recursive: boolean) => {
+    const blobs: Array<{ path: string; mode: string; type: string; sha: string; size?: number }> = [];
+    const dirs = new Set<string>();
+    for (const path of Object.keys(fixture.files).sort()) {
+      if (!path.startsWith(dir)) continue;
+      const rest = path.slice(dir.length);
+      const parts = rest.split('/');
+      for (let depth = 1; depth < parts.length && (recursive || depth === 1); depth++) {
+        dirs.add(parts.slice(0, depth).join('/'));
+      }
+      if (recursive || parts.length === 1) {
+        const content = fixture.files[path];
+        blobs.push({ path: rest, mode: '100644', type: 'blob', sha: gitBlobSha(content), size: Buffer.byteLength(content) });
+      }
+    }
+    const subtrees = [...dirs].map(path => ({
+      path,
+      mode: '040000',
+      type: 'tree',
+      sha: subtreeSha(fixture, `${dir}${path}/`)
+    }));
+    return [...subtrees, ...blobs].sort((a, b) => a.path.localeCompare(b.path));
+  };
+
+  for (const [repo, files] of Object.entries(options.repos)) {
+    commit(repo, files);
+  }
+
+  const findCommit = (repo: string, ref: string): FixtureCommit | undefined => {
+    const commits = history.get(repo) ?? [];
+    return commits.find(c => c.sha === ref || c.treeSha === ref) ?? commits[commits.length - 1];
+  };
+
+  const server: Server = createServer(async (req, res) => {
+    const url = new URL(req.url ?? '/', 'http://localhost');
+    const match = url.pathname.match(/^\/repos\/([^/]+\/[^/]+)(?:\/(commits|git\/trees|tarball|contents)\/(.+))?$/);
+
+    const send = (status: number, body: unknown, headers: Record<string, string> = {}) => {
+      res.writeHead(status, { 'Content-Type': 'application/json', ...headers });
+      res.end(JSON.stringify(body));
+    };
+
+    if (latencyMs > 0) await new Promise(resolve => setTimeout(resolve, latencyMs));
+
+    stats.requests++;
+    const route = match ? (match[2] ?? 'repo').replace('git/', '') : 'unknown';
+    stats.routes[route] = (stats.routes[route] ?? 0) + 1;
+
+    const rateHeaders: Record<string, string> = {};
+    if (options.rateLimit !== undefined) {
+      if (Date.now() - windowStart >= windowMs) {
+        windowStart = Date.now();
+        windowUsed = 0;
+      }
+      const reset = Math.ceil((windowStart + windowMs) / 1000);
+      if (windowUsed >= options.rateLimit) {
+        stats.rateLimited++;
+        send(403, { message: 'API rate limit exceeded' }, {
+          'x-ratelimit-limit': String(options.rateLimit),
+          'x-ratelimit-remaining': '0',
+          'x-ratelimit-reset': String(reset)
+        });
+        return;
+      }
+      windowUsed++;
+      rateHeaders['x-ratelimit-limit'] = String(options.rateLimit);
+      rateHeaders['x-ratelimit-remaining'] = String(options.rateLimit - windowUsed);
+      rateHeaders['x-ratelimit-reset'] = String(reset);
+    }
+
+    const repo = match?.[1];
+    const ref = decodeURIComponent(match?.[3] ?? '');
+    const target = repo ? findCommit(repo, ref) : undefined;
+    if (!repo || !target) {
+      send(404, { message: 'Not Found' }, rateHeaders);
+      return;
+    }
+
+    switch (match![2]) {
+      case undefined:
+        send(200, {
+          full_name: repo,
+          stargazers_count: 42,
+          forks_count: 7,
+          pushed_at: new Date().toISOString(),
+          topics: ['fixture'],
+          archived: false
+        }, rateHeaders);
+        return;
+
+      case 'commits':
+        send(200, { sha: target.sha, commit: { tree: { sha: target.treeSha } } }, rateHeaders);
+        return;
+
+      case 'git/trees': {
+        const recursive = url.searchParams.get('recursive') === '1';
+        const tree = listTree(trees.get(ref) ?? { commit: target, dir: '' }, recursive);
+        const truncated = recursive && options.treeLimit !== undefined && tree.length > options.treeLimit;
+        send(200, { sha: ref, tree: truncated ? tree.slice(0, options.treeLimit) : tree, truncated }, rateHeaders);
+        return;
+      }
+
+      case 'tarball': {
+        const prefix = `${repo.replace('/', '-')}-${target.sha.slice(0, 7)}`;
+        res.writeHead(200, { 'Content-Type': 'application/x-gzip', ...rateHeaders });
+        res.end(createTarball(target.files, prefix, target.sha));
+        return;
+      }
+
+      case 'contents': {
+        const commitRef = findCommit(repo, url.searchParams.get('ref') ?? '')!;
+        const content = commitRef.files[ref];
+        if (content === undefined) {
+          send(404, { message: 'Not Found' }, rateHeaders);
+          return;
+        }
+        send(200, { encoding: 'base64', content: Buffer.from(content).toString('base64') }, rateHeaders);
+        return;
+      }
+    }
+  });
+
+  await new Promise<void>(resolve => server.listen(0, '127.0.0.1', resolve));
+  const { port } = server.address() as AddressInfo;
+
+  return {
+    url: `http://127.0.0.1:${port}`,
+    stats,
+    commit,
+    resetStats() {
+      stats.requests = 0;
+      stats.routes = {};
+      stats.rateLimited = 0;
+    },
+    close: () => new Promise<void>(resolve => server.close(() => resolve()))
+  };
+}
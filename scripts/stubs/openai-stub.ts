@@ -0,0 +1,235 @@
+/**
+ * Local OpenAI API stand-in for offline benchmarks
+ *
+ * Serves the two endpoints the pipeline uses, on 127.0.0.1:
+ *   POST /v1/embeddings        deterministic feature-hashed vectors
+ *   POST /v1/chat/completions  rerank prompts get an index array, code
+ *                              quality prompts a JSON verdict, everything
+ *                              else a canned markdown answer
+ *
+ * Point the OpenAI SDK at it with OPENAI_BASE_URL=<url> (the SDK reads
+ * that variable by default), so no application code needs to change.
+ * Latency per call is configurable so runs can model the real API.
+ */
+
+import { createServer, type IncomingMessage, type Server } from 'http';
+import type { AddressInfo } from 'net';
+
+export interface OpenAIStubOptions {
+  /** Added to every embeddings call. Default: 0 */
+  embeddingLatencyMs?: number;
+  /** Added to every synthesis chat completion. Default: 0 */
+  chatLatencyMs?: number;
+  /** Added to every rerank chat completion. Default: chatLatencyMs */
+  rerankLatencyMs?: number;
+  /** Uniform random +/- fraction applied to latencies. Default: 0.2 */
+  jitter?: number;
+  /** Embedding width. Default: 1536 (text-embedding-3-small) */
+  dimensions?: number;
+  /** Score given by code quality assessments. Default: 80 */
+  assessmentScore?: number;
+}
+
+export interface OpenAIStubStats {
+  embeddingCalls: number;
+  embeddedTexts: number;
+  rerankCalls: number;
+  assessmentCalls: number;
+  synthesisCalls: number;
+}
+
+export interface OpenAIStub {
+  /** Base URL for the SDK, e.g. http://127.0.0.1:54321/v1 */
+  url: string;
+  stats: OpenAIStubStats;
+  close(): Promise<void>;
+}
+
+/**
+ * Deterministic embedding: hashed bag of words, L2-normalized.
+ * Texts sharing vocabulary get similar vectors, so retrieval over a
+ * corpus embedded the same way behaves plausibly.
+ */
+export function deterministicEmbedding(text: string, dimensions = 1536): number[] {
+  const vector = new Float64Array(dimensions);
+  const tokens = text.toLowerCase().match(/[a-z0-9_]+/g) ?? [''];
+
+  for (const token of tokens) {
+    const hash = fnv1a(token);
+    vector[hash % dimensions] += (hash & 0x80000000) ? -1 : 1;
+  }
+
+  let norm = 0;
+  for (let i = 0; i < dimensions; i++) norm += vector[i] * vector[i];
+  norm = Math.sqrt(norm) || 1;
+
+  return Array.from(vector, v => v / norm);
+}
+
+function fnv1a(text: string): number {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < text.length; i++) {
+    hash ^= text.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return hash >>> 0;
+}
+
+function encodeBase64(embedding: number[]): string {
+  return Buffer.from(new Float32Array(embedding).buffer).toString('base64');
+}
+
+function sleep(baseMs: number, jitter: number): Promise<void> {
+  if (baseMs <= 0) return Promise.resolve();
+  const ms = baseMs * (1 + (Math.random() * 2 - 1) * jitter);
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+async function readJson(req: IncomingMessage): Promise<any> {
+  const parts: Buffer[] = [];
+  for await (const part of req) parts.push(part as Buffer);
+  return JSON.parse(Buffer.concat(parts).toString('utf-8') || '{}');
+}
+
+/**
+ * Reply to the reranker prompt ("Return a JSON array of the N most
+ * relevant document indices") with the first N indices, i.e. keep the
+ * local order
+ */
+function rerankReply(prompt: string): string {
+  const topK = parseInt(prompt.match(/JSON array of the (\d+) most relevant/)?.[1] ?? '10');
+  const documents = (prompt.match(/^\[\d+\] \[/gm) ?? []).length;
+  const count = Math.min(topK, documents || topK);
+  return JSON.stringify(Array.from({ length: count }, (_, i) => i));
+}
+
+/**
+ * Reply to the GitHub scraper's code quality prompt with a fixed verdict
+ */
+function assessmentReply(prompt: string, score: number): string {
+  const file = prompt.match(/^File: (.+)$/m)?.[1] ?? 'unknown';
+  return JSON.stringify({
+    score,
+    isUsefulExample: score >= 50,
+    exampleDescription: `Stub assessment of ${file}`,
+    prerequisites: [],
+    versionHint: null,
+    reasoning: 'Stubbed quality assessment'
+  });
+}
+
+/**
+ * Canned synthesis answer quoting the first context lines, with a code
+ * block so downstream code extraction/verification has work to do
+ */
+function synthesisReply(prompt: string): string {
+  const quoted = prompt
+    .split('\n')
+    .map(line => line.trim())
+    .filter(line => line.length > 40 && !line.startsWith('#'))
+    .slice(0, 4);
+
+  return [
+    '## Answer',
+    '',
+    ...quoted.map(line => `- ${line.slice(0, 200)} [Source 1]`),
+    '',
+    '```typescript',
+    'import { SmartContract, state, State, method, Field } from "o1js";',
+    '',
+    'export class Example extends SmartContract {',
+    '  @state(Field) value = State<Field>();',
+    '',
+    '  @method async update(next: Field) {',
+    '    this.value.set(next);',
+    '  }',
+    '}',
+    '```'
+  ].join('\n');
+}
+
+export async function startOpenAIStub(options: OpenAIStubOptions = {}): Promise<OpenAIStub> {
+  const embeddingLatencyMs = options.embeddingLatencyMs ?? 0;
+  const chatLatencyMs = options.chatLatencyMs ?? 0;
+  const rerankLatencyMs = options.rerankLatencyMs ?? chatLatencyMs;
+  const jitter = options.jitter ?? 0.2;
+  const dimensions = options.dimensions ?? 1536;
+  const assessmentScore = options.assessmentScore ?? 80;
+
+  const stats: OpenAIStubStats = {
+    embeddingCalls: 0,
+    embeddedTexts: 0,
+    rerankCalls: 0,
+    assessmentCalls: 0,
+    synthesisCalls: 0
+  };
+
+  const server: Server = createServer(async (req, res) => {
+    try {
+      const body = await readJson(req);
+      let payload: unknown;
+
+      if (req.method === 'POST' && req.url?.endsWith('/embeddings')) {
+        const inputs: string[] = Array.isArray(body.input) ? body.input : [body.input];
+        const base64 = body.encoding_format === 'base64';
+        stats.embeddingCalls++;
+        stats.embeddedTexts += inputs.length;
+        await sleep(embeddingLatencyMs, jitter);
+
+        payload = {
+          object: 'list',
+          model: body.model,
+          data: inputs.map((text, index) => {
+            const embedding = deterministicEmbedding(String(text), dimensions);
+            return { object: 'embedding', index, embedding: base64 ? encodeBase64(embedding) : embedding };
+          }),
+          usage: { prompt_tokens: 0, total_tokens: 0 }
+        };
+      } else if (req.method === 'POST' && req.url?.endsWith('/chat/completions')) {
+        const prompt = (body.messages ?? []).map((m: { content: string }) => m.content).join('\n');
+        const isRerank = prompt.includes('most relevant document indices');
+        const isAssessment = prompt.includes('should be indexed as a useful example');
+        if (isRerank) stats.rerankCalls++;
+        else if (isAssessment) stats.assessmentCalls++;
+        else stats.synthesisCalls++;
+        await sleep(isRerank ? rerankLatencyMs : chatLatencyMs, jitter);
+
+        const content = isRerank
+          ? rerankReply(prompt)
+          : isAssessment ? assessmentReply(prompt, assessmentScore) : synthesisReply(prompt);
+
+        payload = {
+          id: `chatcmpl-stub-${stats.rerankCalls + stats.assessmentCalls + stats.synthesisCalls}`,
+          object: 'chat.completion',
+          created: Math.floor(Date.now() / 1000),
+          model: body.model,
+          choices: [{
+            index: 0,
+            message: { role: 'assistant', content },
+            finish_reason: 'stop'
+          }],
+          usage: { prompt_tokens: 0, completion_tokens: 0, total_tokens: 0 }
+        };
+      } else {
+        res.writeHead(404, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify({ error: { message: `Not stubbed: ${req.method} ${req.url}` } }));
+        return;
+      }
+
+      res.writeHead(200, { 'Content-Type': 'application/json' });
+      res.end(JSON.stringify(payload));
+    } catch (error) {
+      res.writeHead(500, { 'Content-Type': 'application/json' });
+      res.end(JSON.stringify({ error: { message: error instanceof Error ? error.message : String(error) } }));
+    }
+  });
+
+  await new Promise<void>(resolve => server.listen(0, '127.0.0.1', resolve));
+  const { port } = server.address() as AddressInfo;
+
+  return {
+    url: `http://127.0.0.1:${port}/v1`,
+    stats,
+    close: () => new Promise<void>(resolve => server.close(() => resolve()))
+  };
+}
@@ -0,0 +1,262 @@
+#!/usr/bin/env npx ts-node
+
+/**
+ * Offline test for the ask_docs answer cache
+ *
+ * Usage: npm run test:answer-cache [-- --verbose]
+ *
+ * Calls the crypto_ask_docs handler in-process with stand-in search, LLM
+ * and index-version dependencies (no network, no database). The stand-in
+ * search echoes each retrieval query into the chunks it returns, and the
+ * stand-in LLM echoes its prompt, so a cached answer shows which query it
+ * was retrieved with.
+ *
+ * Checks that repeated questions are served from cache, that answers
+ * cached during a conversation are not retrieved with earlier turns'
+ * keywords, that follow-ups bypass the cache, and that "nothing found" or
+ * empty answers are not cached.
+ *
+ * Requires `npm run build` (the server resolves @mina-docs/shared from dist).
+ */
+
+import { parseArgs } from 'util';
+import type { SearchResult } from '@mina-docs/shared';
+import { askDocs } from '../packages/server/src/tools/ask-docs.js';
+import type { ToolContext } from '../packages/server/src/tools/index.js';
+import { conversationContext } from '../packages/server/src/context/conversation-context.js';
+import { answerCache } from '../packages/server/src/utils/answer-cache.js';
+
+const { values: args } = parseArgs({
+  options: {
+    verbose: { type: 'boolean', short: 'v', default: false }
+  }
+});
+
+interface TestResult {
+  name: string;
+  passed: boolean;
+  error?: string;
+  duration: number;
+}
+
+const PROJECT = 'mina';
+
+function assert(condition: unknown, message: string): asserts condition {
+  if (!condition) throw new Error(message);
+}
+
+async function quietly<T>(fn: () => Promise<T>): Promise<T> {
+  if (args.verbose) return fn();
+
+  const { log, warn, error } = console;
+  console.log = console.warn = console.error = () => {};
+  try {
+    return await fn();
+  } finally {
+    Object.assign(console, { log, warn, error });
+  }
+}
+
+/**
+ * Tool context whose search and LLM record what they were asked. With
+ * found: false the search returns nothing; answer replaces the LLM echo.
+ */
+function createStubContext(options: { found?: boolean; answer?: string } = {}) {
+  const retrievals: string[] = [];
+  let llmCalls = 0;
+
+  const result = (query: string, i: number): SearchResult => ({
+    chunk: {
+      id: `chunk-${i}`,
+      url: `https://docs.example.com/page-${i}`,
+      title: `Page ${i}`,
+      section: 'Overview',
+      content: `Documentation retrieved for: ${query}`,
+      contentType: 'prose',
+      project: PROJECT,
+      metadata: { headings: [], lastScraped: new Date(0).toISOString() }
+    },
+    score: 0.9,
+    matchType: 'hybrid'
+  });
+
+  const search = {
+    async retrieve(query: string) {
+      retrievals.push(query);
+      return options.found === false ? [] : [0, 1, 2, 3].map(i => result(query, i));
+    },
+    async rerankResults(_query: string, results: SearchResult[], options: { topK: number }) {
+      return results.slice(0, options.topK);
+    }
+  };
+
+  const llmClient = {
+    async synthesize(_system: string, user: string) {
+      llmCalls++;
+      return options.answer ?? `Answer based on:\n${user}`;
+    }
+  };
+
+  const ftsDb = {
+    async getIndexVersion() {
+      return 'v1';
+    }
+  };
+
+  return {
+    context: { search, llmClient, ftsDb } as unknown as ToolContext,
+    retrievals,
+    get llmCalls() {
+      return llmCalls;
+    }
+  };
+}
+
+async function ask(context: ToolContext, question: string): Promise<string> {
+  const response = await quietly(() => askDocs({ question, project: PROJECT, maxTokens: 4000 }, context));
+  return response.content.map(c => c.text).join('\n');
+}
+
+async function runTests() {
+  console.log('='.repeat(60));
+  console.log('Answer Cache Test');
+  console.log('='.repeat(60));
+
+  const results: TestResult[] = [];
+
+  async function test(name: string, fn: () => Promise<void>): Promise<void> {
+    conversationContext.clearAllContext();
+    answerCache.clear();
+
+    const start = Date.now();
+    try {
+      await fn();
+      results.push({ name, passed: true, duration: Date.now() - start });
+    } catch (error) {
+      results.push({
+        name,
+        passed: false,
+        error: error instanceof Error ? error.message : 'Unknown error',
+        duration: Date.now() - start
+      });
+    }
+    const last = results[results.length - 1];
+    console.log(`  ${last.passed ? '✓' : '✗'} ${last.name}`);
+  }
+
+  console.log('\nRunning tests...\n');
+
+  await test('Repeating a question with API identifiers is served from cache', async () => {
+    const stub = createStubContext();
+    const question = 'How do I call MerkleMap.getWitness inside a SmartContract method?';
+
+    const first = await ask(stub.context, question);
+    assert(
+      !conversationContext.isLikelyFollowUp(PROJECT, `  ${question.toLowerCase()} `),
+      'expected a normalized repeat not to count as a follow-up'
+    );
+
+    const hitsBefore = answerCache.stats.hits;
+    const second = await ask(stub.context, question);
+
+    assert(answerCache.stats.hits === hitsBefore + 1, 'expected the repeat to be a cache hit');
+    assert(stub.llmCalls === 1, `expected one synthesis, got ${stub.llmCalls}`);
+    assert(second === first, 'expected the cached answer');
+  });
+
+  await test('Answers cached within the follow-up window carry no earlier keywords', async () => {
+    const stub = createStubContext();
+    const first = 'How do I store a MerkleMap root in a zkApp?';
+    const second = 'How many on-chain state fields can a SmartContract store?';
+
+    await ask(stub.context, first);
+    const expanded = conversationContext.enhanceQuery(PROJECT, second);
+    assert(expanded.includes('(related:'), 'setup: expected conversation context to be available for enhancement');
+    assert(!conversationContext.isLikelyFollowUp(PROJECT, second), 'setup: expected the second question not to be a follow-up');
+
+    const retrievalsBefore = stub.retrievals.length;
+    const answer = await ask(stub.context, second);
+    const secondRetrievals = stub.retrievals.slice(retrievalsBefore);
+
+    assert(secondRetrievals.length > 0, 'expected the second question to be retrieved');
+    assert(
+      secondRetrievals.every(q => !q.includes('(related:') && !q.includes('MerkleMap')),
+      `expected retrieval without the first question's keywords, got ${JSON.stringify(secondRetrievals)}`
+    );
+
+    // Another session asking the same question gets the same, context-free answer
+    conversationContext.clearAllContext();
+    const retrievalsBeforeHit = stub.retrievals.length;
+    const cached = await ask(stub.context, second);
+
+    assert(stub.retrievals.length === retrievalsBeforeHit, 'expected the second session to be served from cache');
+    assert(cached === answer, 'expected the cached answer');
+    assert(!/MerkleMap|\(related:/.test(cached), "expected the cached answer not to carry the first question's keywords");
+  });
+
+  await test('Follow-ups bypass the cache and use conversation context', async () => {
+    const stub = createStubContext();
+
+    await ask(stub.context, 'How do I store a MerkleMap root in a zkApp?');
+    const bypassedBefore = answerCache.stats.bypassed;
+    const sizeBefore = answerCache.stats.size;
+    const retrievalsBefore = stub.retrievals.length;
+
+    await ask(stub.context, 'What about testing it locally first?');
+
+    assert(answerCache.stats.bypassed === bypassedBefore + 1, 'expected the follow-up to bypass the cache');
+    assert(answerCache.stats.size === sizeBefore, 'expected the follow-up answer not to be cached');
+    assert(
+      stub.retrievals.slice(retrievalsBefore).some(q => q.includes('(related:')),
+      'expected the follow-up retrieval to include conversation context'
+    );
+  });
+
+  await test('Not-found and empty answers are not cached', async () => {
+    const question = 'How do I configure the archive node for a custom network?';
+
+    const missing = createStubContext({ found: false });
+    const notFound = await ask(missing.context, question);
+    assert(notFound.includes("couldn't find documentation"), 'setup: expected the not-found answer');
+    assert(answerCache.stats.size === 0, 'expected the not-found answer not to be cached');
+
+    const silent = createStubContext({ answer: '  ' });
+    await ask(silent.context, question);
+    assert(silent.llmCalls === 1, `setup: expected one synthesis, got ${silent.llmCalls}`);
+    assert(answerCache.stats.size === 0, 'expected the empty answer not to be cached');
+
+    // Once the docs answer it, the question is computed again and cached
+    const stub = createStubContext();
+    await ask(stub.context, question);
+    assert(stub.llmCalls === 1, 'expected the question to be answered afresh');
+    assert(answerCache.stats.size === 1, 'expected the successful answer to be cached');
+  });
+
+  // Summary
+  console.log('\n' + '='.repeat(60));
+  console.log('Results:');
+  console.log('='.repeat(60));
+
+  const passed = results.filter(r => r.passed).length;
+  const failed = results.filter(r => !r.passed).length;
+
+  for (const result of results) {
+    const status = result.passed ? '✓ PASS' : '✗ FAIL';
+    console.log(`  ${status} ${result.name} (${result.duration}ms)`);
+    if (!result.passed && result.error) {
+      console.log(`         Error: ${result.error}`);
+    }
+  }
+
+  console.log('\n' + '-'.repeat(60));
+  console.log(`Total: ${results.length} | Passed: ${passed} | Failed: ${failed}`);
+  console.log('='.repeat(60));
+
+  conversationContext.shutdown();
+  process.exit(failed > 0 ? 1 : 0);
+}
+
+runTests().catch(error => {
+  console.error('Test runner failed:', error);
+  process.exit(1);
+});
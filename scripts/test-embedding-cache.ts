@@ -0,0 +1,234 @@
+#!/usr/bin/env npx ts-node
+
+/**
+ * Offline test for the query embedding cache
+ *
+ * Usage: npm run test:embedding-cache
+ *
+ * Drives QueryEmbeddingCache with a stub embed function (no network) and
+ * a temporary FullTextDB as the persistent store. Checks memory hits,
+ * in-flight deduplication, micro-batching, reuse across restarts and
+ * pruning of the persistent table.
+ *
+ * Requires `npm run build` (@mina-docs/shared resolves from dist).
+ */
+
+import { mkdtempSync, rmSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { FullTextDB, QueryEmbeddingCache, type QueryEmbeddingCacheOptions } from '@mina-docs/shared';
+
+interface TestResult {
+  name: string;
+  passed: boolean;
+  error?: string;
+  duration: number;
+}
+
+/**
+ * Embed function that records every call; vectors depend only on the text
+ */
+function stubEmbedder(options: { failNext?: boolean } = {}) {
+  const calls: string[][] = [];
+  const embed = async (texts: string[]): Promise<number[][]> => {
+    calls.push([...texts]);
+    await sleep(2);
+    if (options.failNext) {
+      options.failNext = false;
+      throw new Error('stub embeddings failure');
+    }
+    return texts.map(text => [text.length, text.charCodeAt(0) || 0, 1]);
+  };
+  return { embed, calls, options };
+}
+
+function sleep(ms: number): Promise<void> {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+function assert(condition: unknown, message: string): asserts condition {
+  if (!condition) throw new Error(message);
+}
+
+async function waitFor(condition: () => Promise<boolean>, message: string): Promise<void> {
+  for (let i = 0; i < 50; i++) {
+    if (await condition()) return;
+    await sleep(10);
+  }
+  throw new Error(message);
+}
+
+async function runTests() {
+  console.log('='.repeat(60));
+  console.log('Query Embedding Cache Test');
+  console.log('='.repeat(60));
+
+  const tempDir = mkdtempSync(join(tmpdir(), 'embedding-cache-'));
+  const dbPath = join(tempDir, 'cache.db');
+  const results: TestResult[] = [];
+
+  async function openStore(): Promise<FullTextDB> {
+    const db = new FullTextDB({ path: dbPath });
+    await db.initialize();
+    return db;
+  }
+
+  function newCache(embed: QueryEmbeddingCacheOptions['embed'], options: Partial<QueryEmbeddingCacheOptions> = {}) {
+    return new QueryEmbeddingCache({ embed, batchWindowMs: 5, ...options });
+  }
+
+  async function test(name: string, fn: () => Promise<void>): Promise<void> {
+    const start = Date.now();
+    try {
+      await fn();
+      results.push({ name, passed: true, duration: Date.now() - start });
+    } catch (error) {
+      results.push({
+        name,
+        passed: false,
+        error: error instanceof Error ? error.message : 'Unknown error',
+        duration: Date.now() - start
+      });
+    }
+    const last = results[results.length - 1];
+    console.log(`  ${last.passed ? '✓' : '✗'} ${last.name}`);
+  }
+
+  console.log('\nRunning tests...\n');
+
+  await test('Repeated and whitespace-variant queries hit memory', async () => {
+    const stub = stubEmbedder();
+    const cache = newCache(stub.embed);
+
+    const first = await cache.embed('how do I deploy a zkApp');
+    const second = await cache.embed('  how do I   deploy a zkApp ');
+
+    assert(stub.calls.length === 1, `expected 1 embeddings call, got ${stub.calls.length}`);
+    assert(first === second, 'expected the cached vector to be returned');
+    assert(cache.stats.hits === 1 && cache.stats.misses === 1, `unexpected stats ${JSON.stringify(cache.stats)}`);
+  });
+
+  await test('Concurrent identical queries share one request', async () => {
+    const stub = stubEmbedder();
+    const cache = newCache(stub.embed);
+
+    const vectors = await Promise.all(Array.from({ length: 5 }, () => cache.embed('merkle map witness')));
+
+    assert(stub.calls.length === 1 && stub.calls[0].length === 1, `expected one single-text call, got ${JSON.stringify(stub.calls)}`);
+    assert(vectors.every(v => v === vectors[0]), 'expected every caller to get the same vector');
+    assert(cache.stats.coalesced === 4, `expected 4 coalesced lookups, got ${cache.stats.coalesced}`);
+  });
+
+  await test('Concurrent misses are micro-batched up to maxBatchSize', async () => {
+    const stub = stubEmbedder();
+    const cache = newCache(stub.embed, { maxBatchSize: 4 });
+
+    const texts = Array.from({ length: 10 }, (_, i) => `query number ${i}`);
+    const vectors = await cache.embedMany(texts);
+
+    assert(stub.calls.map(c => c.length).join(',') === '4,4,2', `expected batches of 4,4,2, got ${stub.calls.map(c => c.length)}`);
+    assert(vectors.every((v, i) => v[0] === texts[i].length), 'expected vectors returned in input order');
+    assert(cache.stats.batches === 3, `expected 3 batches, got ${cache.stats.batches}`);
+  });
+
+  await test('Memory LRU evicts the least recently used entry', async () => {
+    const stub = stubEmbedder();
+    const cache = newCache(stub.embed, { maxEntries: 2 });
+
+    await cache.embed('a');
+    await cache.embed('b');
+    await cache.embed('a');
+    await cache.embed('c');
+    await cache.embed('a');
+    await cache.embed('b');
+
+    assert(cache.stats.size === 2, `expected 2 entries, got ${cache.stats.size}`);
+    assert(stub.calls.length === 4, `expected b to be re-embedded after eviction (4 calls), got ${stub.calls.length}`);
+  });
+
+  await test('Failed batches reject callers and are not cached', async () => {
+    const stub = stubEmbedder({ failNext: true });
+    const cache = newCache(stub.embed);
+
+    const failed = await Promise.allSettled([cache.embed('x'), cache.embed('y')]);
+    assert(failed.every(r => r.status === 'rejected'), 'expected both callers to see the failure');
+
+    await cache.embed('x');
+    assert(stub.calls.length === 2, `expected the retry to call the embedder again, got ${stub.calls.length} calls`);
+  });
+
+  await test('Persisted embeddings are reused after a restart', async () => {
+    const stub = stubEmbedder();
+    let store = await openStore();
+    const cache = newCache(stub.embed, { store });
+    const vector = await cache.embed('verify a proof off-chain');
+    await waitFor(async () => (await store.getQueryEmbeddingCount()) === 1, 'expected the embedding to be persisted');
+    await store.close();
+
+    store = await openStore();
+    const restarted = newCache(stub.embed, { store });
+    const reused = await restarted.embed('verify a proof off-chain');
+    await store.close();
+
+    assert(stub.calls.length === 1, `expected no embeddings call after restart, got ${stub.calls.length}`);
+    assert(restarted.stats.persistentHits === 1, `expected a persistent hit, got ${JSON.stringify(restarted.stats)}`);
+    assert(reused.length === vector.length && reused.every((v, i) => v === vector[i]), 'expected the same vector from disk');
+  });
+
+  await test('Persistent store is pruned by LRU order and age', async () => {
+    const store = await openStore();
+    await store.pruneQueryEmbeddings({ maxEntries: 0 });
+
+    for (const text of ['old', 'kept', 'recent']) {
+      await store.setQueryEmbedding('m', text, [1, 2, 3]);
+      await sleep(5);
+    }
+    await store.getQueryEmbedding('m', 'old'); // refreshes 'old'
+
+    const removed = await store.pruneQueryEmbeddings({ maxEntries: 2 });
+    assert(removed === 1, `expected 1 entry pruned, got ${removed}`);
+    assert(await store.getQueryEmbedding('m', 'kept') === null, 'expected the least recently used entry pruned');
+    assert(await store.getQueryEmbedding('m', 'old') !== null, 'expected the refreshed entry kept');
+
+    await sleep(20);
+    await store.setQueryEmbedding('m', 'fresh', [1, 2, 3]);
+    await store.pruneQueryEmbeddings({ maxAgeMs: 10 });
+    assert(await store.getQueryEmbeddingCount() === 1, 'expected only the fresh entry to survive the age limit');
+
+    // The cache prunes on its first write
+    for (const text of ['a', 'b', 'c']) await store.setQueryEmbedding('m', text, [1]);
+    const cache = newCache(stubEmbedder().embed, { store, persistentMaxEntries: 2 });
+    await cache.embed('new query');
+    await waitFor(async () => (await store.getQueryEmbeddingCount()) === 2, 'expected the cache to prune the store to 2 entries');
+    await store.close();
+  });
+
+  // Summary
+  console.log('\n' + '='.repeat(60));
+  console.log('Results:');
+  console.log('='.repeat(60));
+
+  const passed = results.filter(r => r.passed).length;
+  const failed = results.filter(r => !r.passed).length;
+
+  for (const result of results) {
+    const status = result.passed ? '✓ PASS' : '✗ FAIL';
+    console.log(`  ${status} ${result.name} (${result.duration}ms)`);
+    if (!result.passed && result.error) {
+      console.log(`         Error: ${result.error}`);
+    }
+  }
+
+  console.log('\n' + '-'.repeat(60));
+  console.log(`Total: ${results.length} | Passed: ${passed} | Failed: ${failed}`);
+  console.log('='.repeat(60));
+
+  rmSync(tempDir, { recursive: true, force: true });
+
+  process.exit(failed > 0 ? 1 : 0);
+}
+
+runTests().catch(error => {
+  console.error('Test runner failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,413 @@
+#!/usr/bin/env npx ts-node
+
+/**
+ * Offline test for incremental GitHub ingestion
+ *
+ * Usage: npm run test:github [-- --verbose]
+ *
+ * Runs the registry and legacy GitHub scrapers against local stand-ins,
+ * with no network access:
+ *   - GitHub API -> scripts/stubs/github-stub.ts (fixture repositories,
+ *     real blob SHAs, tarballs in GitHub's archive layout)
+ *   - OpenAI quality assessment -> scripts/stubs/openai-stub.ts
+ *   - Source state -> a temporary SQLite database
+ *
+ * Checks that unchanged files cost no archive download or LLM call, that
+ * changed files are read from one tarball per commit, that deletions and
+ * README/settings changes are picked up, that files whose chunks fail to
+ * index are retried, that concurrent sources stay within a shared
+ * rate limit, and that a truncated tree listing never drops files.
+ *
+ * Requires `npm run build` (@mina-docs/shared resolves from dist).
+ */
+
+import { mkdtempSync, rmSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { parseArgs } from 'util';
+import { FullTextDB, GitHubSourceEntrySchema, type GitHubSourceEntry, type VectorStore } from '@mina-docs/shared';
+import { GitHubClient } from '../packages/scraper/src/github-client.js';
+import { legacyGitHubSourceId, scrapeGitHubSource } from '../packages/scraper/src/github-source.js';
+import { retryFailedFiles } from '../packages/scraper/src/github-state.js';
+import { IngestPipeline } from '../packages/scraper/src/ingest-pipeline.js';
+import {
+  scrapeProjectGitHubSources,
+  type SourceScrapeResult
+} from '../packages/scraper/src/intelligent-github-scraper.js';
+import { startGitHubStub, type FixtureFiles, type GitHubStub } from './stubs/github-stub.js';
+import { startOpenAIStub, type OpenAIStub } from './stubs/openai-stub.js';
+
+const { values: args } = parseArgs({
+  options: {
+    verbose: { type: 'boolean', short: 'v', default: false }
+  }
+});
+
+interface TestResult {
+  name: string;
+  passed: boolean;
+  error?: string;
+  duration: number;
+}
+
+const PROJECT = 'fixture';
+
+function exampleFile(name: string, body: string): string {
+  return [
+    `/**`,
+    ` * ${name} example: shows how to declare on-chain state and update it`,
+    ` * from a method, with comments explaining each step.`,
+    ` */`,
+    `import { SmartContract, state, State, method, Field } from 'o1js';`,
+    ``,
+    `export class ${name} extends SmartContract {`,
+    `  // Current value stored on chain`,
+    `  @state(Field) value = State<Field>();`,
+    ``,
+    `  @method async update(next: Field) {`,
+    `    // ${body}`,
+    `    this.value.set(next);`,
+    `  }`,
+    `}`,
+    ``
+  ].join('\n');
+}
+
+const EXAMPLES_REPO: FixtureFiles = {
+  'README.md': '# Fixture Examples\n\nExample zkApps used by the ingestion tests.\n',
+  'package.json': '{ "name": "fixture-examples" }\n',
+  'examples/counter/README.md': '# Counter\n\nA counter zkApp. See Counter.ts for the contract.\n',
+  'examples/counter/src/Counter.ts': exampleFile('Counter', 'increment the stored counter'),
+  'examples/counter/src/Counter.test.ts': exampleFile('CounterTest', 'excluded by pattern'),
+  'examples/vote/README.md': '# Vote\n\nA voting zkApp. See Vote.ts for the contract.\n',
+  'examples/vote/src/Vote.ts': exampleFile('Vote', 'record a vote'),
+  'examples/vote/src/Tally.ts': exampleFile('Tally', 'tally the votes')
+};
+
+const LONG_DIR = 'src/lib/deeply/nested/directory/structure/that/exceeds/the/ustar/name/limit/of/one/hundred/bytes';
+
+const SDK_REPO: FixtureFiles = {
+  'README.md': '# Fixture SDK\n\nLibrary code used by the ingestion tests.\n',
+  'src/lib/field.ts': exampleFile('FieldHelpers', 'field arithmetic helpers'),
+  [`${LONG_DIR}/README.md`]: '# Long Path\n\nLives under a path that needs a pax header.\n',
+  [`${LONG_DIR}/long.ts`]: exampleFile('LongPath', 'path needs a pax header in the tarball'),
+  'src/internal/cache.ts': exampleFile('Cache', 'not in apiPaths')
+};
+
+function sources(overrides: Partial<Record<string, unknown>> = {}): GitHubSourceEntry[] {
+  const qualityThresholds = { minDocumentationScore: 0, minLLMRelevanceScore: 50, requireReadme: true, ...overrides };
+  return [
+    GitHubSourceEntrySchema.parse({
+      id: 'fixture-examples',
+      type: 'github',
+      repoType: 'example-repo',
+      trustLevel: 'official',
+      repo: 'fixture/examples',
+      qualityThresholds
+    }),
+    GitHubSourceEntrySchema.parse({
+      id: 'fixture-sdk',
+      type: 'github',
+      repoType: 'sdk',
+      trustLevel: 'official',
+      repo: 'fixture/sdk',
+      scrapeStrategy: { apiPaths: ['src/lib/**'] },
+      qualityThresholds
+    })
+  ];
+}
+
+function assert(condition: unknown, message: string): asserts condition {
+  if (!condition) throw new Error(message);
+}
+
+async function quietly<T>(fn: () => Promise<T>): Promise<T> {
+  if (args.verbose) return fn();
+
+  const { log, warn, error } = console;
+  console.log = console.warn = console.error = () => {};
+  try {
+    return await fn();
+  } finally {
+    Object.assign(console, { log, warn, error });
+  }
+}
+
+async function runTests() {
+  console.log('='.repeat(60));
+  console.log('Incremental GitHub Ingestion Test');
+  console.log('='.repeat(60));
+
+  const tempDir = mkdtempSync(join(tmpdir(), 'github-incremental-'));
+  const openai: OpenAIStub = await startOpenAIStub();
+  const github: GitHubStub = await startGitHubStub({
+    repos: { 'fixture/examples': EXAMPLES_REPO, 'fixture/sdk': SDK_REPO }
+  });
+  process.env.OPENAI_BASE_URL = openai.url;
+
+  const ftsDb = new FullTextDB({ path: join(tempDir, 'state.db') });
+  await ftsDb.initialize();
+
+  const results: TestResult[] = [];
+
+  // One registry ingest, storing state the way the scraper CLI does
+  async function ingest(entries = sources(), client = new GitHubClient({ apiBaseUrl: github.url })): Promise<SourceScrapeResult[]> {
+    github.resetStats();
+    openai.stats.assessmentCalls = 0;
+    const scraped = await quietly(() => scrapeProjectGitHubSources(PROJECT, entries, {
+      openaiApiKey: 'stub',
+      client,
+      stateStore: ftsDb
+    }));
+    for (const result of scraped) {
+      if (result.state) await ftsDb.saveGitHubSourceState(result.state);
+    }
+    return scraped;
+  }
+
+  async function test(name: string, fn: () => Promise<void>): Promise<void> {
+    const start = Date.now();
+    try {
+      await fn();
+      results.push({ name, passed: true, duration: Date.now() - start });
+    } catch (error) {
+      results.push({
+        name,
+        passed: false,
+        error: error instanceof Error ? error.message : 'Unknown error',
+        duration: Date.now() - start
+      });
+    }
+    const last = results[results.length - 1];
+    console.log(`  ${last.passed ? '✓' : '✗'} ${last.name}`);
+  }
+
+  const routes = () => github.stats.routes;
+  const urlOf = (repo: string, path: string) => `https://github.com/${repo}/blob/main/${path}`;
+
+  console.log('\nRunning tests...\n');
+
+  await test('First run reads each source from one archive', async () => {
+    const [examples, sdk] = await ingest();
+
+    assert(routes().tarball === 2, `expected 2 tarball downloads, got ${routes().tarball ?? 0}`);
+    assert(!routes().contents, `expected no per-file content calls, got ${routes().contents}`);
+    assert(examples.stats.indexed === 3, `expected 3 example files indexed, got ${examples.stats.indexed}`);
+    assert(sdk.stats.indexed === 2, `expected 2 SDK files indexed (incl. long path), got ${sdk.stats.indexed}`);
+    assert(openai.stats.assessmentCalls === 5, `expected 5 LLM assessments, got ${openai.stats.assessmentCalls}`);
+    assert(examples.state && sdk.state, 'expected state for both sources');
+  });
+
+  await test('Unchanged commit skips fetch, assessment and chunking', async () => {
+    const [examples, sdk] = await ingest();
+
+    assert(!routes().tarball && !routes().trees, `expected no tree/archive calls, got ${JSON.stringify(routes())}`);
+    assert(openai.stats.assessmentCalls === 0, `expected no LLM assessments, got ${openai.stats.assessmentCalls}`);
+    assert(examples.chunks.length === 0 && sdk.chunks.length === 0, 'expected no new chunks');
+    assert(examples.unchangedUrls.length === 3 && sdk.unchangedUrls.length === 2, 'expected all indexed files reported unchanged');
+  });
+
+  await test('Changed, added and deleted files are handled in one archive', async () => {
+    const files = { ...EXAMPLES_REPO };
+    files['examples/vote/src/Vote.ts'] = exampleFile('Vote', 'record a vote, now with nullifiers');
+    files['examples/vote/src/Ballot.ts'] = exampleFile('Ballot', 'a new ballot contract');
+    delete files['examples/vote/src/Tally.ts'];
+    github.commit('fixture/examples', files);
+
+    const [examples, sdk] = await ingest();
+
+    assert(routes().tarball === 1, `expected 1 tarball download, got ${routes().tarball ?? 0}`);
+    assert(openai.stats.assessmentCalls === 2, `expected 2 LLM assessments, got ${openai.stats.assessmentCalls}`);
+    assert(examples.stats.indexed === 2 && examples.unchangedUrls.length === 1, 'expected 2 re-indexed, 1 unchanged');
+    assert(
+      examples.removedUrls.length === 1 && examples.removedUrls[0] === urlOf('fixture/examples', 'examples/vote/src/Tally.ts'),
+      `expected Tally.ts removed, got ${JSON.stringify(examples.removedUrls)}`
+    );
+    assert(sdk.stats.unchanged === 2 && sdk.chunks.length === 0, 'expected the SDK source untouched');
+  });
+
+  await test('README change re-assesses the files it describes', async () => {
+    const files = { ...EXAMPLES_REPO };
+    files['examples/vote/src/Vote.ts'] = exampleFile('Vote', 'record a vote, now with nullifiers');
+    files['examples/vote/src/Ballot.ts'] = exampleFile('Ballot', 'a new ballot contract');
+    delete files['examples/vote/src/Tally.ts'];
+    files['examples/counter/README.md'] = '# Counter\n\nA counter zkApp, rewritten for the new API.\n';
+    github.commit('fixture/examples', files);
+
+    const [examples] = await ingest();
+
+    assert(openai.stats.assessmentCalls === 1, `expected 1 LLM assessment, got ${openai.stats.assessmentCalls}`);
+    assert(
+      examples.chunks.length > 0 && examples.chunks.every(c => c.metadata.filePath === 'examples/counter/src/Counter.ts'),
+      'expected only Counter.ts re-chunked'
+    );
+  });
+
+  await test('Files whose chunks fail to index are retried next run', async () => {
+    const files = { ...EXAMPLES_REPO };
+    files['examples/vote/src/Vote.ts'] = exampleFile('Vote', 'record a vote, now with nullifiers');
+    files['examples/vote/src/Ballot.ts'] = exampleFile('Ballot', 'a ballot contract whose embedding fails');
+    delete files['examples/vote/src/Tally.ts'];
+    files['examples/counter/README.md'] = '# Counter\n\nA counter zkApp, rewritten for the new API.\n';
+    github.commit('fixture/examples', files);
+    const ballotUrl = urlOf('fixture/examples', 'examples/vote/src/Ballot.ts');
+
+    const [examples] = await ingest();
+    assert(examples.chunks.some(c => c.url === ballotUrl), 'setup: expected Ballot.ts to be re-chunked');
+
+    // Index the way the scraper CLI does, with embeddings failing for Ballot.ts
+    const vectorDb = {
+      upsert: async () => {},
+      deleteByUrls: async () => {},
+      flush: async () => {}
+    } as unknown as VectorStore;
+    const pipeline = new IngestPipeline({
+      vectorDb,
+      ftsDb,
+      batchSize: 1,
+      maxRetries: 0,
+      embed: async texts => {
+        if (texts.some(t => t.includes('whose embedding fails'))) {
+          throw Object.assign(new Error('stub embeddings failure'), { status: 400 });
+        }
+        return texts.map(() => [1, 0, 0]);
+      }
+    });
+    await quietly(async () => {
+      for (const chunk of examples.chunks) await pipeline.addPage(chunk.url, [chunk], true);
+      await pipeline.finish();
+    });
+
+    assert(
+      pipeline.failedUrls.size === 1 && pipeline.failedUrls.has(ballotUrl),
+      `expected only Ballot.ts to fail, got ${JSON.stringify([...pipeline.failedUrls])}`
+    );
+    await ftsDb.saveGitHubSourceState(retryFailedFiles(examples.state!, pipeline.failedUrls));
+
+    const [retried] = await ingest();
+    assert(routes().tarball === 1, `expected the same commit to be re-read, got ${routes().tarball ?? 0} tarball downloads`);
+    assert(openai.stats.assessmentCalls === 1, `expected only Ballot.ts re-assessed, got ${openai.stats.assessmentCalls}`);
+    assert(
+      retried.chunks.length > 0 && retried.chunks.every(c => c.url === ballotUrl),
+      'expected only Ballot.ts re-chunked'
+    );
+
+    const [settled] = await ingest();
+    assert(!routes().tarball && settled.chunks.length === 0, 'expected the source to be settled after the retry');
+  });
+
+  await test('Changed thresholds discard stored verdicts', async () => {
+    const [examples, sdk] = await ingest(sources({ minLLMRelevanceScore: 90 }));
+
+    assert(openai.stats.assessmentCalls === 5, `expected all 5 files re-assessed, got ${openai.stats.assessmentCalls}`);
+    assert(examples.stats.indexed === 0 && sdk.stats.indexed === 0, 'expected every file rejected at the stricter threshold');
+    assert(examples.removedUrls.length === 3 && sdk.removedUrls.length === 2, 'expected previously indexed files removed');
+  });
+
+  await test('Legacy scraper skips unchanged blobs', async () => {
+    const config = {
+      repo: 'fixture/sdk',
+      branch: 'main',
+      include: ['src/lib/**/*.ts'],
+      exclude: ['**/*.test.ts']
+    };
+    const client = new GitHubClient({ apiBaseUrl: github.url });
+    const run = async () => {
+      github.resetStats();
+      const previousState = await ftsDb.getGitHubSourceState(legacyGitHubSourceId(PROJECT));
+      const result = await quietly(() => scrapeGitHubSource({ config, project: PROJECT, client, previousState }));
+      if (result.state) await ftsDb.saveGitHubSourceState(result.state);
+      return result;
+    };
+
+    const first = await run();
+    assert(first.chunks.length > 0, 'expected the first legacy run to extract chunks');
+    assert(routes().tarball === 1 && !routes().contents, 'expected the first legacy run to read one archive');
+
+    const second = await run();
+    assert(second.chunks.length === 0, `expected no chunks, got ${second.chunks.length}`);
+    assert(!routes().tarball, 'expected no archive download');
+    assert(second.unchangedUrls.length === 2, `expected 2 unchanged files, got ${second.unchangedUrls.length}`);
+  });
+
+  await test('Concurrent sources share one rate-limit budget', async () => {
+    const limited = await startGitHubStub({
+      repos: { 'fixture/examples': EXAMPLES_REPO, 'fixture/sdk': SDK_REPO },
+      rateLimit: 3,
+      rateLimitWindowMs: 1000
+    });
+
+    try {
+      const client = new GitHubClient({ apiBaseUrl: limited.url, minRemaining: 0, concurrency: 1 });
+      openai.stats.assessmentCalls = 0;
+      const scraped = await quietly(() => scrapeProjectGitHubSources(PROJECT, sources(), {
+        openaiApiKey: 'stub',
+        client
+      }));
+
+      const indexed = scraped.reduce((sum, r) => sum + r.stats.indexed, 0);
+      assert(indexed === 5, `expected 5 files indexed, got ${indexed}`);
+      assert(limited.stats.rateLimited === 0, `expected no requests over the quota, got ${limited.stats.rateLimited}`);
+      assert(client.stats.rateLimitWaitMs > 0, 'expected the client to wait for the quota to reset');
+    } finally {
+      await limited.close();
+    }
+  });
+
+  await test('Truncated tree listings are walked instead of dropping files', async () => {
+    const truncating = await startGitHubStub({
+      repos: { 'fixture/examples': EXAMPLES_REPO, 'fixture/sdk': SDK_REPO },
+      treeLimit: 3
+    });
+
+    try {
+      const client = new GitHubClient({ apiBaseUrl: truncating.url });
+      for (const [repo, files] of [['fixture/examples', EXAMPLES_REPO], ['fixture/sdk', SDK_REPO]] as const) {
+        const { treeSha } = await client.resolveCommit(repo, 'main');
+        const listed = (await quietly(() => client.getTree(repo, treeSha))).map(e => e.path).sort();
+        const expected = Object.keys(files).sort();
+        assert(listed.join(',') === expected.join(','), `expected every ${repo} file listed, got ${listed.join(',')}`);
+      }
+
+      // Same blobs as the stored state: nothing may be taken as deleted
+      const scraped = await ingest(sources({ minLLMRelevanceScore: 90 }), client);
+      const removed = scraped.flatMap(r => r.removedUrls);
+      assert(removed.length === 0, `expected no removals, got ${removed.join(', ')}`);
+      assert(scraped.every(r => r.state), 'expected state for both sources');
+    } finally {
+      await truncating.close();
+    }
+  });
+
+  // Summary
+  console.log('\n' + '='.repeat(60));
+  console.log('Results:');
+  console.log('='.repeat(60));
+
+  const passed = results.filter(r => r.passed).length;
+  const failed = results.filter(r => !r.passed).length;
+
+  for (const result of results) {
+    const status = result.passed ? '✓ PASS' : '✗ FAIL';
+    console.log(`  ${status} ${result.name} (${result.duration}ms)`);
+    if (!result.passed && result.error) {
+      console.log(`         Error: ${result.error}`);
+    }
+  }
+
+  console.log('\n' + '-'.repeat(60));
+  console.log(`Total: ${results.length} | Passed: ${passed} | Failed: ${failed}`);
+  console.log('='.repeat(60));
+
+  await ftsDb.close();
+  await github.close();
+  await openai.close();
+  rmSync(tempDir, { recursive: true, force: true });
+
+  process.exit(failed > 0 ? 1 : 0);
+}
+
+runTests().catch(error => {
+  console.error('Test runner failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,229 @@
+#!/usr/bin/env npx ts-node
+
+/**
+ * Offline test for the reranker's local stage
+ *
+ * Usage: npm run test:reranker
+ *
+ * Feeds hand-built candidates to scoreCandidatesLocally, isAmbiguousRanking
+ * and the tiered Reranker (no network, no LLM call). Checks scoring order,
+ * tie-breaking, that orphaned chunks are penalized both in fusion and in
+ * the local score, and when a ranking is or is not escalated to the LLM.
+ *
+ * Requires `npm run build` (@mina-docs/shared resolves from dist).
+ */
+
+import {
+  HybridSearch,
+  QueryEmbeddingCache,
+  fuseRankedLists,
+  Reranker,
+  isAmbiguousRanking,
+  scoreCandidatesLocally,
+  type DocumentChunk,
+  type FullTextDB,
+  type SearchResult,
+  type VectorStore
+} from '@mina-docs/shared';
+
+interface TestResult {
+  name: string;
+  passed: boolean;
+  error?: string;
+  duration: number;
+}
+
+const GENERAL = { type: 'general' as const, keywords: [] };
+
+function chunk(id: string, overrides: Partial<DocumentChunk> = {}, metadata: Partial<DocumentChunk['metadata']> = {}): DocumentChunk {
+  return {
+    id,
+    url: `https://docs.example.com/${id}`,
+    title: `Page ${id}`,
+    section: 'Overview',
+    content: `Content of ${id}`,
+    contentType: 'prose',
+    project: 'mina',
+    ...overrides,
+    metadata: { headings: [], lastScraped: new Date(0).toISOString(), ...metadata }
+  };
+}
+
+/**
+ * Hybrid result with the same value for every retrieval signal
+ */
+function candidate(id: string, signal: number, overrides: Partial<DocumentChunk> = {}, metadata: Partial<DocumentChunk['metadata']> = {}): SearchResult {
+  return {
+    chunk: chunk(id, overrides, metadata),
+    score: signal,
+    matchType: 'hybrid',
+    vectorScore: signal,
+    ftsScore: signal
+  };
+}
+
+function ids(results: Array<SearchResult | { result: SearchResult }>): string {
+  return results.map(r => ('result' in r ? r.result : r).chunk.id).join(',');
+}
+
+function assert(condition: unknown, message: string): asserts condition {
+  if (!condition) throw new Error(message);
+}
+
+async function runTests() {
+  console.log('='.repeat(60));
+  console.log('Reranker Local Stage Test');
+  console.log('='.repeat(60));
+
+  const results: TestResult[] = [];
+
+  async function test(name: string, fn: () => Promise<void> | void): Promise<void> {
+    const start = Date.now();
+    try {
+      await fn();
+      results.push({ name, passed: true, duration: Date.now() - start });
+    } catch (error) {
+      results.push({
+        name,
+        passed: false,
+        error: error instanceof Error ? error.message : 'Unknown error',
+        duration: Date.now() - start
+      });
+    }
+    const last = results[results.length - 1];
+    console.log(`  ${last.passed ? '✓' : '✗'} ${last.name}`);
+  }
+
+  console.log('\nRunning tests...\n');
+
+  await test('Stronger retrieval signals rank first', () => {
+    const scored = scoreCandidatesLocally(
+      [candidate('low', 0.2), candidate('high', 0.9), candidate('mid', 0.5)],
+      GENERAL
+    );
+
+    assert(ids(scored) === 'high,mid,low', `expected high,mid,low, got ${ids(scored)}`);
+    assert(scored[0].score > scored[1].score && scored[1].score > scored[2].score, 'expected strictly descending scores');
+  });
+
+  await test('Name matches and content type outrank equal retrieval signals', () => {
+    const analysis = { type: 'code_lookup' as const, keywords: ['MerkleMap'] };
+    const scored = scoreCandidatesLocally(
+      [
+        candidate('prose', 0.5),
+        candidate('title', 0.5, { title: 'Using MerkleMap' }),
+        candidate('class', 0.5, { contentType: 'code' }, { className: 'MerkleMap' })
+      ],
+      analysis
+    );
+
+    assert(ids(scored) === 'class,title,prose', `expected class,title,prose, got ${ids(scored)}`);
+    assert(scored[0].features.metadata === 1, `expected an exact class match to score 1, got ${scored[0].features.metadata}`);
+    assert(scored[0].features.contentType === 1, 'expected code to be the preferred content type for code lookups');
+  });
+
+  await test('Ties keep retrieval order', () => {
+    const forward = scoreCandidatesLocally(['a', 'b', 'c'].map(id => candidate(id, 0.5)), GENERAL);
+    const reverse = scoreCandidatesLocally(['c', 'b', 'a'].map(id => candidate(id, 0.5)), GENERAL);
+
+    assert(ids(forward) === 'a,b,c', `expected a,b,c, got ${ids(forward)}`);
+    assert(ids(reverse) === 'c,b,a', `expected c,b,a, got ${ids(reverse)}`);
+  });
+
+  await test('Orphaned chunks are penalized in fusion and local scoring', async () => {
+    const orphan = chunk('orphan', {}, { orphaned: true });
+    const live = chunk('live');
+    const vectorDb = {
+      search: async () => [{ chunk: orphan, score: 0.9 }, { chunk: live, score: 0.8 }]
+    } as unknown as VectorStore;
+    const ftsDb = {
+      search: async () => [{ chunk: orphan, score: 12 }, { chunk: live, score: 10 }]
+    } as unknown as FullTextDB;
+    const search = new HybridSearch({
+      vectorDb,
+      ftsDb,
+      openaiApiKey: 'unused',
+      embeddingCache: new QueryEmbeddingCache({ embed: async texts => texts.map(() => [1, 0, 0]) })
+    });
+
+    // Ranked first by both retrievers, but fused at half weight
+    const fused = await search.retrieve('merkle witness', { limit: 10 });
+    assert(ids(fused) === 'live,orphan', `expected live,orphan after fusion, got ${ids(fused)}`);
+    assert(Math.abs(fused[1].score - 1 / 61) < 1e-12, `expected the orphan's RRF score halved once (1/61), got ${fused[1].score}`);
+
+    // Raw vector/BM25 scores are unpenalized, so the local stage applies it too
+    const twins = scoreCandidatesLocally(
+      [candidate('orphan', 0.5, {}, { orphaned: true }), candidate('live', 0.5)],
+      GENERAL
+    );
+    assert(ids(twins) === 'live,orphan', `expected the live chunk to outrank its orphaned twin, got ${ids(twins)}`);
+    assert(twins[1].score === twins[0].score * 0.5, `expected the orphan's local score halved, got ${twins[1].score} vs ${twins[0].score}`);
+    assert(twins[1].features.orphaned, 'expected the orphan flag in the features');
+
+    const planned = fuseRankedLists([[candidate('orphan', 0.9, {}, { orphaned: true }), candidate('live', 0.8)]]);
+    assert(ids(planned) === 'live,orphan', `expected the planner's fusion to demote the orphan, got ${ids(planned)}`);
+  });
+
+  await test('Ambiguity thresholds decide escalation', () => {
+    const scores = [0.9, 0.8, 0.7, 0.69, 0.68, 0.5].map(score => ({ score }));
+
+    assert(isAmbiguousRanking(scores, 3, 0.03, 2), 'expected two near ties within 0.03 of the cutoff to escalate');
+    assert(!isAmbiguousRanking(scores, 3, 0.03, 3), 'expected two near ties to stay local when three are required');
+    assert(!isAmbiguousRanking(scores, 3, 0.005, 2), 'expected no near ties within 0.005 of the cutoff');
+    assert(isAmbiguousRanking(scores, 3, 0.2, 3), 'expected the 0.5 candidate to count with a 0.2 margin');
+    assert(!isAmbiguousRanking(scores, 6, 1, 1), 'expected no escalation when every candidate fits in the top-k');
+  });
+
+  await test('Tiered reranker answers decisive rankings locally', async () => {
+    const reranker = new Reranker({ apiKey: 'unused', mode: 'tiered' });
+    const decisive = [0.1, 0.9, 0.3, 0.7, 0.5, 0.0].map((s, i) => candidate(`d${i}`, s));
+
+    const top = await reranker.rerank('merkle witness', decisive, { topK: 3, analysis: GENERAL });
+
+    assert(ids(top) === 'd1,d3,d4', `expected d1,d3,d4, got ${ids(top)}`);
+    assert(reranker.stats.local === 1 && reranker.stats.escalated === 0, `expected a local decision, got ${JSON.stringify(reranker.stats)}`);
+    assert(reranker.stats.llmCalls === 0, 'expected no LLM call');
+  });
+
+  await test('Ambiguous rankings stay local when out of budget', async () => {
+    const reranker = new Reranker({ apiKey: 'unused', mode: 'tiered' });
+    const ambiguous = [candidate('a0', 0.9), candidate('a1', 0.8), ...[2, 3, 4, 5].map(i => candidate(`a${i}`, 0.4))];
+    assert(isAmbiguousRanking(scoreCandidatesLocally(ambiguous, GENERAL), 3), 'setup: expected the ranking to be ambiguous');
+
+    const top = await reranker.rerank('merkle witness', ambiguous, { topK: 3, analysis: GENERAL, localOnly: true });
+
+    assert(ids(top) === 'a0,a1,a2', `expected the local order a0,a1,a2, got ${ids(top)}`);
+    assert(reranker.stats.escalated === 0 && reranker.stats.llmCalls === 0, `expected no escalation, got ${JSON.stringify(reranker.stats)}`);
+
+    const local = new Reranker({ apiKey: 'unused', mode: 'local' });
+    await local.rerank('merkle witness', ambiguous, { topK: 3, analysis: GENERAL });
+    assert(local.stats.llmCalls === 0, 'expected local mode never to call the LLM');
+  });
+
+  // Summary
+  console.log('\n' + '='.repeat(60));
+  console.log('Results:');
+  console.log('='.repeat(60));
+
+  const passed = results.filter(r => r.passed).length;
+  const failed = results.filter(r => !r.passed).length;
+
+  for (const result of results) {
+    const status = result.passed ? '✓ PASS' : '✗ FAIL';
+    console.log(`  ${status} ${result.name} (${result.duration}ms)`);
+    if (!result.passed && result.error) {
+      console.log(`         Error: ${result.error}`);
+    }
+  }
+
+  console.log('\n' + '-'.repeat(60));
+  console.log(`Total: ${results.length} | Passed: ${passed} | Failed: ${failed}`);
+  console.log('='.repeat(60));
+
+  process.exit(failed > 0 ? 1 : 0);
+}
+
+runTests().catch(error => {
+  console.error('Test runner failed:', error);
+  process.exit(1);
+});